@@ -16,12 +16,18 @@
 import logging
 import json
 import ast
+import itertools
+import struct
+import time
+
+import six
 
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller import dpset
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
+from ryu.controller import request
 from ryu.exception import RyuException
 from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import ofproto_v1_2
@@ -33,6 +39,7 @@ from ryu.lib import ofctl_v1_2
 from ryu.lib import ofctl_v1_3
 from ryu.lib import ofctl_v1_4
 from ryu.lib import ofctl_v1_5
+from ryu.lib import ofctl_utils
 from ryu.app.wsgi import ControllerBase
 from ryu.app.wsgi import Response
 from ryu.app.wsgi import WSGIApplication
@@ -71,6 +78,25 @@ supported_ofctl = {
 # get flows stats of the switch filtered by the fields
 # POST /stats/flow/<dpid>
 #
+# get flows stats of the switch, streamed as they are received
+# GET /stats/flow/<dpid>?format=<json|ndjson>[&limit=<n>][&cursor=<cursor>]
+#                       [&table_id=<id>][&cookie=<cookie>&cookie_mask=<mask>]
+# POST /stats/flow/<dpid>?format=<json|ndjson>[...]
+# Note: With the format parameter, the response is sent with the chunked
+#       transfer encoding as the parts of the multipart reply arrive,
+#       instead of once the whole reply has been received.
+#       "json" is the same format as without the parameter.  "ndjson"
+#       emits one flow per line.
+#       With limit, at most that many flows are returned, followed by
+#       the cursor to pass to get the next ones, i.e. "next_cursor" in
+#       the json object or on the last line, if there are more.
+#       table_id, cookie and cookie_mask filter the flows in addition to
+#       the fields in the body.
+#       If the switch does not reply in time, or fails, before the first
+#       part of the reply, the status is 504 or 502.  If it does after,
+#       the response ends with the error message, i.e. "error" in the
+#       json object or on the last line, instead of "next_cursor".
+#
 # get aggregate flows stats of the switch
 # GET /stats/aggregateflow/<dpid>
 #
@@ -173,6 +199,26 @@ supported_ofctl = {
 # delete a group entry
 # POST /stats/groupentry/delete
 #
+# add, modify or delete flow, group and meter entries in bulk
+# POST /stats/bulk
+# Note: The body is a JSON array of entries, or one entry per line with
+#       "Content-Type: application/x-ndjson", each of them of the form:
+#         {"dpid": <dpid>, "cmd": <cmd>, "flow": <flow entry>}
+#       where "flow" may be "group" or "meter" instead, the entry is
+#       that of the body of /stats/flowentry/<cmd>, /stats/groupentry/<cmd>
+#       or /stats/meterentry/<cmd>, and "cmd" defaults to "add".
+#       The entries may be to any number of switches; those to each switch
+#       are sent without waiting for replies, in OpenFlow bundles as of
+#       OpenFlow 1.4 and followed by a barrier request before.  The
+#       response is sent once the switches have replied, and lists
+#       the entries which failed, e.g.
+#         {"entries": 3,
+#          "failed": [{"index": 1, "dpid": 1, "xid": 1234,
+#                      "reason": "...", "type": 5, "code": 6}]}
+#       where "index" is that of the entry in the body, and "type" and
+#       "code" are those of the error message of the switch, if any.
+#       With OpenFlow bundles, all the entries in a failed bundle fail.
+#
 # modify behavior of the physical port
 # POST /stats/portdesc/modify
 #
@@ -215,6 +261,8 @@ def stats_method(method):
         # Invoke StatsController method
         try:
             ret = method(self, req, dp, ofctl, *args, **kwargs)
+            if isinstance(ret, Response):
+                return ret
             return Response(content_type='application/json',
                             body=json.dumps(ret))
         except ValueError:
@@ -292,6 +340,250 @@ def command_method(method):
     return wrapper
 
 
+_STREAM_CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def stream_flow_stats(dp, ofctl, flow, params):
+    """
+    Returns a Response streaming the flow stats of the switch.
+    See "GET /stats/flow/<dpid>?format=..." above.
+    """
+    fmt = params.get('format', 'json')
+    if fmt not in _STREAM_CONTENT_TYPES:
+        raise ValueError('Invalid format: %s' % fmt)
+    limit = params.get('limit')
+    limit = None if limit is None else ofctl_utils.str_to_int(limit)
+    cursor = ofctl_utils.str_to_int(params.get('cursor', 0))
+    if (limit is not None and limit < 0) or cursor < 0:
+        raise ValueError('Invalid limit or cursor')
+
+    flow = dict(flow)
+    for key in ('table_id', 'cookie', 'cookie_mask'):
+        if key in params:
+            flow[key] = params[key]
+    priority = ofctl_utils.str_to_int(flow.get('priority', -1))
+    # OpenFlow 1.0 has no cookie in flow stats requests.
+    cookie = cookie_mask = 0
+    if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+        cookie = ofctl_utils.str_to_int(flow.get('cookie', 0))
+        cookie_mask = ofctl_utils.str_to_int(flow.get('cookie_mask', 0))
+
+    future = dp.request(ofctl.flow_stats_request(dp, flow))
+
+    # The first reply is awaited before starting the response, so that
+    # the failure of the request is returned as the status.
+    replies = future.iter_replies(ofctl_utils.DEFAULT_TIMEOUT)
+    try:
+        first = [next(replies)]
+    except StopIteration:
+        first = []
+    except request.RequestTimeout as e:
+        LOG.error('%s', e)
+        future.cancel()
+        return Response(status=504)
+    except request.RequestError as e:
+        LOG.error('%s', e)
+        return Response(status=502)
+
+    def stream():
+        index = 0  # of the flow among those matching
+        end = None if limit is None else cursor + limit
+        more = False
+        error = None
+        if fmt == 'json':
+            yield six.b('{"%s": [' % dp.id)
+            sep = ''
+        try:
+            for msg in itertools.chain(first, replies):
+                flows = []
+                for stats in msg.body:
+                    if 0 <= priority != stats.priority:
+                        continue
+                    if cookie_mask and (stats.cookie ^ cookie) & cookie_mask:
+                        continue
+                    if index == end:
+                        more = True
+                        break
+                    if index >= cursor:
+                        flows.append(json.dumps(
+                            ofctl.flow_stats_to_dict(stats)))
+                    index += 1
+                if flows:
+                    if fmt == 'json':
+                        yield six.b(sep + ', '.join(flows))
+                        sep = ', '
+                    else:
+                        yield six.b('\n'.join(flows) + '\n')
+                if more:
+                    break
+        except request.RequestError as e:
+            # The response has been started; ends it with the error, so
+            # that it is not taken for the complete result.
+            LOG.error('%s', e)
+            error = str(e)
+        finally:
+            future.cancel()
+
+        if fmt == 'json':
+            tail = ']'
+            if error is not None:
+                tail += ', "error": %s' % json.dumps(error)
+            elif more:
+                tail += ', "next_cursor": %d' % end
+            yield six.b(tail + '}')
+        elif error is not None:
+            yield six.b(json.dumps({'error': error}) + '\n')
+        elif more:
+            yield six.b(json.dumps({'next_cursor': end}) + '\n')
+
+    return Response(content_type=_STREAM_CONTENT_TYPES[fmt],
+                    app_iter=stream())
+
+
+# Seconds to wait for the switches to reply to the entries sent in bulk
+BULK_TIMEOUT = 10.0
+
+_BULK_MOD_TYPES = ('flow', 'group', 'meter')
+
+
+def _mod_commands(ofp, mod_type):
+    if mod_type == 'flow':
+        return {
+            'add': ofp.OFPFC_ADD,
+            'modify': ofp.OFPFC_MODIFY,
+            'modify_strict': ofp.OFPFC_MODIFY_STRICT,
+            'delete': ofp.OFPFC_DELETE,
+            'delete_strict': ofp.OFPFC_DELETE_STRICT,
+        }
+    elif mod_type == 'meter':
+        return {
+            'add': ofp.OFPMC_ADD,
+            'modify': ofp.OFPMC_MODIFY,
+            'delete': ofp.OFPMC_DELETE,
+        }
+    else:
+        return {
+            'add': ofp.OFPGC_ADD,
+            'modify': ofp.OFPGC_MODIFY,
+            'delete': ofp.OFPGC_DELETE,
+        }
+
+
+def _to_mod(dp, ofctl, entry):
+    for mod_type in _BULK_MOD_TYPES:
+        if mod_type in entry:
+            break
+    else:
+        raise ValueError('No flow, group or meter in the entry')
+
+    cmd = entry.get('cmd', 'add')
+    mod_cmd = _mod_commands(dp.ofproto, mod_type).get(cmd)
+    if mod_cmd is None:
+        raise CommandNotFoundError(cmd=cmd)
+    to_mod = getattr(ofctl, 'to_%s_mod' % mod_type)
+    return to_mod(dp, entry[mod_type], mod_cmd)
+
+
+class _BulkBatch(object):
+    # The entries sent in bulk to a switch
+    def __init__(self, dp):
+        self.dp = dp
+        self.bundle = dp.bundle()
+        self.xids = {}  # xid of the message => index of the entry
+        self.bundle_ids = {}  # bundle id => indexes of the entries
+
+
+def mod_entries_bulk(dpset, entries, timeout=BULK_TIMEOUT):
+    """
+    Sends the entries of "POST /stats/bulk" to the switches, and waits
+    up to timeout seconds for their replies.
+    entries is an iterable of the entries, or of the JSON texts of them.
+    Returns the body of the response.
+    """
+    failed = {}
+    batches = {}
+    count = 0
+
+    def _fail(index, dpid, reason, xid=None, error=None):
+        if index in failed:
+            return
+        result = {'index': index, 'dpid': dpid, 'reason': reason}
+        if xid is not None:
+            result['xid'] = xid
+        if error is not None:
+            result['type'] = error.type
+            result['code'] = error.code
+        failed[index] = result
+
+    try:
+        for index, entry in enumerate(entries):
+            count += 1
+            dpid = None
+            try:
+                if isinstance(entry, (six.binary_type, six.text_type)):
+                    entry = json.loads(entry)
+                dpid = entry.get('dpid')
+                dp = dpset.get(int(str(dpid), 0))
+                if dp is None:
+                    raise ValueError('No such Datapath: %s' % dpid)
+                ofctl = supported_ofctl.get(dp.ofproto.OFP_VERSION)
+                if ofctl is None:
+                    raise ValueError('Unsupported OF version: %s' %
+                                     dp.ofproto.OFP_VERSION)
+                mod = _to_mod(dp, ofctl, entry)
+            except AttributeError:
+                _fail(index, dpid,
+                      'Unsupported OF request in this version')
+                continue
+            except (ValueError, TypeError, KeyError, RyuException) as e:
+                _fail(index, dpid, str(e))
+                continue
+
+            batch = batches.get(dp.id)
+            if batch is None:
+                batch = batches[dp.id] = _BulkBatch(dp)
+            try:
+                bundle_id = batch.bundle.add(mod)
+            except (ValueError, TypeError, struct.error) as e:
+                # A value out of range fails the serialization of this
+                # entry only, as the entries before have been sent.
+                _fail(index, dpid, str(e))
+                continue
+            batch.xids[mod.xid] = index
+            if bundle_id is not None:
+                batch.bundle_ids.setdefault(bundle_id, []).append(index)
+    except Exception:
+        for batch in batches.values():
+            batch.bundle.discard()
+        raise
+
+    for batch in batches.values():
+        batch.bundle.commit()
+
+    deadline = time.time() + timeout
+    for batch in batches.values():
+        completed = batch.bundle.wait(max(0, deadline - time.time()))
+        dpid = batch.dp.id
+        for msg, error in batch.bundle.errors:
+            index = batch.xids.get(msg.xid)
+            if index is not None:
+                _fail(index, dpid, 'Failed', msg.xid, error)
+                continue
+            # The bundle has failed as a whole.
+            for index in batch.bundle_ids.get(
+                    getattr(msg, 'bundle_id', None), []):
+                _fail(index, dpid, 'Bundle failed', error=error)
+        if not completed:
+            for xid, index in batch.xids.items():
+                _fail(index, dpid, 'No reply from the switch', xid)
+
+    return {'entries': count,
+            'failed': [failed[index] for index in sorted(failed)]}
+
+
 class StatsController(ControllerBase):
     def __init__(self, req, link, data, **config):
         super(StatsController, self).__init__(req, link, data, **config)
@@ -315,6 +607,8 @@ class StatsController(ControllerBase):
     @stats_method
     def get_flow_stats(self, req, dp, ofctl, **kwargs):
         flow = req.json if req.body else {}
+        if 'format' in req.GET:
+            return stream_flow_stats(dp, ofctl, flow, req.GET)
         return ofctl.get_flow_stats(dp, self.waiters, flow)
 
     @stats_method
@@ -422,14 +716,7 @@ class StatsController(ControllerBase):
 
     @command_method
     def mod_flow_entry(self, req, dp, ofctl, flow, cmd, **kwargs):
-        cmd_convert = {
-            'add': dp.ofproto.OFPFC_ADD,
-            'modify': dp.ofproto.OFPFC_MODIFY,
-            'modify_strict': dp.ofproto.OFPFC_MODIFY_STRICT,
-            'delete': dp.ofproto.OFPFC_DELETE,
-            'delete_strict': dp.ofproto.OFPFC_DELETE_STRICT,
-        }
-        mod_cmd = cmd_convert.get(cmd, None)
+        mod_cmd = _mod_commands(dp.ofproto, 'flow').get(cmd, None)
         if mod_cmd is None:
             raise CommandNotFoundError(cmd=cmd)
 
@@ -446,12 +733,7 @@ class StatsController(ControllerBase):
 
     @command_method
     def mod_meter_entry(self, req, dp, ofctl, meter, cmd, **kwargs):
-        cmd_convert = {
-            'add': dp.ofproto.OFPMC_ADD,
-            'modify': dp.ofproto.OFPMC_MODIFY,
-            'delete': dp.ofproto.OFPMC_DELETE,
-        }
-        mod_cmd = cmd_convert.get(cmd, None)
+        mod_cmd = _mod_commands(dp.ofproto, 'meter').get(cmd, None)
         if mod_cmd is None:
             raise CommandNotFoundError(cmd=cmd)
 
@@ -459,12 +741,7 @@ class StatsController(ControllerBase):
 
     @command_method
     def mod_group_entry(self, req, dp, ofctl, group, cmd, **kwargs):
-        cmd_convert = {
-            'add': dp.ofproto.OFPGC_ADD,
-            'modify': dp.ofproto.OFPGC_MODIFY,
-            'delete': dp.ofproto.OFPGC_DELETE,
-        }
-        mod_cmd = cmd_convert.get(cmd, None)
+        mod_cmd = _mod_commands(dp.ofproto, 'group').get(cmd, None)
         if mod_cmd is None:
             raise CommandNotFoundError(cmd=cmd)
 
@@ -490,6 +767,22 @@ class StatsController(ControllerBase):
 
         ofctl.mod_port_behavior(dp, port_config)
 
+    def mod_entries_bulk(self, req, **_kwargs):
+        try:
+            if req.content_type == _STREAM_CONTENT_TYPES['ndjson']:
+                entries = (line for line in req.body_file if line.strip())
+            else:
+                entries = json.loads(req.body.decode('utf-8'))
+                if not isinstance(entries, list):
+                    raise ValueError('Not an array: %s' % req.body)
+        except ValueError:
+            LOG.exception('Invalid syntax: %s', req.body)
+            return Response(status=400)
+
+        body = mod_entries_bulk(self.dpset, entries, BULK_TIMEOUT)
+        return Response(content_type='application/json',
+                        body=json.dumps(body))
+
     @command_method
     def send_experimenter(self, req, dp, ofctl, exp, **kwargs):
         ofctl.send_experimenter(dp, exp)
@@ -703,6 +996,11 @@ class RestStatsApi(app_manager.RyuApp):
                        controller=StatsController, action='mod_group_entry',
                        conditions=dict(method=['POST']))
 
+        uri = path + '/bulk'
+        mapper.connect('stats', uri,
+                       controller=StatsController, action='mod_entries_bulk',
+                       conditions=dict(method=['POST']))
+
         uri = path + '/portdesc/{cmd}'
         mapper.connect('stats', uri,
                        controller=StatsController, action='mod_port_behavior',
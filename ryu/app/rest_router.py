@@ -1048,10 +1048,7 @@ class VlanRouter(object):
     def _packetin_icmp_req(self, msg, header_list):
         # Send ICMP echo reply.
         in_port = self.ofctl.get_packetin_inport(msg)
-        self.ofctl.send_icmp(in_port, header_list, self.vlan_id,
-                             icmp.ICMP_ECHO_REPLY,
-                             icmp.ICMP_ECHO_REPLY_CODE,
-                             icmp_data=header_list[ICMP].data)
+        self.ofctl.send_icmp_echo_reply(in_port, msg.data)
 
         srcip = ip_addr_ntoa(header_list[IPV4].src)
         dstip = ip_addr_ntoa(header_list[IPV4].dst)
@@ -1583,6 +1580,23 @@ class OfCtl(object):
         self.send_packet_out(in_port, self.dp.ofproto.OFPP_IN_PORT,
                              pkt.data, data_str=str(pkt))
 
+    def send_icmp_echo_reply(self, in_port, msg_data):
+        # Turn the ICMP echo request into the reply in place
+        reply = packet.PacketRewriter(msg_data)
+        headers = reply.headers
+        eth_src, eth_dst = headers.eth_src, headers.eth_dst
+        ip_src, ip_dst = headers.ip_src, headers.ip_dst
+        reply.set_eth_src(eth_dst)
+        reply.set_eth_dst(eth_src)
+        reply.set_ip_src(ip_dst)
+        reply.set_ip_dst(ip_src)
+        reply.set_ttl(DEFAULT_TTL)
+        reply.set_icmp_type(icmp.ICMP_ECHO_REPLY, icmp.ICMP_ECHO_REPLY_CODE)
+
+        # Send packet out
+        self.send_packet_out(in_port, self.dp.ofproto.OFPP_IN_PORT,
+                             reply.data)
+
     def send_packet_out(self, in_port, output, data, data_str=None):
         actions = [self.dp.ofproto_parser.OFPActionOutput(output, 0)]
         self.dp.send_packet_out(buffer_id=UINT32_MAX, in_port=in_port,
@@ -23,6 +23,7 @@ The central management of Ryu applications.
 
 """
 
+import collections
 import inspect
 import itertools
 import logging
@@ -30,6 +31,8 @@ import sys
 import os
 import gc
 
+import six
+
 from ryu import cfg
 from ryu import utils
 from ryu.app import wsgi
@@ -44,6 +47,47 @@ LOG = logging.getLogger('ryu.base.app_manager')
 
 SERVICE_BRICKS = {}
 
+# Overflow policies of the event queue of RyuApp.
+EVENT_QUEUE_BLOCK = 'block'
+EVENT_QUEUE_DROP_NEWEST = 'drop-newest'
+EVENT_QUEUE_DROP_OLDEST = 'drop-oldest'
+EVENT_QUEUE_COALESCE = 'coalesce'
+EVENT_QUEUE_OVERFLOW_POLICIES = (EVENT_QUEUE_BLOCK,
+                                 EVENT_QUEUE_DROP_NEWEST,
+                                 EVENT_QUEUE_DROP_OLDEST,
+                                 EVENT_QUEUE_COALESCE)
+
+CONF = cfg.CONF
+CONF.register_opts([
+    cfg.ListOpt('app-event-queue-size', item_type=str, default=[],
+                help='list of RyuApp class name and event queue size pairs '
+                     'which override EVENT_QUEUE_SIZE of the application '
+                     '(default empty). e.g., "SimpleSwitch13:1024"'),
+    cfg.ListOpt('app-event-queue-overflow', item_type=str, default=[],
+                help='list of RyuApp class name and event queue overflow '
+                     'policy pairs which override EVENT_QUEUE_OVERFLOW of '
+                     'the application (default empty). The policy is one '
+                     'of %s. e.g., "SimpleMonitor13:drop-oldest"'
+                     % ', '.join(EVENT_QUEUE_OVERFLOW_POLICIES)),
+])
+
+
+def _app_opt(opt, app_name):
+    """
+    Returns the value for app_name in a list of "name:value" pairs,
+    or None if not found.
+
+    Raises ValueError if invalid format.
+    """
+    for pair in opt:
+        name, sep, value = pair.partition(':')
+        if not sep or not value:
+            raise ValueError('Invalid application name and value pair: '
+                             '"%s"' % pair)
+        if name == app_name:
+            return value
+    return None
+
 
 def lookup_service_brick(name):
     return SERVICE_BRICKS.get(name)
@@ -88,6 +132,33 @@ def require_app(app_name, api_style=False):
     LOG.debug('require_app: %s is required by %s', app_name, m.__name__)
 
 
+class _EventBatch(list):
+    """
+    A list of events queued as a single entry by RyuApp.send_events.
+    """
+    pass
+
+
+def _has_request(ev):
+    if isinstance(ev, list):
+        return any(isinstance(e, EventRequestBase) for e in ev)
+    return isinstance(ev, EventRequestBase)
+
+
+class _CoalescedEvent(object):
+    """
+    A queued event which later events with the same key replace.
+    (See EVENT_QUEUE_COALESCE)
+    """
+
+    __slots__ = ('key', 'ev', 'state')
+
+    def __init__(self, key, ev, state):
+        self.key = key
+        self.ev = ev
+        self.state = state
+
+
 class RyuApp(object):
     """
     The base class for Ryu applications.
@@ -143,6 +214,42 @@ class RyuApp(object):
     the intersection of their OFP_VERSIONS is used.
     """
 
+    EVENT_BATCH_SIZE = 64
+    """
+    The maximum number of events passed to a handler declared with
+    set_ev_cls(..., batch=True) at once.
+    """
+
+    EVENT_QUEUE_SIZE = 128
+    """
+    The maximum number of entries queued for this RyuApp, which must be
+    a positive integer.
+    Can be overridden per application by the app-event-queue-size option.
+    """
+
+    EVENT_QUEUE_OVERFLOW = EVENT_QUEUE_BLOCK
+    """
+    What to do when an event is sent to this RyuApp whose event queue
+    is full.  Can be overridden per application by the
+    app-event-queue-overflow option.
+
+    .. tabularcolumns:: |l|L|
+
+    ======================= ===============================================
+    Policy                  Description
+    ======================= ===============================================
+    EVENT_QUEUE_BLOCK       The sender waits for a free entry (default).
+    EVENT_QUEUE_DROP_NEWEST The sent event is dropped.
+    EVENT_QUEUE_DROP_OLDEST The oldest queued entry is dropped.
+    EVENT_QUEUE_COALESCE    An event replaces the queued one which has the
+                            same key (see event_coalesce_key) even if the
+                            queue is not full.  Otherwise, behaves like
+                            EVENT_QUEUE_DROP_OLDEST.
+    ======================= ===============================================
+
+    Requests (EventRequestBase) are never dropped nor coalesced.
+    """
+
     @classmethod
     def context_iteritems(cls):
         """
@@ -155,10 +262,36 @@ class RyuApp(object):
         self.name = self.__class__.__name__
         self.event_handlers = {}        # ev_cls -> handlers:list
         self.observers = {}     # ev_cls -> observer-name -> states:set
+        # Dispatch tables compiled from the above on the first lookup and
+        # discarded whenever a handler or an observer is (un)registered.
+        self._handlers_table = {}   # (ev_cls, state) -> handlers:tuple
+        self._observers_table = {}  # (ev_cls, state) -> observer-names:tuple
+        # (ev_cls, state) -> (handlers:tuple, batch-handlers:tuple)
+        self._dispatch_table = {}
         self.threads = []
         self.main_thread = None
-        self.events = hub.Queue(128)
+        size = _app_opt(cfg.CONF.app_event_queue_size, self.name)
+        try:
+            size = self.EVENT_QUEUE_SIZE if size is None else int(size, 0)
+        except ValueError:
+            raise ValueError('Invalid event queue size of %s: %s'
+                             % (self.name, size))
+        if not isinstance(size, six.integer_types) or size < 1:
+            raise ValueError('Invalid event queue size of %s: %s '
+                             '(must be a positive integer)'
+                             % (self.name, size))
+        overflow = _app_opt(cfg.CONF.app_event_queue_overflow, self.name)
+        self.event_queue_overflow = overflow or self.EVENT_QUEUE_OVERFLOW
+        if self.event_queue_overflow not in EVENT_QUEUE_OVERFLOW_POLICIES:
+            raise ValueError('Unknown event queue overflow policy: %s'
+                             % self.event_queue_overflow)
+        self.events = hub.Queue(size)
         self._events_sem = hub.BoundedSemaphore(self.events.maxsize)
+        self._events_coalesced = {}  # key -> _CoalescedEvent
+        self.events_enqueued = 0
+        self.events_dropped = 0
+        self.events_coalesced = 0
+        self.events_max_depth = 0
         if hasattr(self.__class__, 'LOGGER_NAME'):
             self.logger = logging.getLogger(self.__class__.LOGGER_NAME)
         else:
@@ -181,7 +314,7 @@ class RyuApp(object):
         if self.main_thread:
             hub.kill(self.main_thread)
         self.is_active = False
-        self._send_event(self._event_stop, None)
+        self._put_event((self._event_stop, None), 0)
         hub.joinall(self.threads)
 
     def set_main_thread(self, thread):
@@ -196,25 +329,32 @@ class RyuApp(object):
         assert callable(handler)
         self.event_handlers.setdefault(ev_cls, [])
         self.event_handlers[ev_cls].append(handler)
+        self._handlers_table.clear()
+        self._dispatch_table.clear()
 
     def unregister_handler(self, ev_cls, handler):
         assert callable(handler)
         self.event_handlers[ev_cls].remove(handler)
         if not self.event_handlers[ev_cls]:
             del self.event_handlers[ev_cls]
+        self._handlers_table.clear()
+        self._dispatch_table.clear()
 
     def register_observer(self, ev_cls, name, states=None):
         states = states or set()
         ev_cls_observers = self.observers.setdefault(ev_cls, {})
         ev_cls_observers.setdefault(name, set()).update(states)
+        self._observers_table.clear()
 
     def unregister_observer(self, ev_cls, name):
         observers = self.observers.get(ev_cls, {})
         observers.pop(name)
+        self._observers_table.clear()
 
     def unregister_observer_all_event(self, name):
         for observers in self.observers.values():
             observers.pop(name, None)
+        self._observers_table.clear()
 
     def observe_event(self, ev_cls, states=None):
         brick = _lookup_service_brick_by_ev_cls(ev_cls)
@@ -237,9 +377,13 @@ class RyuApp(object):
                       The default is None.
         """
         ev_cls = ev.__class__
-        handlers = self.event_handlers.get(ev_cls, [])
         if state is None:
-            return handlers
+            return self.event_handlers.get(ev_cls, [])
+
+        try:
+            return self._handlers_table[(ev_cls, state)]
+        except KeyError:
+            pass
 
         def test(h):
             if not hasattr(h, 'callers') or ev_cls not in h.callers:
@@ -252,14 +396,42 @@ class RyuApp(object):
                 return True
             return state in states
 
-        return filter(test, handlers)
+        handlers = tuple(filter(test, self.event_handlers.get(ev_cls, [])))
+        self._handlers_table[(ev_cls, state)] = handlers
+        return handlers
+
+    def _get_dispatch(self, ev, state):
+        # Splits the handlers into the ones called per event and the ones
+        # declared with set_ev_cls(..., batch=True).
+        key = (ev.__class__, state)
+        try:
+            return self._dispatch_table[key]
+        except KeyError:
+            pass
+
+        handlers = []
+        batch_handlers = []
+        for h in self.get_handlers(ev, state):
+            caller = getattr(h, 'callers', {}).get(ev.__class__)
+            if caller is not None and caller.batch:
+                batch_handlers.append(h)
+            else:
+                handlers.append(h)
+        dispatch = (tuple(handlers), tuple(batch_handlers))
+        self._dispatch_table[key] = dispatch
+        return dispatch
 
     def get_observers(self, ev, state):
-        observers = []
-        for k, v in self.observers.get(ev.__class__, {}).items():
-            if not state or not v or state in v:
-                observers.append(k)
+        key = (ev.__class__, state)
+        try:
+            return self._observers_table[key]
+        except KeyError:
+            pass
 
+        observers = tuple(k for k, v in self.observers.get(ev.__class__,
+                                                           {}).items()
+                          if not state or not v or state in v)
+        self._observers_table[key] = observers
         return observers
 
     def send_request(self, req):
@@ -278,29 +450,171 @@ class RyuApp(object):
         # going to sleep for the reply
         return req.reply_q.get()
 
+    def _get_event(self, pending, block=True):
+        # Returns the next (ev, state).  Batches queued by send_events are
+        # unpacked into pending.
+        if pending:
+            return pending.popleft()
+        ev, state = self.events.get(block=block)
+        self._events_sem.release()
+        if isinstance(ev, _EventBatch):
+            pending.extend((e, state) for e in ev)
+            return pending.popleft()
+        if isinstance(ev, _CoalescedEvent):
+            del self._events_coalesced[ev.key]
+            return ev.ev, ev.state
+        return ev, state
+
+    def _call_handler(self, handler, ev, ev_cls):
+        try:
+            handler(ev)
+        except hub.TaskExit:
+            # Normal exit.
+            # Propagate upwards, so we leave the event loop.
+            raise
+        except:
+            LOG.exception('%s: Exception occurred during handler processing. '
+                          'Backtrace from offending handler '
+                          '[%s] servicing event [%s] follows.',
+                          self.name, handler.__name__, ev_cls.__name__)
+
     def _event_loop(self):
-        while self.is_active or not self.events.empty():
-            ev, state = self.events.get()
-            self._events_sem.release()
+        pending = collections.deque()
+        while self.is_active or not self.events.empty() or pending:
+            ev, state = self._get_event(pending)
             if ev == self._event_stop:
                 continue
-            handlers = self.get_handlers(ev, state)
-            for handler in handlers:
+            ev_cls = ev.__class__
+            handlers, batch_handlers = self._get_dispatch(ev, state)
+            if not batch_handlers:
+                for handler in handlers:
+                    self._call_handler(handler, ev, ev_cls)
+                continue
+
+            # Collect the events of the same class queued back to back.
+            evs = [ev]
+            while len(evs) < self.EVENT_BATCH_SIZE:
                 try:
-                    handler(ev)
-                except hub.TaskExit:
-                    # Normal exit.
-                    # Propagate upwards, so we leave the event loop.
-                    raise
-                except:
-                    LOG.exception('%s: Exception occurred during handler processing. '
-                                  'Backtrace from offending handler '
-                                  '[%s] servicing event [%s] follows.',
-                                  self.name, handler.__name__, ev.__class__.__name__)
+                    ev, state_ = self._get_event(pending, block=False)
+                except hub.QueueEmpty:
+                    break
+                if ev.__class__ is not ev_cls or state_ != state:
+                    pending.appendleft((ev, state_))
+                    break
+                evs.append(ev)
+
+            for ev in evs:
+                for handler in handlers:
+                    self._call_handler(handler, ev, ev_cls)
+            for handler in batch_handlers:
+                self._call_handler(handler, evs, ev_cls)
+
+    def _put_event(self, entry, count):
+        self._events_sem.acquire()
+        self.events.put(entry)
+        self._count_enqueued(count)
+
+    def _count_enqueued(self, count):
+        self.events_enqueued += count
+        depth = self.events.qsize()
+        if depth > self.events_max_depth:
+            self.events_max_depth = depth
+
+    def _count_dropped(self, entry):
+        ev, _state = entry
+        if isinstance(ev, _EventBatch):
+            count = len(ev)
+        elif isinstance(ev, _CoalescedEvent):
+            del self._events_coalesced[ev.key]
+            count = 1
+        elif ev == self._event_stop:
+            count = 0
+        else:
+            count = 1
+        self.events_dropped += count
+        if count:
+            LOG.debug('%s: event queue overflow, %d events dropped',
+                      self.name, count)
+
+    def _enqueue(self, entry, count):
+        if self.event_queue_overflow == EVENT_QUEUE_BLOCK:
+            self._put_event(entry, count)
+            return
+        if self._events_sem.acquire(blocking=False):
+            self.events.put(entry)
+            self._count_enqueued(count)
+            return
+
+        # The queue is full.
+        if self.event_queue_overflow == EVENT_QUEUE_DROP_NEWEST:
+            self._count_dropped(entry)
+            return
+        try:
+            oldest = self.events.get(block=False)
+        except hub.QueueEmpty:
+            # The event loop has just taken the last entry.
+            self._put_event(entry, count)
+            return
+        if _has_request(oldest[0]):
+            # Never drop a request.  Drop the new one instead, but keep
+            # the taken request at the tail, which is the best we can do.
+            self.events.put(oldest)
+            self._count_dropped(entry)
+            return
+        self._count_dropped(oldest)
+        # Reuse the entry of the dropped one.
+        self.events.put(entry)
+        self._count_enqueued(count)
 
     def _send_event(self, ev, state):
-        self._events_sem.acquire()
-        self.events.put((ev, state))
+        if isinstance(ev, EventRequestBase):
+            self._put_event((ev, state), 1)
+            return
+        if self.event_queue_overflow == EVENT_QUEUE_COALESCE:
+            key = self.event_coalesce_key(ev)
+            if key is not None:
+                coalesced = self._events_coalesced.get(key)
+                if coalesced is not None:
+                    coalesced.ev = ev
+                    coalesced.state = state
+                    self.events_coalesced += 1
+                    return
+                coalesced = _CoalescedEvent(key, ev, state)
+                self._events_coalesced[key] = coalesced
+                self._enqueue((coalesced, None), 1)
+                return
+        self._enqueue((ev, state), 1)
+
+    def _send_events(self, evs, state):
+        if _has_request(evs):
+            self._put_event((_EventBatch(evs), state), len(evs))
+        else:
+            self._enqueue((_EventBatch(evs), state), len(evs))
+
+    def event_coalesce_key(self, ev):
+        """
+        Returns a hashable key of the given event for EVENT_QUEUE_COALESCE,
+        or None if the event should not be coalesced.
+
+        A queued event is replaced with a later one which has the same key.
+        The default implementation returns None.  Override this to coalesce,
+        e.g., the stats replies or the port status of the same datapath.
+        """
+        return None
+
+    def get_event_stats(self):
+        """
+        Returns a dict of counters of the event queue of this RyuApp.
+        """
+        return {
+            'queue_size': self.events.maxsize,
+            'overflow': self.event_queue_overflow,
+            'depth': self.events.qsize(),
+            'max_depth': self.events_max_depth,
+            'enqueued': self.events_enqueued,
+            'dropped': self.events_dropped,
+            'coalesced': self.events_coalesced,
+        }
 
     def send_event(self, name, ev, state=None):
         """
@@ -317,6 +631,28 @@ class RyuApp(object):
             LOG.debug("EVENT LOST %s->%s %s",
                       self.name, name, ev.__class__.__name__)
 
+    def send_events(self, name, evs, state=None):
+        """
+        Send the specified list of events to the RyuApp instance specified
+        by name.
+
+        The events are queued as a single entry, so that sending a burst
+        of events costs one slot of the event queue of the receiver.
+        """
+
+        if not evs:
+            return
+        if name in SERVICE_BRICKS:
+            for ev in evs:
+                if isinstance(ev, EventRequestBase):
+                    ev.src = self.name
+            LOG.debug("EVENTS %s->%s %d events",
+                      self.name, name, len(evs))
+            SERVICE_BRICKS[name]._send_events(evs, state)
+        else:
+            LOG.debug("EVENTS LOST %s->%s %d events",
+                      self.name, name, len(evs))
+
     def send_event_to_observers(self, ev, state=None):
         """
         Send the specified event to all observers of this RyuApp.
@@ -507,6 +843,7 @@ class AppManager(object):
     def instantiate_apps(self, *args, **kwargs):
         for app_name, cls in self.applications_cls.items():
             self._instantiate(app_name, cls, *args, **kwargs)
+        ofproto_protocol.load_app_supported_versions()
 
         self._update_bricks()
         self.report_bricks()
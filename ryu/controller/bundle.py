@@ -0,0 +1,279 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched modification of the tables of a switch.
+
+Usage Example::
+
+    with datapath.bundle() as b:
+        for mod in flow_mods:
+            b.add(mod)
+    # The bundle has been committed, but the commit may not be
+    # completed yet.
+    if not b.wait(timeout=10):
+        LOG.error('bundle timed out')
+    for msg, error in b.errors:
+        LOG.error('%s failed: %s', msg, error)
+
+With OpenFlow 1.4 and later, the messages are added to OpenFlow bundles,
+which are committed atomically (OFPBF_ATOMIC) and in order
+(OFPBF_ORDERED) by default.  Large batches are split into several
+bundles of up to max_msgs messages or about max_bytes bytes, each of
+which is committed as soon as it is full; so only each of them is
+atomic.
+
+With older OpenFlow versions, which have no bundles, the messages are
+sent as they are added, and the batches are delimited by barrier
+requests instead.  The messages are not atomic, and a failed message
+does not prevent the others from being applied.
+"""
+
+import itertools
+import logging
+
+from ryu.controller import request
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_4
+
+
+LOG = logging.getLogger('ryu.controller.bundle')
+
+DEFAULT_MAX_MSGS = 4096
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+_bundle_ids = itertools.count(1)
+
+
+class _Batch(object):
+    def __init__(self, bundle_id):
+        self.bundle_id = bundle_id
+        self.xids = []  # of the messages whose replies are awaited
+        self.msgs = []  # added messages
+        self.size = 0
+        self.committed = False
+        self.failed = False
+
+
+class Bundle(request.ReplyHandler):
+    """
+    A batch of modification messages to a switch.  Usually created with
+    Datapath.bundle().
+
+    =============== ========================================================
+    Attribute       Description
+    =============== ========================================================
+    datapath        The datapath the messages are sent to
+    use_bundles     True if OpenFlow bundles are used; False if the batches
+                    are delimited by barrier requests
+    errors          List of tuples of a message which failed and the error
+                    message (OFPErrorMsg) the switch replied to it with.
+                    The message is the added message if it failed; else the
+                    bundle control message, e.g. the commit request.
+    connection_lost True if the connection to the switch has been closed
+                    before all the replies have been received.  The batches
+                    not replied to yet are then regarded as failed.
+    =============== ========================================================
+    """
+
+    def __init__(self, datapath, flags=None, max_msgs=DEFAULT_MAX_MSGS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        super(Bundle, self).__init__()
+        self.datapath = datapath
+        ofp = datapath.ofproto
+        self.use_bundles = ofp.OFP_VERSION >= ofproto_v1_4.OFP_VERSION
+        if flags is None and self.use_bundles:
+            flags = ofp.OFPBF_ATOMIC | ofp.OFPBF_ORDERED
+        self.flags = flags
+        self.max_msgs = max_msgs
+        self.max_bytes = max_bytes
+        self.errors = []
+        self.connection_lost = False
+        self._batch = None
+        self._sent = {}  # xid => (batch, message, ends the batch)
+        self._pending = 0
+        self._done = hub.Event()
+        self._done.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def _send(self, batch, msg, sent=None, end=False):
+        # The handler is registered before sending, as send_msg may yield.
+        dp = self.datapath
+        dp.set_xid(msg)
+        self._sent[msg.xid] = (batch, sent or msg, end)
+        dp.reply_handlers[msg.xid] = self
+        batch.xids.append(msg.xid)
+        try:
+            sent = dp.send_msg(msg)
+        except Exception:
+            # e.g. a value out of range fails the serialization; nothing
+            # has been sent.
+            del self._sent[msg.xid]
+            del dp.reply_handlers[msg.xid]
+            batch.xids.remove(msg.xid)
+            raise
+        if not sent:
+            batch.failed = True
+            if end:
+                self._complete(batch)
+
+    def _ctrl(self, batch, type_):
+        dp = self.datapath
+        return dp.ofproto_parser.OFPBundleCtrlMsg(
+            dp, batch.bundle_id, type_, self.flags, [])
+
+    def _open(self):
+        batch = _Batch(next(_bundle_ids) & 0xffffffff)
+        if self.use_bundles:
+            ofp = self.datapath.ofproto
+            self._send(batch, self._ctrl(batch, ofp.OFPBCT_OPEN_REQUEST))
+        self._batch = batch
+        self._pending += 1
+        self._done.clear()
+        return batch
+
+    def add(self, msg):
+        """
+        Adds a modification message, e.g. OFPFlowMod, to the batch.
+
+        The message is sent to the switch right away.  Once the batch
+        reaches max_msgs messages or max_bytes bytes, it is committed and
+        the next message starts a new one.
+
+        Returns the id of the OpenFlow bundle the message has been added
+        to, which the bundle control messages in errors have, or None
+        without OpenFlow bundles.
+        """
+        batch = self._batch or self._open()
+        dp = self.datapath
+        if self.use_bundles:
+            add = dp.ofproto_parser.OFPBundleAddMsg(
+                dp, batch.bundle_id, self.flags, msg, [])
+            self._send(batch, add, sent=msg)
+            batch.size += len(add.buf)
+        else:
+            self._send(batch, msg)
+            batch.size += len(msg.buf)
+        batch.msgs.append(msg)
+        if len(batch.msgs) >= self.max_msgs or batch.size >= self.max_bytes:
+            self.commit()
+        return batch.bundle_id if self.use_bundles else None
+
+    def commit(self):
+        """
+        Commits the current batch, if any, without waiting for
+        the switch.  See wait().
+        """
+        batch = self._batch
+        if batch is None:
+            return
+        self._batch = None
+        dp = self.datapath
+        batch.committed = True
+        if self.use_bundles:
+            msg = self._ctrl(batch, dp.ofproto.OFPBCT_COMMIT_REQUEST)
+        else:
+            msg = dp.ofproto_parser.OFPBarrierRequest(dp)
+        self._send(batch, msg, end=True)
+
+    def discard(self):
+        """
+        Discards the current batch, if any.  Without OpenFlow bundles,
+        the messages have already been applied and are not undone.
+        """
+        batch = self._batch
+        if batch is None:
+            return
+        self._batch = None
+        dp = self.datapath
+        if self.use_bundles:
+            msg = self._ctrl(batch, dp.ofproto.OFPBCT_DISCARD_REQUEST)
+        else:
+            msg = dp.ofproto_parser.OFPBarrierRequest(dp)
+        self._send(batch, msg, end=True)
+
+    def __call__(self, msg):
+        # Called by the receive loop of the datapath with the replies.
+        entry = self._sent.get(msg.xid)
+        if entry is None:
+            return
+        batch, sent, end = entry
+        if isinstance(msg, self.datapath.ofproto_parser.OFPErrorMsg):
+            LOG.debug('BUNDLE: %s failed: %s', sent, msg)
+            self.errors.append((sent, msg))
+            batch.failed = True
+            if end:
+                self._complete(batch)
+        elif end:
+            # commit, discard or barrier reply
+            self._complete(batch)
+
+    def disconnected(self):
+        # Called by the datapath when the connection is closed.  The
+        # batches still open or waiting for replies will never complete.
+        self.connection_lost = True
+        self._batch = None
+        batches = []
+        for batch, _sent, _end in self._sent.values():
+            if not any(b is batch for b in batches):
+                batches.append(batch)
+        for batch in batches:
+            batch.failed = True
+            self._complete(batch)
+
+    def _complete(self, batch):
+        dp = self.datapath
+        for xid in batch.xids:
+            del self._sent[xid]
+            dp.reply_handlers.pop(xid, None)
+        if self.use_bundles and batch.committed and not batch.failed:
+            # The messages have bypassed send_msg_hooks while being added.
+            for msg in batch.msgs:
+                for hook in dp.send_msg_hooks:
+                    hook(dp, msg)
+        self._pending -= 1
+        if not self._pending:
+            self._done.set()
+
+    @property
+    def completed(self):
+        """
+        True if the switch has replied to all the batches committed or
+        discarded.
+        """
+        return self._done.is_set()
+
+    @property
+    def failed(self):
+        """
+        True if any message has failed, or the connection has been closed
+        before all the replies have been received.
+        """
+        return bool(self.errors) or self.connection_lost
+
+    def wait(self, timeout=None):
+        """
+        Waits until the switch has replied to all the batches committed
+        or discarded.  Returns False on timeout.
+        """
+        return self._done.wait(timeout)
@@ -25,6 +25,8 @@ The main component of OpenFlow controller.
 import contextlib
 import logging
 import random
+import struct
+import time
 from socket import IPPROTO_TCP
 from socket import TCP_NODELAY
 from socket import SHUT_WR
@@ -32,6 +34,7 @@ from socket import timeout as SocketTimeout
 import ssl
 
 from ryu import cfg
+from ryu import utils
 from ryu.lib import hub
 from ryu.lib.hub import StreamServer
 
@@ -43,8 +46,12 @@ from ryu.ofproto import ofproto_protocol
 from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import nx_match
 
+from ryu.controller import bundle
 from ryu.controller import ofp_event
-from ryu.controller.handler import HANDSHAKE_DISPATCHER, DEAD_DISPATCHER
+from ryu.controller import request
+from ryu.controller import worker
+from ryu.controller.handler import HANDSHAKE_DISPATCHER, CONFIG_DISPATCHER
+from ryu.controller.handler import DEAD_DISPATCHER
 
 from ryu.lib.dpid import dpid_to_str
 from ryu.lib import ip
@@ -53,6 +60,16 @@ LOG = logging.getLogger('ryu.controller.controller')
 
 DEFAULT_OFP_HOST = '0.0.0.0'
 DEFAULT_OFP_SW_CON_INTERVAL = 1
+DEFAULT_OFP_RECV_BUFFER_SIZE = 64 * 1024
+DEFAULT_OFP_SEND_BATCH_BYTES = 64 * 1024
+DEFAULT_OFP_SEND_BATCH_MSGS = 256
+DEFAULT_OFP_SEND_BATCH_LINGER = 0
+DEFAULT_OFP_SEND_QUEUE_SIZE = 16
+DEFAULT_OFP_SEND_QUEUE_MAX_SIZE = 4096
+
+# Minimum interval, in seconds, between two shrinks of an adaptive send
+# queue.
+SEND_QUEUE_SHRINK_INTERVAL = 5.0
 
 CONF = cfg.CONF
 CONF.register_cli_opts([
@@ -74,6 +91,13 @@ CONF.register_cli_opts([
                default=DEFAULT_OFP_SW_CON_INTERVAL,
                help='interval in seconds to connect to switches '
                     '(default %d)' % DEFAULT_OFP_SW_CON_INTERVAL),
+    cfg.IntOpt('ofp-workers', default=0, min=0,
+               help='number of worker processes among which the switch '
+                    'connections are distributed. 0 runs everything in '
+                    'a single process (default 0)'),
+    cfg.BoolOpt('ofp-worker-by-dpid', default=False,
+                help='move each switch connection to the worker process '
+                     'picked by its datapath ID after the FeaturesReply'),
 ])
 CONF.register_opts([
     cfg.FloatOpt('socket-timeout',
@@ -85,7 +109,53 @@ CONF.register_opts([
     cfg.IntOpt('maximum-unreplied-echo-requests',
                default=0,
                min=0,
-               help='Maximum number of unreplied echo requests before datapath is disconnected.')
+               help='Maximum number of unreplied echo requests before datapath is disconnected.'),
+    cfg.IntOpt('ofp-recv-buffer-size',
+               default=DEFAULT_OFP_RECV_BUFFER_SIZE,
+               min=ofproto_common.OFP_HEADER_SIZE,
+               help='Initial size, in bytes, of the receive buffer of each '
+                    'datapath. The buffer grows when a message does not fit '
+                    '(default %d)' % DEFAULT_OFP_RECV_BUFFER_SIZE),
+    cfg.BoolOpt('ofp-lazy-parse', default=False,
+                help='Parse the match, instructions and multipart body of '
+                     'received OpenFlow 1.3, 1.4 and 1.5 messages on the '
+                     'first access to them rather than on receipt'),
+    cfg.IntOpt('ofp-send-batch-bytes',
+               default=DEFAULT_OFP_SEND_BATCH_BYTES,
+               min=0,
+               help='Maximum number of bytes of queued messages coalesced '
+                    'into a single write to a datapath. 0 disables '
+                    'coalescing (default %d)' % DEFAULT_OFP_SEND_BATCH_BYTES),
+    cfg.IntOpt('ofp-send-batch-msgs',
+               default=DEFAULT_OFP_SEND_BATCH_MSGS,
+               min=1, max=hub.SENDMSG_MAX_BUFFERS,
+               help='Maximum number of queued messages coalesced into a '
+                    'single write to a datapath '
+                    '(default %d)' % DEFAULT_OFP_SEND_BATCH_MSGS),
+    cfg.IntOpt('ofp-send-batch-linger',
+               default=DEFAULT_OFP_SEND_BATCH_LINGER,
+               min=0,
+               help='Time, in microseconds, to wait for more messages before '
+                    'writing a batch which is not full yet '
+                    '(default %d)' % DEFAULT_OFP_SEND_BATCH_LINGER),
+    cfg.IntOpt('ofp-send-queue-size',
+               default=DEFAULT_OFP_SEND_QUEUE_SIZE,
+               min=1,
+               help='Number of messages which can be queued to send to a '
+                    'datapath before the sender blocks '
+                    '(default %d)' % DEFAULT_OFP_SEND_QUEUE_SIZE),
+    cfg.ListOpt('ofp-send-queue-size-per-dpid', item_type=str, default=[],
+                help='list of datapath ID and send queue size pairs which '
+                     'override ofp-send-queue-size (default empty). '
+                     'e.g., "0000000000000001:1024,2:256"'),
+    cfg.BoolOpt('ofp-send-queue-adaptive', default=False,
+                help='Grow the send queue of a datapath under sustained '
+                     'backpressure and shrink it back when idle'),
+    cfg.IntOpt('ofp-send-queue-max-size',
+               default=DEFAULT_OFP_SEND_QUEUE_MAX_SIZE,
+               min=1,
+               help='Upper limit of an adaptive send queue '
+                    '(default %d)' % DEFAULT_OFP_SEND_QUEUE_MAX_SIZE),
 ])
 
 
@@ -121,6 +191,71 @@ def _split_addr(addr):
     return addr, int(port, 0)
 
 
+def _split_send_queue_size(pair):
+    """
+    Splits a str of datapath ID and send queue size pair into (dpid, size).
+
+    Example::
+
+        >>> _split_send_queue_size('0000000000000001:1024')
+        (1, 1024)
+
+    Raises ValueError if invalid format or the size is not positive.
+    """
+    e = ValueError('Invalid datapath ID and queue size pair: "%s"' % pair)
+    pair = pair.rsplit(':', 1)
+    if len(pair) != 2:
+        raise e
+
+    dpid, size = pair
+    try:
+        dpid, size = int(dpid, 16), int(size, 0)
+    except ValueError:
+        raise e
+    if size < 1:
+        raise e
+    return dpid, size
+
+
+@utils.lru_cache(1)
+def _send_queue_sizes(pairs):
+    """
+    Returns a dict of datapath IDs to send queue sizes parsed from
+    the pairs of ofp-send-queue-size-per-dpid.
+
+    Raises ValueError if any pair is invalid.
+    """
+    return dict(_split_send_queue_size(pair) for pair in pairs)
+
+
+def _send_queue_size(dpid=None):
+    """
+    Returns the configured send queue size for the given datapath ID.
+    """
+    if dpid is not None:
+        sizes = _send_queue_sizes(tuple(CONF.ofp_send_queue_size_per_dpid))
+        return sizes.get(dpid, CONF.ofp_send_queue_size)
+    return CONF.ofp_send_queue_size
+
+
+def _ssl_args():
+    """
+    Returns a dict of the arguments of ssl.wrap_socket() for the switch
+    connections, or an empty dict if SSL is not configured.
+    """
+    if CONF.ctl_privkey is None or CONF.ctl_cert is None:
+        return {}
+    ssl_args = {
+        'keyfile': CONF.ctl_privkey,
+        'certfile': CONF.ctl_cert,
+        'ssl_version': ssl.PROTOCOL_TLSv1,
+    }
+    if CONF.ca_certs is not None:
+        ssl_args['cert_reqs'] = ssl.CERT_REQUIRED
+        ssl_args['ca_certs'] = CONF.ca_certs
+    return ssl_args
+
+
 class OpenFlowController(object):
     def __init__(self):
         super(OpenFlowController, self).__init__()
@@ -129,13 +264,19 @@ class OpenFlowController(object):
             self.ofp_ssl_listen_port = ofproto_common.OFP_SSL_PORT
             # For the backward compatibility, we spawn a server loop
             # listening on the old OpenFlow listen port 6633.
-            hub.spawn(self.server_loop,
-                      ofproto_common.OFP_TCP_PORT_OLD,
-                      ofproto_common.OFP_SSL_PORT_OLD)
+            # In the multi-process mode, the parent process listens on it.
+            if not CONF.ofp_workers:
+                hub.spawn(self.server_loop,
+                          ofproto_common.OFP_TCP_PORT_OLD,
+                          ofproto_common.OFP_SSL_PORT_OLD)
         else:
             self.ofp_tcp_listen_port = CONF.ofp_tcp_listen_port
             self.ofp_ssl_listen_port = CONF.ofp_ssl_listen_port
 
+        # Validates the per datapath send queue sizes on start up rather
+        # than when a datapath with an invalid entry connects.
+        _send_queue_sizes(tuple(CONF.ofp_send_queue_size_per_dpid))
+
         # Example:
         # self._clients = {
         #     ('127.0.0.1', 6653): <instance of StreamClient>,
@@ -145,12 +286,18 @@ class OpenFlowController(object):
     # entry point
     def __call__(self):
         # LOG.debug('call')
-        for address in CONF.ofp_switch_address_list:
-            addr = tuple(_split_addr(address))
-            self.spawn_client_loop(addr)
-
-        self.server_loop(self.ofp_tcp_listen_port,
-                         self.ofp_ssl_listen_port)
+        if worker.is_primary():
+            for address in CONF.ofp_switch_address_list:
+                addr = tuple(_split_addr(address))
+                self.spawn_client_loop(addr)
+
+        if CONF.ofp_workers:
+            # The parent process accepts the connections and hands them
+            # over to this worker process.
+            worker.serve_connections()
+        else:
+            self.server_loop(self.ofp_tcp_listen_port,
+                             self.ofp_ssl_listen_port)
 
     def spawn_client_loop(self, addr, interval=None):
         interval = interval or CONF.ofp_switch_connect_interval
@@ -164,23 +311,12 @@ class OpenFlowController(object):
             client.stop()
 
     def server_loop(self, ofp_tcp_listen_port, ofp_ssl_listen_port):
-        if CONF.ctl_privkey is not None and CONF.ctl_cert is not None:
-            if CONF.ca_certs is not None:
-                server = StreamServer((CONF.ofp_listen_host,
-                                       ofp_ssl_listen_port),
-                                      datapath_connection_factory,
-                                      keyfile=CONF.ctl_privkey,
-                                      certfile=CONF.ctl_cert,
-                                      cert_reqs=ssl.CERT_REQUIRED,
-                                      ca_certs=CONF.ca_certs,
-                                      ssl_version=ssl.PROTOCOL_TLSv1)
-            else:
-                server = StreamServer((CONF.ofp_listen_host,
-                                       ofp_ssl_listen_port),
-                                      datapath_connection_factory,
-                                      keyfile=CONF.ctl_privkey,
-                                      certfile=CONF.ctl_cert,
-                                      ssl_version=ssl.PROTOCOL_TLSv1)
+        ssl_args = _ssl_args()
+        if ssl_args:
+            server = StreamServer((CONF.ofp_listen_host,
+                                   ofp_ssl_listen_port),
+                                  datapath_connection_factory,
+                                  **ssl_args)
         else:
             server = StreamServer((CONF.ofp_listen_host,
                                    ofp_tcp_listen_port),
@@ -190,6 +326,95 @@ class OpenFlowController(object):
         server.serve_forever()
 
 
+class _RecvBuffer(object):
+    """
+    A reusable receive buffer for a switch connection.
+
+    Data is read with socket.recv_into() into a preallocated bytearray and
+    complete messages are handed out as memoryview slices of it, so that
+    nothing is copied until a parser takes what it keeps.  The unconsumed
+    bytes (at most one partial message) are moved to the head of the buffer
+    only when the free space at the tail runs out, and the buffer is
+    reallocated with a doubled size when a single message does not fit.
+    """
+
+    def __init__(self, size):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # offset of the first unconsumed byte
+        self._end = 0  # offset just past the last received byte
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def _reserve(self, size):
+        # Make room for at least size more bytes at the tail.
+        if len(self._buf) - self._end >= size:
+            return
+        data_len = self._end - self._start
+        capacity = len(self._buf)
+        while capacity < data_len + size:
+            capacity *= 2
+        if capacity == len(self._buf):
+            # The source and destination may overlap, take a copy of the
+            # partial message first.
+            self._buf[:data_len] = self._view[self._start:self._end].tobytes()
+        else:
+            buf = bytearray(capacity)
+            buf[:data_len] = self._view[self._start:self._end]
+            self._buf = buf
+            self._view = memoryview(buf)
+        self._start = 0
+        self._end = data_len
+
+    def recv_into(self, sock, min_len):
+        """
+        Receive as much as fits into the buffer, making room for at least
+        min_len bytes beforehand.  Returns the number of bytes received.
+        """
+        self._reserve(min_len)
+        ret = sock.recv_into(self._view[self._end:])
+        self._end += ret
+        return ret
+
+    def header(self):
+        """
+        Unpack the OpenFlow header at the head of the buffer.
+        """
+        return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR,
+                                  self._buf, self._start)
+
+    def extend(self, data):
+        """
+        Append data received by other means, e.g. handed over from
+        another process.
+        """
+        self._reserve(len(data))
+        self._buf[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def tobytes(self):
+        """
+        Returns a copy of the unconsumed bytes.
+        """
+        return self._view[self._start:self._end].tobytes()
+
+    def consume(self, size):
+        """
+        Returns a memoryview of the next size bytes and discards them from
+        the buffer.  The view is valid until the next call of recv_into().
+        """
+        start = self._start
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+        return self._view[start:start + size]
+
+
 def _deactivate(method):
     def deactivate(self):
         try:
@@ -249,11 +474,31 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     send_delete_all_flows                deprecated
     send_barrier                         Queue an OpenFlow barrier message to
                                          send to the switch.
+    get_send_stats(self)                 Return a dict of counters of the
+                                         batched writes and the send queue
+                                         of the switch.
+    set_send_queue_size(self, size)      Change the number of messages which
+                                         can be queued to send to the switch.
+    request(self, msg, timeout=None)     Send a request message and return
+                                         a ryu.controller.request.ReplyFuture
+                                         resolved with the reply, or all the
+                                         replies of a multipart reply.
+    bundle(self, ...)                    Return a ryu.controller.bundle.Bundle
+                                         to send a batch of modification
+                                         messages to the switch.
+    send_msg_hooks                       A list of callables which are called
+                                         with the datapath and the message for
+                                         every message queued by send_msg.
+                                         Shared by all datapaths.
     send_nxt_set_flow_format             deprecated
     is_reserved_port                     deprecated
     ==================================== ======================================
     """
 
+    # Callables called with (datapath, msg) for every message queued by
+    # send_msg, e.g. to mirror the flow tables.  (See flow_mirror)
+    send_msg_hooks = []
+
     def __init__(self, socket, address):
         super(Datapath, self).__init__()
 
@@ -263,24 +508,74 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.address = address
         self.is_active = True
 
-        # The limit is arbitrary. We need to limit queue size to
-        # prevent it from eating memory up.
-        self.send_q = hub.Queue(16)
-        self._send_q_sem = hub.BoundedSemaphore(self.send_q.maxsize)
+        # A callable which may hand the connection over to another process
+        # before a message is dispatched.  (See ryu.controller.worker)
+        self.handoff = None
+        self.handed_off = False
+
+        # We need to limit queue size to prevent it from eating memory up.
+        # The limit is enforced by _send_q_sem rather than by send_q itself
+        # so that it can be changed at run time.  (See set_send_queue_size)
+        self.send_q = hub.Queue()
+        self.send_q_size = self.send_q_base_size = _send_queue_size()
+        self._send_q_sem = hub.Semaphore(self.send_q_size)
+        # Number of slots to withdraw instead of releasing them after
+        # the queue has been shrunk.
+        self._send_q_withdraw = 0
+        self.send_q_adaptive = CONF.ofp_send_queue_adaptive
+        self.send_q_max_size = max(CONF.ofp_send_queue_max_size,
+                                   self.send_q_size)
+        self._send_q_last_adapt = time.time()
+        self._send_q_blocked = 0  # blocked sends since the last adaptation
+        self._send_q_adapt_high_water = 0
+        self.send_q_high_water = 0
+        self.send_q_blocked_time = 0.0
+
+        # Flush policy of the coalescing send loop.
+        self.send_batch_bytes = CONF.ofp_send_batch_bytes
+        self.send_batch_msgs = CONF.ofp_send_batch_msgs
+        self.send_batch_linger = CONF.ofp_send_batch_linger / 1000000.0
+        self.sent_batches = 0
+        self.sent_msgs = 0
+        self.sent_bytes = 0
 
         self.echo_request_interval = CONF.echo_request_interval
         self.max_unreplied_echo_requests = CONF.maximum_unreplied_echo_requests
         self.unreplied_echo_requests = []
 
+        # xid => callable called with the messages received with the xid,
+        # before they are dispatched as events.  Those deriving from
+        # request.ReplyHandler are notified when the connection is closed.
+        # (See bundle and request)
+        self.reply_handlers = {}
+
+        self._recv_buf = _RecvBuffer(CONF.ofp_recv_buffer_size)
+        self.lazy_parse = CONF.ofp_lazy_parse
         self.xid = random.randint(0, self.ofproto.MAX_XID)
-        self.id = None  # datapath_id is unknown yet
+        self._id = None  # datapath_id is unknown yet
         self._ports = None
         self.flow_format = ofproto_v1_0.NXFF_OPENFLOW10
         self.ofp_brick = ryu.base.app_manager.lookup_service_brick('ofp_event')
         self.state = None  # for pylint
         self.set_state(HANDSHAKE_DISPATCHER)
 
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, dpid):
+        self._id = dpid
+        size = _send_queue_size(dpid)
+        if size != self.send_q_base_size:
+            self.send_q_base_size = size
+            self.send_q_max_size = max(self.send_q_max_size, size)
+            self.set_send_queue_size(size)
+
     def _close_write(self):
+        if self.handed_off:
+            # The connection is alive in another process.
+            return
         # Note: Close only further sends in order to wait for the switch to
         # disconnect this connection.
         try:
@@ -292,6 +587,16 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.set_state(DEAD_DISPATCHER)
         self._close_write()
 
+    def resume(self, version, data):
+        """
+        Resume a connection handed over from another process, whose
+        OpenFlow version has been negotiated there.  data is the received
+        but not yet dispatched bytes, starting with the FeaturesReply.
+        """
+        self.set_version(version)
+        self._recv_buf.extend(data)
+        self.set_state(CONFIG_DISPATCHER)
+
     def set_state(self, state):
         if self.state == state:
             return
@@ -303,32 +608,15 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     # Low level socket handling layer
     @_deactivate
     def _recv_loop(self):
-        buf = bytearray()
+        buf = self._recv_buf
         count = 0
         min_read_len = remaining_read_len = ofproto_common.OFP_HEADER_SIZE
 
         while self.state != DEAD_DISPATCHER:
-            try:
-                read_len = min_read_len
-                if remaining_read_len > min_read_len:
-                    read_len = remaining_read_len
-                ret = self.socket.recv(read_len)
-            except SocketTimeout:
-                continue
-            except ssl.SSLError:
-                # eventlet throws SSLError (which is a subclass of IOError)
-                # on SSL socket read timeout; re-try the loop in this case.
-                continue
-            except (EOFError, IOError):
-                break
-
-            if not ret:
-                break
-
-            buf += ret
+            # Messages may have been buffered beforehand. (See resume)
             buf_len = len(buf)
             while buf_len >= min_read_len:
-                (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+                (version, msg_type, msg_len, xid) = buf.header()
                 if msg_len < min_read_len:
                     # Someone isn't playing nicely; log it, and try something sane.
                     LOG.debug("Message with invalid length %s received from switch at address %s",
@@ -339,22 +627,24 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     break
 
                 msg = ofproto_parser.msg(
-                    self, version, msg_type, msg_len, xid, buf[:msg_len])
+                    self, version, msg_type, msg_len, xid, buf.consume(msg_len),
+                    lazy=self.lazy_parse)
                 # LOG.debug('queue msg %s cls %s', msg, msg.__class__)
                 if msg:
+                    if self.handoff is not None and self.handoff(self, msg,
+                                                                 buf):
+                        self.handed_off = True
+                        return
+                    if self.reply_handlers:
+                        reply_handler = self.reply_handlers.get(xid)
+                        if reply_handler is not None:
+                            reply_handler(msg)
                     ev = ofp_event.ofp_msg_to_ev(msg)
                     self.ofp_brick.send_event_to_observers(ev, self.state)
-
-                    def dispatchers(x):
-                        return x.callers[ev.__class__].dispatchers
-
-                    handlers = [handler for handler in
-                                self.ofp_brick.get_handlers(ev) if
-                                self.state in dispatchers(handler)]
-                    for handler in handlers:
+                    for handler in self.ofp_brick.get_handlers(ev,
+                                                               self.state):
                         handler(ev)
 
-                buf = buf[msg_len:]
                 buf_len = len(buf)
                 remaining_read_len = min_read_len
 
@@ -367,14 +657,60 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     count = 0
                     hub.sleep(0)
 
+            try:
+                ret = buf.recv_into(self.socket, remaining_read_len)
+            except SocketTimeout:
+                continue
+            except ssl.SSLError:
+                # eventlet throws SSLError (which is a subclass of IOError)
+                # on SSL socket read timeout; re-try the loop in this case.
+                continue
+            except (EOFError, IOError):
+                break
+
+            if not ret:
+                break
+
+    def _dequeue_batch(self):
+        # Blocks for the first message, then drains whatever is available
+        # in send_q up to the batch budget.
+        buf, close_socket = self.send_q.get()
+        self._release_send_q_slot()
+        bufs = [buf]
+        size = len(buf)
+        deadline = None
+        if self.send_batch_linger:
+            deadline = time.time() + self.send_batch_linger
+        while (not close_socket and size < self.send_batch_bytes and
+               len(bufs) < self.send_batch_msgs):
+            try:
+                if deadline is None:
+                    buf, close_socket = self.send_q.get(block=False)
+                else:
+                    timeout = deadline - time.time()
+                    if timeout <= 0:
+                        break
+                    buf, close_socket = self.send_q.get(timeout=timeout)
+            except hub.QueueEmpty:
+                break
+            self._release_send_q_slot()
+            bufs.append(buf)
+            size += len(buf)
+
+        self.sent_batches += 1
+        self.sent_msgs += len(bufs)
+        self.sent_bytes += size
+        return bufs, close_socket
+
     def _send_loop(self):
         try:
             while self.state != DEAD_DISPATCHER:
-                buf, close_socket = self.send_q.get()
-                self._send_q_sem.release()
-                self.socket.sendall(buf)
+                bufs, close_socket = self._dequeue_batch()
+                hub.sendmsg(self.socket, bufs)
                 if close_socket:
                     break
+                if self.send_q_adaptive and self.send_q.empty():
+                    self._shrink_send_q()
         except SocketTimeout:
             LOG.debug("Socket timed out while sending data to switch at address %s",
                       self.address)
@@ -389,20 +725,85 @@ class Datapath(ofproto_protocol.ProtocolDesc):
             self.send_q = None
             # Now, drain the send_q, releasing the associated semaphore for each entry.
             # This should release all threads waiting to acquire the semaphore.
+            self._send_q_withdraw = 0
             try:
                 while q.get(block=False):
                     self._send_q_sem.release()
             except hub.QueueEmpty:
                 pass
+            # The queue may have been shrunk below the number of waiters.
+            # One more release starts the chain of releases in send().
+            self._send_q_sem.release()
             # Finally, disallow further sends.
             self._close_write()
 
+    def _release_send_q_slot(self):
+        if self._send_q_withdraw:
+            self._send_q_withdraw -= 1
+        else:
+            self._send_q_sem.release()
+
+    def set_send_queue_size(self, size):
+        """
+        Change the number of messages which can be queued to send to
+        the switch.
+
+        Shrinking the queue does not drop queued messages; the slots are
+        withdrawn as the queued messages are sent.
+        """
+        assert size > 0
+        delta = size - self.send_q_size
+        self.send_q_size = size
+        self._send_q_last_adapt = time.time()
+        self._send_q_blocked = 0
+        self._send_q_adapt_high_water = 0
+        if delta > 0:
+            withdraw = min(delta, self._send_q_withdraw)
+            self._send_q_withdraw -= withdraw
+            for _ in range(delta - withdraw):
+                self._send_q_sem.release()
+        else:
+            for _ in range(-delta):
+                if not self._send_q_sem.acquire(blocking=False):
+                    self._send_q_withdraw += 1
+
+    def _grow_send_q(self):
+        # Called on a blocked send.  Doubles the queue once about half of
+        # the queue size worth of sends have been blocked.
+        self._send_q_blocked += 1
+        if (self.send_q_size < self.send_q_max_size and
+                self._send_q_blocked >= self.send_q_size // 2):
+            size = min(self.send_q_size * 2, self.send_q_max_size)
+            LOG.debug('send queue of %s grows to %d', self.address, size)
+            self.set_send_queue_size(size)
+
+    def _shrink_send_q(self):
+        # Called when the send queue has been drained.  Halves the queue
+        # if less than a quarter of it has been used for a while.
+        if (self.send_q_size > self.send_q_base_size and
+                self._send_q_adapt_high_water < self.send_q_size // 4 and
+                time.time() - self._send_q_last_adapt >
+                SEND_QUEUE_SHRINK_INTERVAL):
+            size = max(self.send_q_size // 2, self.send_q_base_size)
+            LOG.debug('send queue of %s shrinks to %d', self.address, size)
+            self.set_send_queue_size(size)
+
     def send(self, buf, close_socket=False):
         msg_enqueued = False
-        self._send_q_sem.acquire()
+        if not self._send_q_sem.acquire(blocking=False):
+            if self.send_q_adaptive:
+                self._grow_send_q()
+            start = time.time()
+            self._send_q_sem.acquire()
+            self.send_q_blocked_time += time.time() - start
         if self.send_q:
             self.send_q.put((buf, close_socket))
             msg_enqueued = True
+            qsize = self.send_q.qsize()
+            if qsize > self.send_q_high_water:
+                self.send_q_high_water = qsize
+            if qsize > self._send_q_adapt_high_water:
+                self._send_q_adapt_high_water = qsize
         else:
             self._send_q_sem.release()
         if not msg_enqueued:
@@ -410,6 +811,24 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                       self.address)
         return msg_enqueued
 
+    def get_send_stats(self):
+        """
+        Returns a dict of counters of the batched writes and the send queue
+        of the switch.  blocked_time is the total time, in seconds, spent
+        by senders waiting for a free slot in the send queue.
+        """
+        batches = self.sent_batches or 1
+        return {
+            'batches': self.sent_batches,
+            'msgs': self.sent_msgs,
+            'bytes': self.sent_bytes,
+            'avg_batch_msgs': float(self.sent_msgs) / batches,
+            'avg_batch_bytes': float(self.sent_bytes) / batches,
+            'queue_size': self.send_q_size,
+            'queue_high_water': self.send_q_high_water,
+            'blocked_time': self.send_q_blocked_time,
+        }
+
     def set_xid(self, msg):
         self.xid += 1
         self.xid &= self.ofproto.MAX_XID
@@ -422,7 +841,39 @@ class Datapath(ofproto_protocol.ProtocolDesc):
             self.set_xid(msg)
         msg.serialize()
         # LOG.debug('send_msg %s', msg)
-        return self.send(msg.buf, close_socket=close_socket)
+        msg_enqueued = self.send(msg.buf, close_socket=close_socket)
+        if msg_enqueued:
+            for hook in self.send_msg_hooks:
+                hook(self, msg)
+        return msg_enqueued
+
+    def request(self, msg, timeout=None):
+        """
+        Sends a request message, e.g. OFPPortStatsRequest, and returns
+        a ryu.controller.request.ReplyFuture, which is resolved with
+        the list of the replies once the reply, or the last one of
+        a multipart reply, has been received.  The future fails on
+        an error reply, after timeout seconds unless timeout is None,
+        or when the connection is closed.
+        """
+        # The future is registered before sending, as send_msg may yield.
+        self.set_xid(msg)
+        future = request.ReplyFuture(self, msg, timeout)
+        self.reply_handlers[msg.xid] = future
+        if not self.send_msg(msg):
+            future.set_exception(request.RequestError(
+                xid=msg.xid, address=self.address))
+        return future
+
+    def bundle(self, flags=None, max_msgs=bundle.DEFAULT_MAX_MSGS,
+               max_bytes=bundle.DEFAULT_MAX_BYTES):
+        """
+        Returns a context manager to send a batch of modification
+        messages, which are added to OpenFlow bundles as of OpenFlow 1.4,
+        and delimited by barrier requests before.
+        See ryu.controller.bundle for the details.
+        """
+        return bundle.Bundle(self, flags, max_msgs, max_bytes)
 
     def _echo_request_loop(self):
         if not self.max_unreplied_echo_requests:
@@ -444,9 +895,11 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     def serve(self):
         send_thr = hub.spawn(self._send_loop)
 
-        # send hello message immediately
-        hello = self.ofproto_parser.OFPHello(self)
-        self.send_msg(hello)
+        # send hello message immediately, unless the handshake has been
+        # done in another process
+        if self.state == HANDSHAKE_DISPATCHER:
+            hello = self.ofproto_parser.OFPHello(self)
+            self.send_msg(hello)
 
         echo_thr = hub.spawn(self._echo_request_loop)
 
@@ -457,6 +910,14 @@ class Datapath(ofproto_protocol.ProtocolDesc):
             hub.kill(echo_thr)
             hub.joinall([send_thr, echo_thr])
             self.is_active = False
+            # Fails the requests and bundles waiting for replies.
+            handlers = []
+            for handler in self.reply_handlers.values():
+                if (isinstance(handler, request.ReplyHandler) and
+                        not any(h is handler for h in handlers)):
+                    handlers.append(handler)
+            for handler in handlers:
+                handler.disconnected()
 
     #
     # Utility methods for convenience
@@ -529,9 +990,18 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         return port_no > self.ofproto.OFPP_MAX
 
 
-def datapath_connection_factory(socket, address):
+def datapath_connection_factory(socket, address, handoff=None,
+                                resume=None):
+    """
+    Serve a switch connection.  handoff is set to Datapath.handoff and
+    resume is a tuple of the arguments of Datapath.resume() for a
+    connection handed over from another process.
+    """
     LOG.debug('connected socket:%s address:%s', socket, address)
     with contextlib.closing(Datapath(socket, address)) as datapath:
+        datapath.handoff = handoff
+        if resume is not None:
+            datapath.resume(*resume)
         try:
             datapath.serve()
         except:
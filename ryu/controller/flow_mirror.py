@@ -0,0 +1,810 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Mirror the flow, group and meter tables of switches.
+
+The mirror of a switch is built from the flow-mod, group-mod and
+meter-mod messages sent with Datapath.send_msg and from the flow-removed
+messages received, and can be read back from the switch with multipart
+requests.  Applications can then look up entries without dumping the
+tables, and bring the tables to a desired state, e.g. after a reconnect,
+with the minimal set of modification messages.
+"""
+
+import logging
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller import request
+from ryu.controller.handler import set_ev_cls
+from ryu.exception import RyuException
+from ryu.lib.dpid import dpid_to_str
+from ryu import utils
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_2
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_5
+
+
+LOG = logging.getLogger('ryu.controller.flow_mirror')
+
+_COOKIE_ALL = 0xffffffffffffffff
+
+# Seconds to wait for all the replies to a stats request
+REQUEST_TIMEOUT = 10.0
+
+
+class FlowMirrorSyncError(RyuException):
+    message = 'Failed to read the tables of datapath %(dpid)s'
+
+
+def _serialize(objs):
+    buf = bytearray()
+    for obj in objs:
+        obj.serialize(buf, len(buf))
+    return bytes(buf)
+
+
+def _flow_mod_match_key(ofp, msg):
+    # The match has just been serialized into msg.buf by send_msg, so
+    # the key is made from there rather than serialized again.
+    if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+        offset = ofp.OFP_HEADER_SIZE
+        end = offset + ofp.OFP_MATCH_SIZE
+    else:
+        offset = ofp.OFP_FLOW_MOD_SIZE - ofp.OFP_MATCH_SIZE
+        end = offset + utils.round_up(msg.match.length, 8)
+    return ofproto_parser.match_key(msg.match, msg.buf[offset:end])
+
+
+def _actions(instructions):
+    for inst in instructions:
+        actions = getattr(inst, 'actions', None)
+        if actions is None:
+            # an action of OpenFlow 1.0 or an instruction without actions
+            yield inst
+        else:
+            for action in actions:
+                yield action
+
+
+class FlowEntry(object):
+    """
+    A flow entry in the mirror.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    table_id      ID of the table (always 0 for OpenFlow 1.0)
+    priority      Priority level of the entry
+    match         Instance of ``OFPMatch``
+    cookie        Opaque controller-issued identifier
+    idle_timeout  Idle time before discarding (seconds)
+    hard_timeout  Max time before discarding (seconds)
+    flags         Flags of the flow-mod message which added the entry
+                  (always 0 for the entries read from OpenFlow 1.0 and
+                  1.2 switches)
+    instructions  List of ``OFPInstruction*`` instances, or of
+                  ``OFPAction*`` instances for OpenFlow 1.0
+    key           (table_id, priority, key of the match by
+                  ``ofproto_parser.match_key``), which identifies the
+                  entry in the table
+    ============= ==========================================================
+    """
+
+    __slots__ = ('table_id', 'priority', 'match', 'cookie', 'idle_timeout',
+                 'hard_timeout', 'flags', 'instructions', 'key', '_body')
+
+    def __init__(self, table_id, priority, match, cookie=0, idle_timeout=0,
+                 hard_timeout=0, flags=0, instructions=None, match_key=None):
+        self.table_id = table_id
+        self.priority = priority
+        self.match = match
+        self.cookie = cookie
+        self.idle_timeout = idle_timeout
+        self.hard_timeout = hard_timeout
+        self.flags = flags
+        self.instructions = instructions or []
+        if match_key is None:
+            match_key = ofproto_parser.match_key(match)
+        self.key = (table_id, priority, match_key)
+        self._body = None
+
+    @classmethod
+    def from_flow_mod(cls, ofp, msg, match_key=None):
+        if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            return cls(0, msg.priority, msg.match, msg.cookie,
+                       msg.idle_timeout, msg.hard_timeout, msg.flags,
+                       msg.actions, match_key)
+        return cls(msg.table_id, msg.priority, msg.match, msg.cookie,
+                   msg.idle_timeout, msg.hard_timeout, msg.flags,
+                   msg.instructions, match_key)
+
+    @classmethod
+    def from_stats(cls, ofp, stats):
+        if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            return cls(0, stats.priority, stats.match, stats.cookie,
+                       stats.idle_timeout, stats.hard_timeout, 0,
+                       stats.actions)
+        return cls(stats.table_id, stats.priority, stats.match, stats.cookie,
+                   stats.idle_timeout, stats.hard_timeout,
+                   getattr(stats, 'flags', 0), stats.instructions)
+
+    def set_instructions(self, instructions):
+        self.instructions = instructions
+        self._body = None
+
+    @property
+    def body(self):
+        # What tells whether the entry on the switch is up to date.
+        # The flags are left out as switches before OpenFlow 1.3 do not
+        # report them.
+        if self._body is None:
+            self._body = (self.cookie, self.idle_timeout, self.hard_timeout,
+                          _serialize(self.instructions))
+        return self._body
+
+    def outputs_to(self, port=None, group_id=None, meter_id=None):
+        for action in _actions(self.instructions):
+            if port is not None and getattr(action, 'port', None) == port:
+                return True
+            if (group_id is not None and
+                    getattr(action, 'group_id', None) == group_id):
+                return True
+            if (meter_id is not None and
+                    getattr(action, 'meter_id', None) == meter_id):
+                return True
+        return False
+
+    def __repr__(self):
+        return ('FlowEntry(table_id=%d, priority=%d, match=%s, cookie=%#x)' %
+                (self.table_id, self.priority, self.match, self.cookie))
+
+
+class GroupEntry(object):
+    """
+    A group entry in the mirror.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    group_id      Group identifier
+    type          One of OFPGT_*
+    buckets       List of ``OFPBucket`` instances
+    ============= ==========================================================
+    """
+
+    __slots__ = ('group_id', 'type', 'buckets', '_body')
+
+    def __init__(self, group_id, type_, buckets):
+        self.group_id = group_id
+        self.type = type_
+        self.buckets = buckets
+        self._body = None
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._body = (self.type, _serialize(self.buckets))
+        return self._body
+
+
+class MeterEntry(object):
+    """
+    A meter entry in the mirror.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    meter_id      Meter instance
+    flags         Bitmap of OFPMF_* flags
+    bands         List of ``OFPMeterBand*`` instances
+    ============= ==========================================================
+    """
+
+    __slots__ = ('meter_id', 'flags', 'bands', '_body')
+
+    def __init__(self, meter_id, flags, bands):
+        self.meter_id = meter_id
+        self.flags = flags
+        self.bands = bands
+        self._body = None
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._body = (self.flags, _serialize(self.bands))
+        return self._body
+
+
+class TableMirror(object):
+    """
+    The mirrored tables of a switch.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    flows         A dict of FlowEntry instances keyed by FlowEntry.key
+    cookies       A dict of sets of FlowEntry.key keyed by cookie
+    groups        A dict of GroupEntry instances keyed by group ID
+    meters        A dict of MeterEntry instances keyed by meter ID
+    in_sync       True if the mirror is known to be exact; False before
+                  the tables have been read from the switch and after an
+                  update which can not be mirrored exactly, e.g. a failed
+                  request or a non-strict flow-mod with a masked match
+    ============= ==========================================================
+
+    Entries which expire without OFPFF_SEND_FLOW_REM remain in the mirror.
+    """
+
+    def __init__(self, ofp):
+        self.ofp = ofp
+        self.flows = {}
+        self.cookies = {}
+        self.groups = {}
+        self.meters = {}
+        self.in_sync = False
+
+    def add_flow(self, entry):
+        old = self.flows.get(entry.key)
+        if old is not None:
+            self._unindex(old)
+        self.flows[entry.key] = entry
+        self.cookies.setdefault(entry.cookie, set()).add(entry.key)
+
+    def remove_flow(self, key):
+        entry = self.flows.pop(key, None)
+        if entry is not None:
+            self._unindex(entry)
+        return entry
+
+    def _unindex(self, entry):
+        keys = self.cookies[entry.cookie]
+        keys.discard(entry.key)
+        if not keys:
+            del self.cookies[entry.cookie]
+
+    def get_flows(self, table_id=None, cookie=0, cookie_mask=0):
+        """
+        Returns a list of the flow entries in the given table, or in all
+        tables if table_id is None, whose cookie equals to the given
+        cookie in the bits of cookie_mask.
+        """
+        if cookie_mask == _COOKIE_ALL:
+            entries = [self.flows[key]
+                       for key in self.cookies.get(cookie, ())]
+        elif cookie_mask:
+            cookie &= cookie_mask
+            entries = [self.flows[key]
+                       for c, keys in self.cookies.items()
+                       if c & cookie_mask == cookie
+                       for key in keys]
+        else:
+            entries = list(self.flows.values())
+        if table_id is not None:
+            entries = [e for e in entries if e.table_id == table_id]
+        return entries
+
+    def _covers(self, match, entry):
+        # Whether the match of a non-strict flow-mod covers the entry;
+        # None if it is not known without interpreting masks.
+        if self.ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            if match.wildcards == self.ofp.OFPFW_ALL:
+                return True
+            if ofproto_parser.match_key(match) == entry.key[2]:
+                return True
+            return None
+        fields = match.items()
+        if not fields:
+            return True
+        entry_fields = dict(entry.match.items())
+        for (name, value) in fields:
+            if name not in entry_fields:
+                return False
+            entry_value = entry_fields[name]
+            if entry_value == value:
+                continue
+            if isinstance(value, tuple) or isinstance(entry_value, tuple):
+                return None
+            return False
+        return True
+
+    def _select_flows(self, msg, match_key, strict, out_filter):
+        ofp = self.ofp
+        table_id = getattr(msg, 'table_id', 0)
+        all_tables = getattr(ofp, 'OFPTT_ALL', None)
+        cookie_mask = getattr(msg, 'cookie_mask', 0)
+        if strict and table_id != all_tables:
+            entry = self.flows.get((table_id, msg.priority, match_key))
+            candidates = [entry] if entry is not None else []
+        else:
+            candidates = self.get_flows(None, msg.cookie, cookie_mask)
+        out_port = out_group = None
+        if out_filter:
+            if msg.out_port not in (getattr(ofp, 'OFPP_ANY', None),
+                                    getattr(ofp, 'OFPP_NONE', None)):
+                out_port = msg.out_port
+            if getattr(msg, 'out_group', None) not in (
+                    None, getattr(ofp, 'OFPG_ANY', None)):
+                out_group = msg.out_group
+        selected = []
+        for entry in candidates:
+            if table_id != all_tables and entry.table_id != table_id:
+                continue
+            if entry.cookie & cookie_mask != msg.cookie & cookie_mask:
+                continue
+            if strict:
+                if (entry.priority != msg.priority or
+                        entry.key[2] != match_key):
+                    continue
+            else:
+                covered = self._covers(msg.match, entry)
+                if covered is None:
+                    self.in_sync = False
+                    continue
+                if not covered:
+                    continue
+            if ((out_port is not None or out_group is not None) and
+                    not entry.outputs_to(out_port, out_group)):
+                continue
+            selected.append(entry)
+        return selected
+
+    def flow_mod(self, msg, match_key):
+        """
+        Applies a flow-mod message sent to the switch.
+        """
+        ofp = self.ofp
+        command = msg.command
+        if command == ofp.OFPFC_ADD:
+            self.add_flow(FlowEntry.from_flow_mod(ofp, msg, match_key))
+        elif command in (ofp.OFPFC_MODIFY, ofp.OFPFC_MODIFY_STRICT):
+            entries = self._select_flows(
+                msg, match_key, command == ofp.OFPFC_MODIFY_STRICT, False)
+            if entries:
+                instructions = FlowEntry.from_flow_mod(
+                    ofp, msg, match_key).instructions
+                for entry in entries:
+                    entry.set_instructions(instructions)
+            elif ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+                # OpenFlow 1.0 adds the entry if no entry is modified.
+                self.add_flow(FlowEntry.from_flow_mod(ofp, msg, match_key))
+        elif command in (ofp.OFPFC_DELETE, ofp.OFPFC_DELETE_STRICT):
+            for entry in self._select_flows(
+                    msg, match_key, command == ofp.OFPFC_DELETE_STRICT, True):
+                self.remove_flow(entry.key)
+        else:
+            self.in_sync = False
+
+    def flow_removed(self, msg):
+        """
+        Applies a flow-removed message received from the switch.
+        """
+        table_id = getattr(msg, 'table_id', 0)
+        self.remove_flow((table_id, msg.priority,
+                          ofproto_parser.match_key(msg.match)))
+
+    def group_mod(self, msg):
+        """
+        Applies a group-mod message sent to the switch.
+        """
+        ofp = self.ofp
+        command = msg.command
+        if command in (ofp.OFPGC_ADD, ofp.OFPGC_MODIFY):
+            self.groups[msg.group_id] = GroupEntry(
+                msg.group_id, msg.type, msg.buckets)
+        elif command == ofp.OFPGC_DELETE:
+            if msg.group_id == ofp.OFPG_ALL:
+                group_ids = list(self.groups)
+            else:
+                group_ids = [msg.group_id]
+            for group_id in group_ids:
+                self.groups.pop(group_id, None)
+                # The switch removes the flow entries forwarding to
+                # the group as well.
+                for entry in list(self.flows.values()):
+                    if entry.outputs_to(group_id=group_id):
+                        self.remove_flow(entry.key)
+        else:
+            # e.g. OFPGC_INSERT_BUCKET and OFPGC_REMOVE_BUCKET
+            self.in_sync = False
+
+    def meter_mod(self, msg):
+        """
+        Applies a meter-mod message sent to the switch.
+        """
+        ofp = self.ofp
+        command = msg.command
+        if command in (ofp.OFPMC_ADD, ofp.OFPMC_MODIFY):
+            self.meters[msg.meter_id] = MeterEntry(
+                msg.meter_id, msg.flags, msg.bands)
+        elif command == ofp.OFPMC_DELETE:
+            if msg.meter_id == ofp.OFPM_ALL:
+                meter_ids = list(self.meters)
+            else:
+                meter_ids = [msg.meter_id]
+            for meter_id in meter_ids:
+                self.meters.pop(meter_id, None)
+                for entry in list(self.flows.values()):
+                    if entry.outputs_to(meter_id=meter_id):
+                        self.remove_flow(entry.key)
+        else:
+            self.in_sync = False
+
+    def msg_sent(self, msg):
+        """
+        Applies a message sent to the switch if it modifies the tables.
+        """
+        ofp = self.ofp
+        msg_type = msg.msg_type
+        if msg_type == ofp.OFPT_FLOW_MOD:
+            self.flow_mod(msg, _flow_mod_match_key(ofp, msg))
+        elif msg_type == getattr(ofp, 'OFPT_GROUP_MOD', None):
+            self.group_mod(msg)
+        elif msg_type == getattr(ofp, 'OFPT_METER_MOD', None):
+            self.meter_mod(msg)
+
+
+class FlowMirror(app_manager.RyuApp):
+    """
+    FlowMirror application keeps a mirror of the flow, group and meter
+    tables of each switch connected to this controller.
+
+    The mirror survives reconnects of the switch, but is no longer
+    considered exact (TableMirror.in_sync) until it has been read back
+    from the switch with sync() or reconcile().
+
+    Usage Example::
+
+        # ...(snip)...
+        from ryu.controller import flow_mirror
+
+
+        class MyApp(app_manager.RyuApp):
+            _CONTEXTS = {
+                'flow_mirror': flow_mirror.FlowMirror,
+            }
+
+            def __init__(self, *args, **kwargs):
+                super(MyApp, self).__init__(*args, **kwargs)
+                self.flow_mirror = kwargs['flow_mirror']
+
+            @set_ev_cls(ofp_event.EventOFPStateChange, MAIN_DISPATCHER)
+            def _state_change_handler(self, ev):
+                # Brings the flows of this application, which are told
+                # by the cookie, to the desired state.
+                self.flow_mirror.reconcile(
+                    ev.datapath, flows=self._desired_flows(ev.datapath),
+                    cookie=MY_COOKIE, cookie_mask=MY_COOKIE_MASK)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FlowMirror, self).__init__(*args, **kwargs)
+        self.name = 'flow_mirror'
+
+        self.tables = {}  # datapath_id => TableMirror
+        # datapath => messages sent before its datapath_id is known
+        self._pending = {}
+        # datapath_id => messages sent while reading the tables
+        self._syncing = {}
+
+    def start(self):
+        controller.Datapath.send_msg_hooks.append(self._msg_sent)
+        super(FlowMirror, self).start()
+
+    def stop(self):
+        controller.Datapath.send_msg_hooks.remove(self._msg_sent)
+        super(FlowMirror, self).stop()
+
+    def get(self, dpid):
+        """
+        Returns the TableMirror of the given datapath ID, or None.
+        """
+        return self.tables.get(dpid)
+
+    def get_flows(self, dpid, table_id=None, cookie=0, cookie_mask=0):
+        """
+        Returns a list of the mirrored flow entries of the given datapath.
+        See TableMirror.get_flows.
+        """
+        tables = self.tables.get(dpid)
+        if tables is None:
+            return []
+        return tables.get_flows(table_id, cookie, cookie_mask)
+
+    def get_flow(self, dpid, table_id, priority, match):
+        """
+        Returns the mirrored flow entry which has exactly the given
+        table ID, priority and match, or None.
+        """
+        tables = self.tables.get(dpid)
+        if tables is None:
+            return None
+        return tables.flows.get((table_id, priority,
+                                 ofproto_parser.match_key(match)))
+
+    def _tables(self, datapath):
+        tables = self.tables.get(datapath.id)
+        if tables is None or tables.ofp is not datapath.ofproto:
+            tables = TableMirror(datapath.ofproto)
+            self.tables[datapath.id] = tables
+        return tables
+
+    def _msg_sent(self, datapath, msg):
+        if datapath.id is None:
+            self._pending.setdefault(datapath, []).append(msg)
+            return
+        syncing = self._syncing.get(datapath.id)
+        if syncing is not None:
+            syncing.append(msg)
+        self._tables(datapath).msg_sent(msg)
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [handler.MAIN_DISPATCHER, handler.DEAD_DISPATCHER])
+    def _state_change_handler(self, ev):
+        datapath = ev.datapath
+        pending = self._pending.pop(datapath, [])
+        if ev.state == handler.MAIN_DISPATCHER:
+            tables = self._tables(datapath)
+            for msg in pending:
+                tables.msg_sent(msg)
+        elif ev.state == handler.DEAD_DISPATCHER:
+            tables = self.tables.get(datapath.id)
+            if tables is not None:
+                tables.in_sync = False
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, handler.MAIN_DISPATCHER)
+    def _flow_removed_handler(self, ev):
+        msg = ev.msg
+        tables = self.tables.get(msg.datapath.id)
+        if tables is not None:
+            tables.flow_removed(msg)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, handler.MAIN_DISPATCHER)
+    def _error_msg_handler(self, ev):
+        msg = ev.msg
+        ofp = msg.datapath.ofproto
+        if msg.type not in (ofp.OFPET_FLOW_MOD_FAILED,
+                            getattr(ofp, 'OFPET_GROUP_MOD_FAILED', None),
+                            getattr(ofp, 'OFPET_METER_MOD_FAILED', None)):
+            return
+        tables = self.tables.get(msg.datapath.id)
+        if tables is not None:
+            LOG.debug('FLOW_MIRROR: datapath %s out of sync: %s',
+                      dpid_to_str(msg.datapath.id), msg)
+            tables.in_sync = False
+
+    def _request(self, datapath, req):
+        try:
+            msgs = datapath.request(req, timeout=REQUEST_TIMEOUT).result()
+        except request.RequestError as e:
+            LOG.debug('FLOW_MIRROR: %s', e)
+            raise FlowMirrorSyncError(dpid=dpid_to_str(datapath.id))
+        return [stats for msg in msgs for stats in msg.body]
+
+    def _dump(self, datapath, cookie, cookie_mask):
+        ofp = datapath.ofproto
+        parser = datapath.ofproto_parser
+        version = ofp.OFP_VERSION
+
+        if version == ofproto_v1_0.OFP_VERSION:
+            req = parser.OFPFlowStatsRequest(
+                datapath, 0, parser.OFPMatch(), 0xff, ofp.OFPP_NONE)
+        else:
+            if version >= ofproto_v1_5.OFP_VERSION:
+                req_cls = parser.OFPFlowDescStatsRequest
+            else:
+                req_cls = parser.OFPFlowStatsRequest
+            req = req_cls(datapath, table_id=ofp.OFPTT_ALL,
+                          out_port=ofp.OFPP_ANY, out_group=ofp.OFPG_ANY,
+                          cookie=cookie, cookie_mask=cookie_mask,
+                          match=parser.OFPMatch())
+        flows = [FlowEntry.from_stats(ofp, stats)
+                 for stats in self._request(datapath, req)]
+        if version == ofproto_v1_0.OFP_VERSION:
+            # OpenFlow 1.0 does not filter by cookie.
+            cookie &= cookie_mask
+            flows = [e for e in flows if e.cookie & cookie_mask == cookie]
+
+        groups = []
+        if version >= ofproto_v1_2.OFP_VERSION:
+            req = parser.OFPGroupDescStatsRequest(datapath)
+            groups = [GroupEntry(stats.group_id, stats.type, stats.buckets)
+                      for stats in self._request(datapath, req)]
+
+        meters = []
+        if version >= ofproto_v1_3.OFP_VERSION:
+            if version >= ofproto_v1_5.OFP_VERSION:
+                req_cls = parser.OFPMeterDescStatsRequest
+            else:
+                req_cls = parser.OFPMeterConfigStatsRequest
+            req = req_cls(datapath)
+            meters = [MeterEntry(stats.meter_id, stats.flags, stats.bands)
+                      for stats in self._request(datapath, req)]
+
+        return flows, groups, meters
+
+    def sync(self, datapath, cookie=0, cookie_mask=0):
+        """
+        Reads the tables of the switch into the mirror.
+
+        If cookie_mask is not 0, only the flow entries whose cookie equals
+        to the given cookie in the bits of cookie_mask are read and
+        replaced.  Groups and meters are always read entirely.
+        Raises FlowMirrorSyncError if the switch does not reply in time.
+        """
+        dpid = datapath.id
+        self._syncing[dpid] = sent = []
+        try:
+            flows, groups, meters = self._dump(datapath, cookie, cookie_mask)
+        finally:
+            del self._syncing[dpid]
+
+        old = self.tables.get(dpid)
+        tables = TableMirror(datapath.ofproto)
+        if (cookie_mask and old is not None and
+                old.ofp is datapath.ofproto):
+            for entry in old.flows.values():
+                if entry.cookie & cookie_mask != cookie & cookie_mask:
+                    tables.add_flow(entry)
+            in_sync = old.in_sync
+        else:
+            in_sync = True
+        for entry in flows:
+            tables.add_flow(entry)
+        tables.groups = dict((e.group_id, e) for e in groups)
+        tables.meters = dict((e.meter_id, e) for e in meters)
+        tables.in_sync = in_sync
+        # The messages sent in the meantime have been processed by
+        # the switch after the tables have been read.
+        for msg in sent:
+            tables.msg_sent(msg)
+        self.tables[dpid] = tables
+        return tables
+
+    def diff(self, datapath, flows=None, groups=None, meters=None,
+             cookie=0, cookie_mask=0):
+        """
+        Returns a list of the messages which bring the mirrored tables
+        of the switch to the desired state.
+
+        flows, groups and meters are lists of OFPFlowMod, OFPGroupMod
+        and OFPMeterMod messages which add the desired entries.  None
+        leaves the corresponding table as it is.  Only the mirrored flow
+        entries whose cookie equals to the given cookie in the bits of
+        cookie_mask are compared and deleted if they are not desired.
+
+        The entries are added before the undesired ones are deleted;
+        barrier requests separate groups and meters from flow entries
+        which refer to them.
+        """
+        ofp = datapath.ofproto
+        parser = datapath.ofproto_parser
+        tables = self.tables.get(datapath.id) or TableMirror(ofp)
+
+        add_refs = []
+        add_flows = []
+        del_flows = []
+        del_refs = []
+
+        if groups is not None:
+            desired = dict((msg.group_id, GroupEntry(msg.group_id, msg.type,
+                                                     msg.buckets))
+                           for msg in groups)
+            for group_id, entry in desired.items():
+                current = tables.groups.get(group_id)
+                if current is None:
+                    command = ofp.OFPGC_ADD
+                elif current.body != entry.body:
+                    command = ofp.OFPGC_MODIFY
+                else:
+                    continue
+                add_refs.append(parser.OFPGroupMod(
+                    datapath, command=command, type_=entry.type,
+                    group_id=group_id, buckets=entry.buckets))
+            for group_id, entry in tables.groups.items():
+                if group_id not in desired:
+                    del_refs.append(parser.OFPGroupMod(
+                        datapath, command=ofp.OFPGC_DELETE,
+                        type_=entry.type, group_id=group_id))
+
+        if meters is not None:
+            desired = dict((msg.meter_id, MeterEntry(msg.meter_id, msg.flags,
+                                                     msg.bands))
+                           for msg in meters)
+            for meter_id, entry in desired.items():
+                current = tables.meters.get(meter_id)
+                if current is None:
+                    command = ofp.OFPMC_ADD
+                elif current.body != entry.body:
+                    command = ofp.OFPMC_MODIFY
+                else:
+                    continue
+                add_refs.append(parser.OFPMeterMod(
+                    datapath, command=command, flags=entry.flags,
+                    meter_id=meter_id, bands=entry.bands))
+            for meter_id in tables.meters:
+                if meter_id not in desired:
+                    del_refs.append(parser.OFPMeterMod(
+                        datapath, command=ofp.OFPMC_DELETE,
+                        meter_id=meter_id))
+
+        if flows is not None:
+            desired = {}
+            for msg in flows:
+                entry = FlowEntry.from_flow_mod(ofp, msg)
+                desired[entry.key] = entry
+            for key, entry in desired.items():
+                current = tables.flows.get(key)
+                if current is None or current.body != entry.body:
+                    add_flows.append(self._flow_mod(
+                        datapath, entry, ofp.OFPFC_ADD))
+            for entry in tables.get_flows(None, cookie, cookie_mask):
+                if entry.key not in desired:
+                    del_flows.append(self._flow_mod(
+                        datapath, entry, ofp.OFPFC_DELETE_STRICT))
+
+        msgs = []
+        for phase in (add_refs, add_flows + del_flows, del_refs):
+            if not phase:
+                continue
+            if msgs:
+                msgs.append(parser.OFPBarrierRequest(datapath))
+            msgs.extend(phase)
+        return msgs
+
+    @staticmethod
+    def _flow_mod(datapath, entry, command):
+        ofp = datapath.ofproto
+        parser = datapath.ofproto_parser
+        if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            return parser.OFPFlowMod(
+                datapath, match=entry.match, cookie=entry.cookie,
+                command=command, idle_timeout=entry.idle_timeout,
+                hard_timeout=entry.hard_timeout, priority=entry.priority,
+                out_port=ofp.OFPP_NONE, flags=entry.flags,
+                actions=entry.instructions)
+        return parser.OFPFlowMod(
+            datapath, cookie=entry.cookie, table_id=entry.table_id,
+            command=command, idle_timeout=entry.idle_timeout,
+            hard_timeout=entry.hard_timeout, priority=entry.priority,
+            out_port=ofp.OFPP_ANY, out_group=ofp.OFPG_ANY,
+            flags=entry.flags, match=entry.match,
+            instructions=entry.instructions)
+
+    def reconcile(self, datapath, flows=None, groups=None, meters=None,
+                  cookie=0, cookie_mask=0, sync=None):
+        """
+        Brings the tables of the switch to the desired state with
+        the minimal set of modification messages and returns them.
+
+        The arguments are the same as diff().  The tables are read from
+        the switch first if sync is True, or if sync is None and
+        the mirror is not in sync, e.g. after a reconnect.
+        """
+        tables = self.tables.get(datapath.id)
+        if sync or (sync is None and (tables is None or not tables.in_sync)):
+            self.sync(datapath, cookie, cookie_mask)
+        msgs = self.diff(datapath, flows, groups, meters,
+                         cookie, cookie_mask)
+        for msg in msgs:
+            datapath.send_msg(msg)
+        LOG.debug('FLOW_MIRROR: reconciled datapath %s with %d messages',
+                  dpid_to_str(datapath.id), len(msgs))
+        return msgs
@@ -31,7 +31,7 @@ class _Caller(object):
     """Describe how to handle an event class.
     """
 
-    def __init__(self, dispatchers, ev_source):
+    def __init__(self, dispatchers, ev_source, batch=False):
         """Initialize _Caller.
 
         :param dispatchers: A list of states or a state, in which this
@@ -40,13 +40,15 @@ class _Caller(object):
         :param ev_source: The module which generates the event.
                           ev_cls.__module__ for set_ev_cls.
                           None for set_ev_handler.
+        :param batch: True if the handler takes a list of events.
         """
         self.dispatchers = dispatchers
         self.ev_source = ev_source
+        self.batch = batch
 
 
 # should be named something like 'observe_event'
-def set_ev_cls(ev_cls, dispatchers=None):
+def set_ev_cls(ev_cls, dispatchers=None, batch=False):
     """
     A decorator for Ryu application to declare an event handler.
 
@@ -73,12 +75,25 @@ def set_ev_cls(ev_cls, dispatchers=None):
                                                 disconnecting due to some
                                                 unrecoverable errors.
     =========================================== ===============================
+
+    If batch is True, the decorated method takes a list of events instead
+    of an event.  The list contains the events of ev_cls which are queued
+    back to back for this RyuApp, up to RyuApp.EVENT_BATCH_SIZE, so that
+    a burst of events can be processed in one pass.
+
+    Example::
+
+        @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER, batch=True)
+        def packet_in_handler(self, evs):
+            for ev in evs:
+                ...
     """
     def _set_ev_cls_dec(handler):
         if 'callers' not in dir(handler):
             handler.callers = {}
         for e in _listify(ev_cls):
-            handler.callers[e] = _Caller(_listify(dispatchers), e.__module__)
+            handler.callers[e] = _Caller(_listify(dispatchers), e.__module__,
+                                         batch)
         return handler
     return _set_ev_cls_dec
 
@@ -19,10 +19,12 @@ OpenFlow event definitions.
 """
 
 import inspect
+import sys
 import time
 
 from ryu.controller import handler
 from ryu import ofproto
+from ryu.ofproto import ofproto_parser
 from . import event
 
 
@@ -74,7 +76,12 @@ def ofp_msg_to_ev(msg):
 
 def ofp_msg_to_ev_cls(msg_cls):
     name = _ofp_msg_name_to_ev_name(msg_cls.__name__)
-    return _OFP_MSG_EVENTS[name]
+    try:
+        return _OFP_MSG_EVENTS[name]
+    except KeyError:
+        # The parser of msg_cls has been imported after this module.
+        _create_ofp_msg_ev_from_module(sys.modules[msg_cls.__module__])
+        return _OFP_MSG_EVENTS[name]
 
 
 def _create_ofp_msg_ev_class(msg_cls):
@@ -84,11 +91,16 @@ def _create_ofp_msg_ev_class(msg_cls):
     if name in _OFP_MSG_EVENTS:
         return
 
+    _create_ofp_msg_ev_class_by_name(name)
+
+
+def _create_ofp_msg_ev_class_by_name(name):
     cls = type(name, (EventOFPMsgBase,),
                dict(__init__=lambda self, msg:
                     super(self.__class__, self).__init__(msg)))
     globals()[name] = cls
     _OFP_MSG_EVENTS[name] = cls
+    return cls
 
 
 def _create_ofp_msg_ev_from_module(ofp_parser):
@@ -99,10 +111,47 @@ def _create_ofp_msg_ev_from_module(ofp_parser):
         _create_ofp_msg_ev_class(cls)
 
 
-for ofp_mods in ofproto.get_ofp_modules().values():
-    ofp_parser = ofp_mods[1]
-    # print 'loading module %s' % ofp_parser
-    _create_ofp_msg_ev_from_module(ofp_parser)
+# The parser modules of OpenFlow versions are imported on demand.  (See
+# ofproto_protocol._Versions)  The event classes of the messages of the
+# versions imported are created here, the others on the first reference
+# of them, e.g. by ofp_event.EventOFPPacketIn in set_ev_cls(), or when
+# the first message of the class is received.
+_OFP_MSG_PREFIXES = tuple(
+    _ofp_msg_name_to_ev_name(prefix)
+    for prefix in ofproto_parser.StringifyMixin._class_prefixes)
+
+
+def _ofp_parsers():
+    # The parser modules already imported first, and then the others,
+    # which are imported one by one as needed.
+    versions = ofproto.get_ofp_modules()
+    loaded = versions.loaded()
+    for version in sorted(loaded) + sorted(set(versions) - loaded):
+        yield versions[version][1]
+
+
+def __getattr__(name):
+    # Called only for the attributes not defined yet.  (PEP 562)
+    if name.startswith(_OFP_MSG_PREFIXES):
+        msg_name = name[len(_ofp_msg_name_to_ev_name('')):]
+        for ofp_parser in _ofp_parsers():
+            msg_cls = getattr(ofp_parser, msg_name, None)
+            if inspect.isclass(msg_cls) and hasattr(msg_cls, 'cls_msg_type'):
+                return ofp_msg_to_ev_cls(msg_cls)
+    # e.g. a typo in set_ev_cls()
+    raise AttributeError(
+        'module %r has no attribute %r' % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # No module __getattr__, create all of them up front.
+    _versions = ofproto.get_ofp_modules().keys()
+else:
+    _versions = ofproto.ofproto_protocol._versions.loaded()
+for _version in _versions:
+    _ofp_parser = ofproto.get_ofp_module(_version)[1]
+    # print 'loading module %s' % _ofp_parser
+    _create_ofp_msg_ev_from_module(_ofp_parser)
 
 
 class EventOFPStateChange(event.EventBase):
@@ -0,0 +1,244 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Requests to switches and their replies.
+
+Datapath.request() sends a request message and returns a ReplyFuture,
+which the receive loop of the datapath resolves when the reply with
+the same xid arrives; for a multipart request, when the last reply of
+the sequence arrives.  Any number of requests can be in flight, to any
+number of switches; for example, to poll the port statistics of all
+the switches concurrently::
+
+    futures = [dp.request(dp.ofproto_parser.OFPPortStatsRequest(dp),
+                          timeout=5)
+               for dp in datapaths]
+    for future in futures:
+        try:
+            for msg in future.result():
+                for stats in msg.body:
+                    ...
+        except request.RequestError as e:
+            LOG.error('%s', e)
+
+No event handler is needed to collect the replies; the replies are
+dispatched as events to the applications observing them as usual.
+"""
+
+from ryu.exception import RyuException
+from ryu.lib import hub
+
+
+class RequestError(RyuException):
+    message = 'Request %(xid)#x to %(address)s failed'
+
+
+class RequestTimeout(RequestError):
+    message = 'Request %(xid)#x to %(address)s timed out'
+
+
+class RequestCancelled(RequestError):
+    message = 'Request %(xid)#x to %(address)s cancelled'
+
+
+class RequestFailed(RequestError):
+    """
+    The switch replied to the request with an error message, which is
+    stored as the error attribute.
+    """
+    message = 'Request %(xid)#x to %(address)s failed: %(error)s'
+
+    def __init__(self, msg=None, **kwargs):
+        super(RequestFailed, self).__init__(msg, **kwargs)
+        self.error = kwargs.get('error')
+
+
+class ReplyHandler(object):
+    """
+    The base class of the handlers of the replies registered in
+    Datapath.reply_handlers.
+
+    A handler is called with each message received with the xid it has
+    been registered with, and disconnected() is called once the
+    connection to the switch is closed, even if the handler is registered
+    with several xids.  A handler unregisters itself from
+    Datapath.reply_handlers once it expects no more replies.
+    """
+
+    def __call__(self, msg):
+        raise NotImplementedError()
+
+    def disconnected(self):
+        """
+        Called when the connection to the switch is closed before all
+        the replies have been received.
+        """
+        pass
+
+
+class ReplyFuture(ReplyHandler):
+    """
+    The reply to a request sent with Datapath.request().
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    datapath      The datapath the request has been sent to
+    msg           The request message
+    replies       List of the reply messages received so far
+    ============= ==========================================================
+    """
+
+    def __init__(self, datapath, msg, timeout=None):
+        super(ReplyFuture, self).__init__()
+        self.datapath = datapath
+        self.msg = msg
+        self.replies = []
+        self._exception = None
+        self._done = hub.Event()
+        self._received = hub.Event()  # set on every reply and when done
+        self._callbacks = []
+        self._timer = None
+        if timeout is not None:
+            self._timer = hub.spawn_after(timeout, self._expire)
+
+        parser = datapath.ofproto_parser
+        if hasattr(parser, 'OFPMultipartReply'):
+            self._multipart_cls = parser.OFPMultipartReply
+            self._reply_more = datapath.ofproto.OFPMPF_REPLY_MORE
+        else:
+            self._multipart_cls = parser.OFPStatsReply
+            self._reply_more = datapath.ofproto.OFPSF_REPLY_MORE
+
+    def _kwargs(self):
+        return {'xid': self.msg.xid or 0, 'address': self.datapath.address}
+
+    def __call__(self, msg):
+        # Called by the receive loop of the datapath.  (See
+        # Datapath.reply_handlers)
+        if self._done.is_set():
+            return
+        if isinstance(msg, self.datapath.ofproto_parser.OFPErrorMsg):
+            self.set_exception(RequestFailed(error=msg, **self._kwargs()))
+            return
+        self.replies.append(msg)
+        if not (isinstance(msg, self._multipart_cls) and
+                msg.flags & self._reply_more):
+            self._finish()
+        else:
+            self._received.set()
+
+    def disconnected(self):
+        self.set_exception(RequestError(**self._kwargs()))
+
+    def _expire(self):
+        self._timer = None
+        self.set_exception(RequestTimeout(**self._kwargs()))
+
+    def _finish(self):
+        if self.datapath.reply_handlers.get(self.msg.xid) is self:
+            del self.datapath.reply_handlers[self.msg.xid]
+        if self._timer is not None:
+            hub.kill(self._timer)
+            self._timer = None
+        self._done.set()
+        self._received.set()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def set_exception(self, exception):
+        """
+        Resolves the future with the exception unless it has already been
+        resolved.
+        """
+        if self._done.is_set():
+            return
+        self._exception = exception
+        self._finish()
+
+    def cancel(self):
+        """
+        Stops waiting for the reply.  Returns False if the future has
+        already been resolved.
+        """
+        if self._done.is_set():
+            return False
+        self.set_exception(RequestCancelled(**self._kwargs()))
+        return True
+
+    def cancelled(self):
+        return isinstance(self._exception, RequestCancelled)
+
+    def done(self):
+        """
+        Returns True if the reply has been received, or the request has
+        failed, timed out or been cancelled.
+        """
+        return self._done.is_set()
+
+    def add_done_callback(self, callback):
+        """
+        Calls callback with the future once it is done, or right away if
+        it is already done.
+        """
+        if self._done.is_set():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def exception(self, timeout=None):
+        """
+        Waits for the future up to timeout seconds and returns
+        the exception it has been resolved with, or None.
+        Raises RequestTimeout if the future is not done in time.
+        """
+        if not self._done.wait(timeout):
+            raise RequestTimeout(**self._kwargs())
+        return self._exception
+
+    def result(self, timeout=None):
+        """
+        Waits for the future up to timeout seconds and returns the list
+        of the reply messages; more than one for a multipart reply.
+        Raises RequestTimeout if the future is not done in time, or
+        the exception it has been resolved with.
+        """
+        exception = self.exception(timeout)
+        if exception is not None:
+            raise exception
+        return self.replies
+
+    def iter_replies(self, timeout=None):
+        """
+        Yields the reply messages as they are received, waiting up to
+        timeout seconds for each of them.  The yielded messages are
+        removed from replies, so that the parts of a long multipart reply
+        are not all kept in memory.
+        Raises RequestTimeout if no reply is received in time, or
+        the exception the future has been resolved with.
+        """
+        while True:
+            if self.replies:
+                yield self.replies.pop(0)
+                continue
+            if self._done.is_set():
+                if self._exception is not None:
+                    raise self._exception
+                return
+            self._received.clear()
+            if not self._received.wait(timeout):
+                raise RequestTimeout(**self._kwargs())
@@ -0,0 +1,500 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Periodic collection of the statistics of all the switches.
+
+The collector polls the flow, port, queue, meter and group statistics of
+all the connected switches every stats_interval seconds, with at most
+stats_concurrency requests in flight.  The counters are kept in ring
+buffers of the last stats_history samples, one StatsTable per kind of
+statistics, and the rates of all the counters are computed at once after
+every round and published with EventStatsSnapshot.
+
+The stats_* options are read from the config file, not from the command
+line, which ryu-manager parses before it loads the applications.
+
+Requires numpy.
+"""
+
+import logging
+import operator
+import random
+import time
+
+import numpy as np
+
+from ryu import cfg
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller import request
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.lib.dpid import dpid_to_str
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_5
+
+
+LOG = logging.getLogger('ryu.controller.stats_collector')
+
+CONF = cfg.CONF
+
+CONF.register_opts([
+    cfg.FloatOpt('stats-interval', default=10.0,
+                 help='stats collector: seconds between polls'),
+    cfg.FloatOpt('stats-jitter', default=0.1,
+                 help='stats collector: random variation of the interval, '
+                      'as a fraction of it'),
+    cfg.IntOpt('stats-concurrency', default=64,
+               help='stats collector: maximum number of stats requests '
+                    'in flight'),
+    cfg.FloatOpt('stats-timeout', default=5.0,
+                 help='stats collector: seconds to wait for a reply'),
+    cfg.IntOpt('stats-history', default=8,
+               help='stats collector: number of samples kept per counter'),
+    cfg.ListOpt('stats-kinds', default=['flow', 'port', 'queue', 'meter',
+                                        'group'],
+                help='stats collector: kinds of statistics to collect'),
+])
+
+# The names of the counters of each kind of statistics
+COUNTERS = {
+    'flow': ('packet_count', 'byte_count'),
+    'port': ('rx_packets', 'tx_packets', 'rx_bytes', 'tx_bytes',
+             'rx_dropped', 'tx_dropped', 'rx_errors', 'tx_errors'),
+    'queue': ('tx_packets', 'tx_bytes', 'tx_errors'),
+    'meter': ('packet_in_count', 'byte_in_count'),
+    'group': ('packet_count', 'byte_count'),
+}
+
+
+# The keys of the entries of each kind of statistics, without the dpid
+_KEYS = {
+    'flow': lambda s: (s.table_id, s.priority,
+                       ofproto_parser.match_key(s.match)),
+    'port': lambda s: (s.port_no,),
+    'queue': lambda s: (s.port_no, s.queue_id),
+    'meter': lambda s: (s.meter_id,),
+    'group': lambda s: (s.group_id,),
+}
+
+
+def _stats_request(datapath, kind):
+    # Returns None if the switch does not support the kind.
+    ofp = datapath.ofproto
+    parser = datapath.ofproto_parser
+    version = ofp.OFP_VERSION
+    if version == ofproto_v1_0.OFP_VERSION:
+        if kind == 'flow':
+            return parser.OFPFlowStatsRequest(
+                datapath, 0, parser.OFPMatch(), 0xff, ofp.OFPP_NONE)
+        elif kind == 'port':
+            return parser.OFPPortStatsRequest(datapath, 0, ofp.OFPP_NONE)
+        elif kind == 'queue':
+            return parser.OFPQueueStatsRequest(
+                datapath, 0, ofp.OFPP_ALL, ofp.OFPQ_ALL)
+        return None
+    if kind == 'flow':
+        return parser.OFPFlowStatsRequest(datapath)
+    elif kind == 'port':
+        return parser.OFPPortStatsRequest(datapath, flags=0,
+                                          port_no=ofp.OFPP_ANY)
+    elif kind == 'queue':
+        return parser.OFPQueueStatsRequest(datapath)
+    elif kind == 'group':
+        return parser.OFPGroupStatsRequest(datapath)
+    elif kind == 'meter' and version >= ofproto_v1_3.OFP_VERSION:
+        return parser.OFPMeterStatsRequest(datapath)
+    return None
+
+
+class StatsTable(object):
+    """
+    The ring buffers of the counters of one kind of statistics of all
+    the switches.
+
+    The samples are stored in numpy arrays with a row per entry, e.g.
+    per (dpid, port_no) for the port statistics, so that the rates of
+    all the entries are computed at once.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    kind          The kind of statistics, e.g. 'port'
+    counters      Tuple of the names of the counters
+    history       The number of samples kept per entry
+    keys          List of the keys of the entries, e.g. (dpid, port_no).
+                  The index in the list is the row in the arrays.
+    ============= ==========================================================
+    """
+
+    def __init__(self, kind, history):
+        super(StatsTable, self).__init__()
+        self.kind = kind
+        self.counters = COUNTERS[kind]
+        self.history = history
+        self.keys = []
+        self._index = {}  # key => row
+        self._dpids = {}  # dpid => set of keys
+        self._alloc(0)
+
+    def _alloc(self, size):
+        values = np.zeros((size, self.history, len(self.counters)),
+                          dtype=np.uint64)
+        times = np.zeros((size, self.history))
+        pos = np.zeros(size, dtype=np.intp)  # next sample to overwrite
+        count = np.zeros(size, dtype=np.intp)  # samples stored
+        n = len(self.keys)
+        if n:
+            values[:n] = self._values[:n]
+            times[:n] = self._times[:n]
+            pos[:n] = self._pos[:n]
+            count[:n] = self._count[:n]
+        self._values = values
+        self._times = times
+        self._pos = pos
+        self._count = count
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _row(self, key):
+        row = self._index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self._pos):
+                self._alloc(max(16, row * 2))
+            self.keys.append(key)
+            self._index[key] = row
+        return row
+
+    def _remove(self, keys):
+        n = len(self.keys)
+        keep = np.ones(n, dtype=bool)
+        keep[[self._index[key] for key in keys]] = False
+        self._values = self._values[:n][keep]
+        self._times = self._times[:n][keep]
+        self._pos = self._pos[:n][keep]
+        self._count = self._count[:n][keep]
+        self.keys = [key for key in self.keys if key not in keys]
+        self._index = dict((key, row) for row, key in enumerate(self.keys))
+
+    def update(self, dpid, keys, times, values):
+        """
+        Stores a sample of the entries of a switch.  keys is the list of
+        the keys of the entries, times is an array of their times in
+        seconds and values is an array of their counters, a row per
+        entry.  The entries of the switch which are not in keys are
+        removed.
+        """
+        keys = [(dpid,) + key for key in keys]
+        stale = self._dpids.get(dpid, set()).difference(keys)
+        if stale:
+            self._remove(stale)
+        self._dpids[dpid] = set(keys)
+        if not keys:
+            return
+        rows = np.array([self._row(key) for key in keys], dtype=np.intp)
+        pos = self._pos[rows]
+        self._values[rows, pos] = values
+        self._times[rows, pos] = times
+        self._pos[rows] = (pos + 1) % self.history
+        self._count[rows] = np.minimum(self._count[rows] + 1, self.history)
+
+    def remove(self, dpid):
+        """
+        Removes the entries of a switch.
+        """
+        keys = self._dpids.pop(dpid, None)
+        if keys:
+            self._remove(keys)
+
+    def _latest(self, back):
+        n = len(self.keys)
+        rows = np.arange(n)
+        cols = (self._pos[:n] - back) % self.history
+        return self._values[rows, cols], self._times[rows, cols]
+
+    def values(self):
+        """
+        Returns an array of the latest counters, a row per entry.
+        """
+        return self._latest(1)[0]
+
+    def rates(self):
+        """
+        Returns an array of the rates per second of the counters between
+        the last two samples, a row per entry.  The rates are NaN unless
+        there are two samples, or if the counter has been reset.
+        """
+        cur, cur_times = self._latest(1)
+        prev, prev_times = self._latest(2)
+        period = cur_times - prev_times
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = (cur - prev).astype(np.float64) / period[:, np.newaxis]
+        rates[(self._count[:len(self.keys)] < 2) | (period <= 0)] = np.nan
+        rates[cur < prev] = np.nan
+        return rates
+
+    def samples(self, key):
+        """
+        Returns the times and the counters of the samples of the entry,
+        the oldest first.
+        """
+        row = self._index[key]
+        count = self._count[row]
+        cols = (self._pos[row] - count + np.arange(count)) % self.history
+        return self._times[row, cols], self._values[row, cols]
+
+
+class StatsSnapshot(object):
+    """
+    The statistics of one kind of all the switches at the end of
+    a round of polling.
+
+    ============= ==========================================================
+    Attribute     Description
+    ============= ==========================================================
+    kind          The kind of statistics, e.g. 'port'
+    counters      Tuple of the names of the counters, i.e. the columns of
+                  values and rates
+    keys          List of the keys of the entries, i.e. the rows of values
+                  and rates.  (dpid, port_no) for 'port', (dpid, port_no,
+                  queue_id) for 'queue', (dpid, meter_id) for 'meter',
+                  (dpid, group_id) for 'group', and (dpid, table_id,
+                  priority, serialized match) for 'flow'.
+    values        numpy array of the latest counters
+    rates         numpy array of the rates per second of the counters;
+                  NaN if unknown
+    ============= ==========================================================
+    """
+
+    def __init__(self, table):
+        super(StatsSnapshot, self).__init__()
+        self.kind = table.kind
+        self.counters = table.counters
+        self.keys = list(table.keys)
+        self.values = table.values()
+        self.rates = table.rates()
+        self._index = None
+
+    def index(self, key):
+        """
+        Returns the row of the entry in values and rates.
+        """
+        if self._index is None:
+            self._index = dict((k, row) for row, k in enumerate(self.keys))
+        return self._index[key]
+
+    def rate(self, key, counter):
+        return self.rates[self.index(key), self.counters.index(counter)]
+
+    def __repr__(self):
+        return '%s(kind=%r, entries=%d)' % (self.__class__.__name__,
+                                            self.kind, len(self.keys))
+
+
+class EventStatsSnapshot(event.EventBase):
+    """
+    An event class to notify the end of a round of polling.
+
+    ========= =================================================================
+    Attribute Description
+    ========= =================================================================
+    timestamp The time the round has started at
+    snapshots A dict of kind => StatsSnapshot
+    ========= =================================================================
+    """
+
+    def __init__(self, timestamp, snapshots):
+        super(EventStatsSnapshot, self).__init__()
+        self.timestamp = timestamp
+        self.snapshots = snapshots
+
+
+class StatsCollector(app_manager.RyuApp):
+    """
+    Service app to poll the statistics of all the switches.
+
+    Usage Example::
+
+        # ...(snip)...
+        from ryu.controller import stats_collector
+
+
+        class MyApp(app_manager.RyuApp):
+            _CONTEXTS = {
+                'stats_collector': stats_collector.StatsCollector,
+            }
+
+            @set_ev_cls(stats_collector.EventStatsSnapshot)
+            def _stats_handler(self, ev):
+                ports = ev.snapshots['port']
+                tx_bytes = ports.counters.index('tx_bytes')
+                for key, rates in zip(ports.keys, ports.rates):
+                    self.logger.info('%s: %f bytes/s', key, rates[tx_bytes])
+    """
+
+    _EVENTS = [EventStatsSnapshot]
+
+    def __init__(self, *args, **kwargs):
+        super(StatsCollector, self).__init__(*args, **kwargs)
+        self.name = 'stats_collector'
+
+        self.interval = self.CONF.stats_interval
+        self.jitter = self.CONF.stats_jitter
+        self.concurrency = self.CONF.stats_concurrency
+        self.timeout = self.CONF.stats_timeout
+        self.datapaths = {}  # datapath_id => Datapath
+        self.tables = dict((kind, StatsTable(kind, self.CONF.stats_history))
+                           for kind in self.CONF.stats_kinds)
+        self.snapshots = {}  # kind => the latest StatsSnapshot
+        self._poll_thread = None
+
+    def start(self):
+        self._poll_thread = hub.spawn(self._poll_loop)
+        return super(StatsCollector, self).start()
+
+    def stop(self):
+        if self._poll_thread is not None:
+            hub.kill(self._poll_thread)
+            hub.joinall([self._poll_thread])
+            self._poll_thread = None
+        super(StatsCollector, self).stop()
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [handler.MAIN_DISPATCHER, handler.DEAD_DISPATCHER])
+    def _state_change_handler(self, ev):
+        datapath = ev.datapath
+        if ev.state == handler.MAIN_DISPATCHER:
+            self.datapaths[datapath.id] = datapath
+        elif ev.state == handler.DEAD_DISPATCHER:
+            if self.datapaths.get(datapath.id) is datapath:
+                del self.datapaths[datapath.id]
+                for table in self.tables.values():
+                    table.remove(datapath.id)
+
+    def _poll_loop(self):
+        while True:
+            start = time.time()
+            try:
+                self.poll()
+            except Exception:
+                # Keeps polling in the next round.
+                LOG.exception('STATS_COLLECTOR: polling failed')
+            interval = self.interval * (
+                1 + random.uniform(-self.jitter, self.jitter))
+            hub.sleep(max(0, start + interval - time.time()))
+
+    def poll(self):
+        """
+        Polls all the switches once, and then publishes the snapshots.
+        """
+        timestamp = time.time()
+        jobs = [(datapath, kind) for datapath in self.datapaths.values()
+                for kind in self.tables]
+        # Not to poll the switches always in the same order
+        random.shuffle(jobs)
+
+        sem = hub.BoundedSemaphore(self.concurrency)
+        release = lambda future: sem.release()
+        futures = []
+        for datapath, kind in jobs:
+            try:
+                future = self._request(datapath, kind, sem)
+            except Exception:
+                # e.g. the datapath has gone
+                LOG.exception('STATS_COLLECTOR: %s %s stats: '
+                              'failed to send the request',
+                              dpid_to_str(datapath.id), kind)
+                continue
+            if future is not None:
+                future.add_done_callback(release)
+                futures.append((datapath, kind, future))
+
+        for datapath, kind, future in futures:
+            try:
+                msgs = future.result()
+            except request.RequestError as e:
+                LOG.debug('STATS_COLLECTOR: %s %s stats: %s',
+                          dpid_to_str(datapath.id), kind, e)
+                continue
+            try:
+                self._store(datapath, kind, msgs, time.time())
+            except Exception:
+                # e.g. an unexpected reply
+                LOG.exception('STATS_COLLECTOR: %s %s stats: '
+                              'failed to store the reply',
+                              dpid_to_str(datapath.id), kind)
+
+        self.snapshots = dict((kind, StatsSnapshot(table))
+                              for kind, table in self.tables.items())
+        self.send_event_to_observers(
+            EventStatsSnapshot(timestamp, self.snapshots))
+
+    def _request(self, datapath, kind, sem):
+        req = _stats_request(datapath, kind)
+        if req is None:
+            return None
+        sem.acquire()
+        try:
+            return datapath.request(req, timeout=self.timeout)
+        except Exception:
+            sem.release()
+            raise
+
+    def _store(self, datapath, kind, msgs, now):
+        body = [stats for msg in msgs for stats in msg.body]
+        if not body:
+            self.tables[kind].update(datapath.id, [], None, None)
+            return
+        if (kind == 'flow' and
+                datapath.ofproto.OFP_VERSION >= ofproto_v1_5.OFP_VERSION):
+            # The counters are in OXS fields.
+            values = [(s.stats.get('packet_count', 0),
+                       s.stats.get('byte_count', 0)) for s in body]
+        else:
+            get = operator.attrgetter(*COUNTERS[kind])
+            values = [get(s) for s in body]
+        if getattr(body[0], 'duration_sec', None) is not None:
+            # More accurate than the time the reply has been received at
+            durations = np.array(
+                [(s.duration_sec, s.duration_nsec) for s in body],
+                dtype=np.float64)
+            times = durations[:, 0] + durations[:, 1] / 1e9
+        else:
+            times = now
+        key = _KEYS[kind]
+        self.tables[kind].update(
+            datapath.id, [key(s) for s in body], times,
+            np.array(values, dtype=np.uint64))
+
+    def get_snapshot(self, kind):
+        """
+        Returns the StatsSnapshot of the kind at the end of the latest
+        round, or None.
+        """
+        return self.snapshots.get(kind)
+
+    def get_samples(self, kind, key):
+        """
+        Returns the times and the counters of the samples of the entry
+        of the kind, the oldest first.  See StatsTable.samples().
+        """
+        return self.tables[kind].samples(key)
@@ -0,0 +1,304 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Multi-process mode of OpenFlow controller.
+
+With ``--ofp-workers N``, ryu-manager forks N worker processes before
+loading the applications, so that each worker runs its own AppManager and
+applications.  The parent process only listens on the OpenFlow ports and
+hands each accepted socket over to one of the workers in round robin,
+passing the file descriptor over a Unix domain socket (SCM_RIGHTS).
+
+With ``--ofp-worker-by-dpid``, a worker which receives the FeaturesReply
+of a switch whose datapath ID does not belong to it (datapath ID modulo N)
+hands the connection over to the right worker through the parent process,
+together with the received but not yet dispatched bytes.  The new worker
+resumes the connection from the FeaturesReply, so that the applications
+see the switch only in the worker it belongs to.  SSL connections can not
+be handed over once the TLS session has been established and stay in the
+worker which accepted them.
+
+The things which must not be duplicated, the connections to
+``--ofp-switch-address-list`` and the WSGI server, run in worker 0.
+
+This mode requires Python 3.3 or later for socket.sendmsg/recvmsg.
+"""
+
+import collections
+import json
+import logging
+import os
+import signal
+import socket
+import ssl
+import struct
+import sys
+
+from ryu import cfg
+from ryu.lib import hub
+from ryu.ofproto import ofproto_common
+
+import ryu.controller.controller
+
+
+LOG = logging.getLogger('ryu.controller.worker')
+
+CONF = cfg.CONF
+
+# The maximum number of file descriptors received at once.
+MAX_FDS = 16
+CHANNEL_RECV_SIZE = 64 * 1024
+
+# The index of this worker and the number of workers, or None in the parent
+# process and in the single process mode.
+_index = None
+_count = None
+_channel = None
+
+
+class _Channel(object):
+    """
+    A Unix domain stream socket between the parent and a worker, which
+    carries frames of a JSON encoded dict and data, each with a file
+    descriptor attached.
+
+    The file descriptors are queued in the order of arrival and paired with
+    the frames in order, because the kernel does not keep the boundaries of
+    the writes on a stream socket.
+    """
+
+    _HEADER = struct.Struct('!II')  # length of meta and data
+
+    def __init__(self, sock, pid=None):
+        self.sock = sock
+        self.pid = pid
+        self._send_sem = hub.Semaphore()
+        self._buf = bytearray()
+        self._fds = collections.deque()
+
+    def send(self, meta, data, fd):
+        meta = json.dumps(meta).encode('utf-8')
+        frame = self._HEADER.pack(len(meta), len(data)) + meta + data
+        # Frames must not be interleaved.
+        with self._send_sem:
+            hub.send_fd(self.sock, frame, fd)
+
+    def recv(self):
+        """
+        Returns a tuple of the meta, the data and the file descriptor of
+        the next frame.  Raises EOFError if the peer has closed the channel.
+        """
+        header_size = self._HEADER.size
+        while True:
+            if len(self._buf) >= header_size:
+                meta_len, data_len = self._HEADER.unpack_from(self._buf)
+                data_start = header_size + meta_len
+                end = data_start + data_len
+                if len(self._buf) >= end and self._fds:
+                    meta = json.loads(
+                        bytes(self._buf[header_size:data_start]).decode(
+                            'utf-8'))
+                    data = bytes(self._buf[data_start:end])
+                    del self._buf[:end]
+                    return meta, data, self._fds.popleft()
+
+            data, fds = hub.recv_fds(self.sock, CHANNEL_RECV_SIZE, MAX_FDS)
+            self._fds.extend(fds)
+            if not data:
+                for fd in self._fds:
+                    os.close(fd)
+                self._fds.clear()
+                raise EOFError('channel closed')
+            self._buf += data
+
+    def close(self):
+        self.sock.close()
+
+
+def is_primary():
+    """
+    Returns True in the single process mode and in worker 0, which runs the
+    things which must not be duplicated among the workers.
+    """
+    return not _index
+
+
+def index():
+    """
+    Returns the index of this worker, or None if not a worker.
+    """
+    return _index
+
+
+def start(count):
+    """
+    Fork count worker processes.
+
+    Returns True in the workers, which then go on to load the applications.
+    In the parent process, accepts the switch connections and hands them
+    over to the workers until one of them exits, and then returns False.
+    """
+    global _index, _count, _channel
+    assert count > 0
+
+    channels = []
+    for i in range(count):
+        parent_sock, child_sock = socket.socketpair(socket.AF_UNIX,
+                                                    socket.SOCK_STREAM)
+        pid = hub.fork()
+        if pid == 0:
+            parent_sock.close()
+            for channel in channels:
+                channel.close()
+            _index = i
+            _count = count
+            _channel = _Channel(child_sock)
+            LOG.info('worker %d started (pid %d)', i, os.getpid())
+            return True
+        child_sock.close()
+        channels.append(_Channel(parent_sock, pid))
+
+    _Parent(channels).serve()
+    return False
+
+
+class _Parent(object):
+    def __init__(self, channels):
+        self.channels = channels
+        self._next = 0
+
+    def _listen_ports(self):
+        # Same as OpenFlowController.
+        if not CONF.ofp_tcp_listen_port and not CONF.ofp_ssl_listen_port:
+            ports = [(ofproto_common.OFP_TCP_PORT,
+                      ofproto_common.OFP_SSL_PORT),
+                     (ofproto_common.OFP_TCP_PORT_OLD,
+                      ofproto_common.OFP_SSL_PORT_OLD)]
+        else:
+            ports = [(CONF.ofp_tcp_listen_port, CONF.ofp_ssl_listen_port)]
+        use_ssl = bool(ryu.controller.controller._ssl_args())
+        return [ssl_port if use_ssl else tcp_port
+                for tcp_port, ssl_port in ports]
+
+    def dispatch(self, sock, address):
+        # TLS handshake is done in the worker. (See serve_connections)
+        target = self._next
+        self._next = (self._next + 1) % len(self.channels)
+        try:
+            self.channels[target].send(
+                {'worker': target, 'addr': address, 'family': sock.family},
+                b'', sock.fileno())
+        except (EOFError, IOError) as e:
+            LOG.error('failed to hand over %s to worker %d: %s',
+                      address, target, e)
+        finally:
+            sock.close()
+
+    def _relay_loop(self, channel):
+        # Forward the connections handed over by a worker.
+        while True:
+            try:
+                meta, data, fd = channel.recv()
+            except (EOFError, IOError) as e:
+                LOG.error('lost worker (pid %d): %s', channel.pid, e)
+                return
+            try:
+                self.channels[meta['worker']].send(meta, data, fd)
+            except (EOFError, IOError) as e:
+                LOG.error('failed to hand over %s to worker %d: %s',
+                          meta['addr'], meta['worker'], e)
+            finally:
+                os.close(fd)
+
+    def serve(self):
+        threads = []
+        for port in self._listen_ports():
+            server = hub.StreamServer((CONF.ofp_listen_host, port),
+                                      self.dispatch)
+            threads.append(hub.spawn(server.serve_forever))
+        relays = [hub.spawn(self._relay_loop, channel)
+                  for channel in self.channels]
+        # Terminate the workers also on SIGTERM.
+        signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+        try:
+            # Returns when any worker has exited.
+            while not any(relay.dead for relay in relays):
+                hub.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for thr in threads + relays:
+                hub.kill(thr)
+            for channel in self.channels:
+                LOG.info('terminating worker (pid %d)', channel.pid)
+                try:
+                    os.kill(channel.pid, signal.SIGTERM)
+                    os.waitpid(channel.pid, 0)
+                except OSError:
+                    pass
+
+
+def serve_connections():
+    """
+    Serve the switch connections handed over from the parent process.
+    """
+    ssl_args = ryu.controller.controller._ssl_args()
+    handoff = _handoff if CONF.ofp_worker_by_dpid else None
+    while True:
+        try:
+            meta, data, fd = _channel.recv()
+        except (EOFError, IOError) as e:
+            LOG.error('lost the parent process: %s', e)
+            return
+        sock = socket.fromfd(fd, meta['family'], socket.SOCK_STREAM)
+        os.close(fd)
+        address = tuple(meta['addr'])
+        resume = None
+        if 'version' in meta:
+            resume = (meta['version'], data)
+        elif ssl_args:
+            sock = ssl.wrap_socket(sock, server_side=True, **ssl_args)
+        hub.spawn(ryu.controller.controller.datapath_connection_factory,
+                  sock, address, handoff=handoff, resume=resume)
+
+
+def _handoff(datapath, msg, buf):
+    # Datapath.handoff hook in the by-dpid mode.
+    if not isinstance(msg, datapath.ofproto_parser.OFPSwitchFeatures):
+        return False
+    datapath.handoff = None
+    target = msg.datapath_id % _count
+    if target == _index:
+        return False
+    if isinstance(datapath.socket, ssl.SSLSocket):
+        LOG.debug('SSL connection from %s stays in worker %d',
+                  datapath.address, _index)
+        return False
+
+    LOG.debug('hand over %s to worker %d', datapath.address, target)
+    meta = {
+        'worker': target,
+        'addr': datapath.address,
+        'family': datapath.socket.family,
+        'version': datapath.ofproto.OFP_VERSION,
+    }
+    try:
+        _channel.send(meta, msg.buf + buf.tobytes(), datapath.socket.fileno())
+    except (EOFError, IOError) as e:
+        LOG.error('failed to hand over %s to worker %d: %s',
+                  datapath.address, target, e)
+        return False
+    return True
@@ -14,17 +14,72 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+Conversions of MAC, IPv4 and IPv6 addresses between the binary (packed)
+and the text representations.
+
+The common formats are converted with the socket and binascii modules,
+and the others with netaddr.  The results are cached for the most
+recently used CACHE_SIZE addresses, as the same addresses are usually
+converted over and over; the statistics of the caches are returned by
+cache_info() of the converters, e.g. addrconv.mac.cache_info().
+"""
+
+import binascii
+import socket
+
 import netaddr
+import six
+
+from ryu import utils
+
+
+# Number of the addresses cached by each converter for each direction
+CACHE_SIZE = 4096
 
 
 class AddressConverter(object):
-    def __init__(self, addr, strat, fallback=None, **kwargs):
+    def __init__(self, addr, strat, fallback=None, fast_text_to_bin=None,
+                 fast_bin_to_text=None, **kwargs):
         self._addr = addr
         self._strat = strat
         self._fallback = fallback
         self._addr_kwargs = kwargs
+        # The conversions of the common formats without netaddr, which
+        # raise an exception for the others.
+        self._fast_text_to_bin = fast_text_to_bin
+        self._fast_bin_to_text = fast_bin_to_text
+        self._cached_text_to_bin = utils.lru_cache(CACHE_SIZE)(
+            self._text_to_bin)
+        self._cached_bin_to_text = utils.lru_cache(CACHE_SIZE)(
+            self._bin_to_text)
 
     def text_to_bin(self, text):
+        return self._cached_text_to_bin(text)
+
+    def bin_to_text(self, bin):
+        return self._cached_bin_to_text(bin)
+
+    def cache_info(self):
+        """
+        Returns the statistics of the caches of text_to_bin() and
+        bin_to_text(), as a dict of utils.CacheInfo.
+        """
+        return {
+            'text_to_bin': self._cached_text_to_bin.cache_info(),
+            'bin_to_text': self._cached_bin_to_text.cache_info(),
+        }
+
+    def cache_clear(self):
+        self._cached_text_to_bin.cache_clear()
+        self._cached_bin_to_text.cache_clear()
+
+    def _text_to_bin(self, text):
+        if self._fast_text_to_bin is not None:
+            try:
+                return self._fast_text_to_bin(text)
+            except Exception:
+                pass
         try:
             return self._addr(text, **self._addr_kwargs).packed
         except Exception as e:
@@ -36,20 +91,67 @@ class AddressConverter(object):
             ip = self._fallback(text, **self._addr_kwargs)
             return ip.ip.packed, ip.netmask.packed
 
-    def bin_to_text(self, bin):
+    def _bin_to_text(self, bin):
+        if self._fast_bin_to_text is not None:
+            try:
+                return self._fast_bin_to_text(bin)
+            except Exception:
+                pass
         return str(self._addr(self._strat.packed_to_int(bin),
                               **self._addr_kwargs))
 
 
+def _ipv4_text_to_bin(text):
+    bin_ = socket.inet_pton(socket.AF_INET, text)
+    # Only the canonical dotted-quad, e.g. not '01.2.3.4'
+    if socket.inet_ntoa(bin_) != text:
+        raise ValueError(text)
+    return bin_
+
+
+def _ipv4_bin_to_text(bin_):
+    return socket.inet_ntoa(bin_)
+
+
+def _ipv6_text_to_bin(text):
+    return socket.inet_pton(socket.AF_INET6, text)
+
+
+def _ipv6_bin_to_text(bin_):
+    return socket.inet_ntop(socket.AF_INET6, bin_)
+
+
+_MAC_TEXT_FMT = ':'.join(['%02x'] * 6)
+
+
+def _mac_text_to_bin(text):
+    # 'xx:xx:xx:xx:xx:xx' only
+    if len(text) != 17 or text[2::3] != ':::::':
+        raise ValueError(text)
+    return binascii.unhexlify(text.replace(':', ''))
+
+
+def _mac_bin_to_text(bin_):
+    if len(bin_) != 6:
+        raise ValueError(bin_)
+    return _MAC_TEXT_FMT % tuple(six.iterbytes(bin_))
+
+
 ipv4 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4,
-                        fallback=netaddr.IPNetwork, version=4)
+                        fallback=netaddr.IPNetwork,
+                        fast_text_to_bin=_ipv4_text_to_bin,
+                        fast_bin_to_text=_ipv4_bin_to_text, version=4)
 ipv6 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6,
-                        fallback=netaddr.IPNetwork, version=6)
+                        fallback=netaddr.IPNetwork,
+                        fast_text_to_bin=_ipv6_text_to_bin,
+                        fast_bin_to_text=_ipv6_bin_to_text, version=6)
 
 
 class mac_mydialect(netaddr.mac_unix):
     word_fmt = '%.2x'
 
 
-mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48, version=48,
+mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48,
+                       fast_text_to_bin=_mac_text_to_bin,
+                       fast_bin_to_text=_mac_bin_to_text, version=48,
                        dialect=mac_mydialect)
@@ -33,11 +33,15 @@ if HUB_TYPE == 'eventlet':
     # https://github.com/eventlet/eventlet/issues/401
     eventlet.sleep()
     import eventlet.event
+    import eventlet.hubs
     import eventlet.queue
     import eventlet.semaphore
     import eventlet.timeout
+    import eventlet.tpool
     import eventlet.wsgi
     from eventlet import websocket
+    import array
+    import errno
     import greenlet
     import ssl
     import socket
@@ -109,6 +113,10 @@ if HUB_TYPE == 'eventlet':
     BoundedSemaphore = eventlet.semaphore.BoundedSemaphore
     TaskExit = greenlet.GreenletExit
 
+    # Calls a blocking function, e.g. doing file I/O, in a native thread,
+    # and returns its result without blocking the other hub threads.
+    execute = eventlet.tpool.execute
+
     class StreamServer(object):
         def __init__(self, listen_info, handle=None, backlog=None,
                      spawn='default', **ssl_args):
@@ -172,6 +180,98 @@ if HUB_TYPE == 'eventlet':
         def stop(self):
             self._is_active = False
 
+    # The maximum number of buffers passed to a single sendmsg() call.
+    # (IOV_MAX on Linux)
+    SENDMSG_MAX_BUFFERS = 1024
+
+    def sendmsg(sock, buffers):
+        """
+        Write all the given buffers to sock with scatter-gather I/O.
+
+        Yields to other green threads while the socket is not writable.
+        Falls back to sendall() with the concatenated buffers if sock does
+        not support sendmsg(), e.g., SSL sockets or on Python 2.
+        """
+        # The green socket wraps the non-blocking one as "fd".
+        fd = getattr(sock, 'fd', sock)
+        if isinstance(sock, ssl.SSLSocket) or not hasattr(fd, 'sendmsg'):
+            sock.sendall(bytearray().join(buffers))
+            return
+
+        timeout = sock.gettimeout()
+        bufs = list(buffers)
+        i = 0
+        while i < len(bufs):
+            try:
+                sent = fd.sendmsg(bufs[i:i + SENDMSG_MAX_BUFFERS])
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+                eventlet.hubs.trampoline(
+                    fd, write=True, timeout=timeout,
+                    timeout_exc=socket.timeout('timed out'))
+                continue
+            while i < len(bufs) and sent >= len(bufs[i]):
+                sent -= len(bufs[i])
+                i += 1
+            if sent:
+                bufs[i] = memoryview(bufs[i])[sent:]
+
+    def send_fd(sock, data, fd):
+        """
+        Send data with the file descriptor fd attached (SCM_RIGHTS) over
+        the Unix domain socket sock.  Requires Python 3.3 or later.
+        """
+        raw = getattr(sock, 'fd', sock)
+        fds = array.array('i', [fd])
+        while True:
+            try:
+                sent = raw.sendmsg(
+                    [data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+                break
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+                eventlet.hubs.trampoline(raw, write=True)
+        if sent < len(data):
+            # The file descriptor has gone with the first chunk.
+            sock.sendall(data[sent:])
+
+    def recv_fds(sock, bufsize, maxfds):
+        """
+        Receive up to bufsize bytes and up to maxfds file descriptors
+        attached to them over the Unix domain socket sock.
+        Returns a tuple of the data and a list of the file descriptors.
+        Requires Python 3.3 or later.
+        """
+        raw = getattr(sock, 'fd', sock)
+        fds = array.array('i')
+        while True:
+            try:
+                data, ancdata, _flags, _addr = raw.recvmsg(
+                    bufsize, socket.CMSG_SPACE(maxfds * fds.itemsize))
+                break
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+                eventlet.hubs.trampoline(raw, read=True)
+        for level, type_, cdata in ancdata:
+            if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+                fds.frombytes(
+                    cdata[:len(cdata) - (len(cdata) % fds.itemsize)])
+        return data, list(fds)
+
+    def fork():
+        """
+        os.fork() which gives the child process its own hub.
+        Should be called before spawning any thread.
+        """
+        pid = os.fork()
+        if pid == 0:
+            # Don't share the poller of the parent process.
+            eventlet.hubs.use_hub()
+        return pid
+
     class LoggingWrapper(object):
         def write(self, message):
             LOG.info(message.rstrip('\n'))
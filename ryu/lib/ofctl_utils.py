@@ -67,7 +67,16 @@ def match_vid_to_str(value, mask, ofpvid_present):
     return '0x%04x' % value
 
 
-def to_action(dic, ofp, parser, action_type, util):
+# The action classes of each OpenFlow version, which need no arguments
+# or the ethertype only
+_ACTION_CLASSES = {}
+
+
+def _action_classes(ofp, parser):
+    classes = _ACTION_CLASSES.get(parser)
+    if classes is not None:
+        return classes
+
     actions = {COPY_TTL_OUT: parser.OFPActionCopyTtlOut,
                COPY_TTL_IN: parser.OFPActionCopyTtlIn,
                DEC_MPLS_TTL: parser.OFPActionDecMplsTtl,
@@ -82,6 +91,13 @@ def to_action(dic, ofp, parser, action_type, util):
     if ofp.OFP_VERSION > ofproto_v1_2.OFP_VERSION:
         need_ethertype[PUSH_PBB] = parser.OFPActionPushPbb
 
+    classes = _ACTION_CLASSES[parser] = (actions, need_ethertype)
+    return classes
+
+
+def to_action(dic, ofp, parser, action_type, util):
+    actions, need_ethertype = _action_classes(ofp, parser)
+
     if action_type in actions:
         return actions[action_type]()
 
@@ -210,6 +226,23 @@ def to_match_packet_type(value):
         return str_to_int(value)
 
 
+def match_fields(ofmatch):
+    """
+    Returns the list of (field, value, mask) of the OXM fields of
+    the match, as OFPMatch.to_jsondict() lists them, without building
+    the dicts.
+    """
+    composed_with_old_api = getattr(ofmatch, '_composed_with_old_api', None)
+    if composed_with_old_api is not None and composed_with_old_api():
+        # to_jsondict() fills the fields from the old API ones
+        tlvs = ofmatch.to_jsondict()['OFPMatch']['oxm_fields']
+        return [(tlv['OXMTlv']['field'], tlv['OXMTlv']['value'],
+                 tlv['OXMTlv']['mask']) for tlv in tlvs]
+
+    return [(key, uv[0], uv[1]) if isinstance(uv, tuple) else (key, uv, None)
+            for key, uv in ofmatch._fields2]
+
+
 def send_experimenter(dp, exp, logger=None):
     experimenter = exp.get('experimenter', 0)
     exp_type = exp.get('exp_type', 0)
@@ -290,6 +323,8 @@ class OFCtlUtil(object):
             'OFPTFPT_EXPERIMENTER_SLAVE',
             'OFPTFPT_EXPERIMENTER_MASTER',
             'OFPQCFC_EPERM']
+        # prefix -> {value: name without prefix}
+        self._reserved_names = {}
 
     def _reserved_num_from_user(self, num, prefix):
         try:
@@ -305,7 +340,22 @@ class OFCtlUtil(object):
                     "Cannot convert argument to reserved number: %s", num)
         return num
 
+    def _reserved_names_of(self, prefix):
+        names = self._reserved_names.get(prefix)
+        if names is None:
+            names = {}
+            for k, v in self.ofproto.__dict__.items():
+                if k not in self.deprecated_value and \
+                   k.startswith(prefix) and \
+                   isinstance(v, six.integer_types):
+                    # The first one found wins as before.
+                    names.setdefault(v, k.replace(prefix, ''))
+            self._reserved_names[prefix] = names
+        return names
+
     def _reserved_num_to_user(self, num, prefix):
+        if isinstance(num, six.integer_types):
+            return self._reserved_names_of(prefix).get(num, num)
         for k, v in self.ofproto.__dict__.items():
             if k not in self.deprecated_value and \
                k.startswith(prefix) and v == num:
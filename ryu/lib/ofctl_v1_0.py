@@ -320,19 +320,42 @@ def get_queue_stats(dp, waiters, port=None, queue_id=None):
     return {str(dp.id): s}
 
 
-def get_flow_stats(dp, waiters, flow=None):
+def flow_stats_request(dp, flow=None):
     flow = flow if flow else {}
     match = to_match(dp, flow.get('match', {}))
     table_id = UTIL.ofp_table_from_user(
         flow.get('table_id', 0xff))
     out_port = UTIL.ofp_port_from_user(
         flow.get('out_port', dp.ofproto.OFPP_NONE))
+
+    return dp.ofproto_parser.OFPFlowStatsRequest(
+        dp, 0, match, table_id, out_port)
+
+
+def flow_stats_to_dict(stats):
+    actions = actions_to_str(stats.actions)
+    match = match_to_str(stats.match)
+
+    return {'priority': stats.priority,
+            'cookie': stats.cookie,
+            'idle_timeout': stats.idle_timeout,
+            'hard_timeout': stats.hard_timeout,
+            'actions': actions,
+            'match': match,
+            'byte_count': stats.byte_count,
+            'duration_sec': stats.duration_sec,
+            'duration_nsec': stats.duration_nsec,
+            'packet_count': stats.packet_count,
+            'table_id': UTIL.ofp_table_to_user(stats.table_id)}
+
+
+def get_flow_stats(dp, waiters, flow=None):
+    flow = flow if flow else {}
     # Note: OpenFlow does not allow to filter flow entries by priority,
     # but for efficiency, ofctl provides the way to do it.
     priority = str_to_int(flow.get('priority', -1))
 
-    stats = dp.ofproto_parser.OFPFlowStatsRequest(
-        dp, 0, match, table_id, out_port)
+    stats = flow_stats_request(dp, flow)
 
     msgs = []
     ofctl_utils.send_stats_request(dp, stats, waiters, msgs, LOG)
@@ -343,21 +366,7 @@ def get_flow_stats(dp, waiters, flow=None):
             if 0 <= priority != stats.priority:
                 continue
 
-            actions = actions_to_str(stats.actions)
-            match = match_to_str(stats.match)
-
-            s = {'priority': stats.priority,
-                 'cookie': stats.cookie,
-                 'idle_timeout': stats.idle_timeout,
-                 'hard_timeout': stats.hard_timeout,
-                 'actions': actions,
-                 'match': match,
-                 'byte_count': stats.byte_count,
-                 'duration_sec': stats.duration_sec,
-                 'duration_nsec': stats.duration_nsec,
-                 'packet_count': stats.packet_count,
-                 'table_id': UTIL.ofp_table_to_user(stats.table_id)}
-            flows.append(s)
+            flows.append(flow_stats_to_dict(stats))
 
     return {str(dp.id): flows}
 
@@ -494,7 +503,7 @@ def get_port_desc(dp, waiters):
     return {str(dp.id): descs}
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     priority = str_to_int(
         flow.get('priority', dp.ofproto.OFP_DEFAULT_PRIORITY))
@@ -508,7 +517,7 @@ def mod_flow_entry(dp, flow, cmd):
     actions = to_actions(dp, flow.get('actions', []))
     match = to_match(dp, flow.get('match', {}))
 
-    flow_mod = dp.ofproto_parser.OFPFlowMod(
+    return dp.ofproto_parser.OFPFlowMod(
         datapath=dp, match=match, cookie=cookie,
         command=cmd, idle_timeout=idle_timeout,
         hard_timeout=hard_timeout, priority=priority,
@@ -516,6 +525,17 @@ def mod_flow_entry(dp, flow, cmd):
         flags=flags,
         actions=actions)
 
+
+def to_flow_mods(dp, flows, cmd):
+    """
+    Returns the list of the flow mod messages of the flow entries, in
+    the format of mod_flow_entry(), to be sent in bulk.
+    """
+    return [to_flow_mod(dp, flow, cmd) for flow in flows]
+
+
+def mod_flow_entry(dp, flow, cmd):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
 
 
@@ -164,61 +164,73 @@ def actions_to_str(instructions):
     return actions
 
 
-def to_match(dp, attrs):
-    convert = {'in_port': UTIL.ofp_port_from_user,
-               'in_phy_port': str_to_int,
-               'metadata': ofctl_utils.to_match_masked_int,
-               'dl_dst': ofctl_utils.to_match_eth,
-               'dl_src': ofctl_utils.to_match_eth,
-               'eth_dst': ofctl_utils.to_match_eth,
-               'eth_src': ofctl_utils.to_match_eth,
-               'dl_type': str_to_int,
-               'eth_type': str_to_int,
-               'dl_vlan': to_match_vid,
-               'vlan_vid': to_match_vid,
-               'vlan_pcp': str_to_int,
-               'ip_dscp': str_to_int,
-               'ip_ecn': str_to_int,
-               'nw_proto': str_to_int,
-               'ip_proto': str_to_int,
-               'nw_src': ofctl_utils.to_match_ip,
-               'nw_dst': ofctl_utils.to_match_ip,
-               'ipv4_src': ofctl_utils.to_match_ip,
-               'ipv4_dst': ofctl_utils.to_match_ip,
-               'tp_src': str_to_int,
-               'tp_dst': str_to_int,
-               'tcp_src': str_to_int,
-               'tcp_dst': str_to_int,
-               'udp_src': str_to_int,
-               'udp_dst': str_to_int,
-               'sctp_src': str_to_int,
-               'sctp_dst': str_to_int,
-               'icmpv4_type': str_to_int,
-               'icmpv4_code': str_to_int,
-               'arp_op': str_to_int,
-               'arp_spa': ofctl_utils.to_match_ip,
-               'arp_tpa': ofctl_utils.to_match_ip,
-               'arp_sha': ofctl_utils.to_match_eth,
-               'arp_tha': ofctl_utils.to_match_eth,
-               'ipv6_src': ofctl_utils.to_match_ip,
-               'ipv6_dst': ofctl_utils.to_match_ip,
-               'ipv6_flabel': str_to_int,
-               'icmpv6_type': str_to_int,
-               'icmpv6_code': str_to_int,
-               'ipv6_nd_target': ofctl_utils.to_match_ip,
-               'ipv6_nd_sll': ofctl_utils.to_match_eth,
-               'ipv6_nd_tll': ofctl_utils.to_match_eth,
-               'mpls_label': str_to_int,
-               'mpls_tc': str_to_int}
-
-    keys = {'dl_dst': 'eth_dst',
-            'dl_src': 'eth_src',
-            'dl_type': 'eth_type',
-            'dl_vlan': 'vlan_vid',
-            'nw_src': 'ipv4_src',
-            'nw_dst': 'ipv4_dst',
-            'nw_proto': 'ip_proto'}
+def to_match_vid(value):
+    return ofctl_utils.to_match_vid(value, ofproto_v1_2.OFPVID_PRESENT)
+
+
+# The converters of the match fields, from the user's field names to
+# the OFPMatch ones.
+_MATCH_CONVERT = {'in_port': UTIL.ofp_port_from_user,
+                  'in_phy_port': str_to_int,
+                  'metadata': ofctl_utils.to_match_masked_int,
+                  'dl_dst': ofctl_utils.to_match_eth,
+                  'dl_src': ofctl_utils.to_match_eth,
+                  'eth_dst': ofctl_utils.to_match_eth,
+                  'eth_src': ofctl_utils.to_match_eth,
+                  'dl_type': str_to_int,
+                  'eth_type': str_to_int,
+                  'dl_vlan': to_match_vid,
+                  'vlan_vid': to_match_vid,
+                  'vlan_pcp': str_to_int,
+                  'ip_dscp': str_to_int,
+                  'ip_ecn': str_to_int,
+                  'nw_proto': str_to_int,
+                  'ip_proto': str_to_int,
+                  'nw_src': ofctl_utils.to_match_ip,
+                  'nw_dst': ofctl_utils.to_match_ip,
+                  'ipv4_src': ofctl_utils.to_match_ip,
+                  'ipv4_dst': ofctl_utils.to_match_ip,
+                  'tp_src': str_to_int,
+                  'tp_dst': str_to_int,
+                  'tcp_src': str_to_int,
+                  'tcp_dst': str_to_int,
+                  'udp_src': str_to_int,
+                  'udp_dst': str_to_int,
+                  'sctp_src': str_to_int,
+                  'sctp_dst': str_to_int,
+                  'icmpv4_type': str_to_int,
+                  'icmpv4_code': str_to_int,
+                  'arp_op': str_to_int,
+                  'arp_spa': ofctl_utils.to_match_ip,
+                  'arp_tpa': ofctl_utils.to_match_ip,
+                  'arp_sha': ofctl_utils.to_match_eth,
+                  'arp_tha': ofctl_utils.to_match_eth,
+                  'ipv6_src': ofctl_utils.to_match_ip,
+                  'ipv6_dst': ofctl_utils.to_match_ip,
+                  'ipv6_flabel': str_to_int,
+                  'icmpv6_type': str_to_int,
+                  'icmpv6_code': str_to_int,
+                  'ipv6_nd_target': ofctl_utils.to_match_ip,
+                  'ipv6_nd_sll': ofctl_utils.to_match_eth,
+                  'ipv6_nd_tll': ofctl_utils.to_match_eth,
+                  'mpls_label': str_to_int,
+                  'mpls_tc': str_to_int}
+
+_MATCH_KEYS = {'dl_dst': 'eth_dst',
+               'dl_src': 'eth_src',
+               'dl_type': 'eth_type',
+               'dl_vlan': 'vlan_vid',
+               'nw_src': 'ipv4_src',
+               'nw_dst': 'ipv4_dst',
+               'nw_proto': 'ip_proto'}
+
+_TP_KEYS = {inet.IPPROTO_TCP: {'tp_src': 'tcp_src',
+                               'tp_dst': 'tcp_dst'},
+            inet.IPPROTO_UDP: {'tp_src': 'udp_src',
+                               'tp_dst': 'udp_dst'}}
 
+
+def to_match(dp, attrs):
     if attrs.get('dl_type') == ether.ETH_TYPE_ARP or \
             attrs.get('eth_type') == ether.ETH_TYPE_ARP:
         if 'nw_src' in attrs and 'arp_spa' not in attrs:
@@ -230,19 +242,15 @@ def to_match(dp, attrs):
 
     kwargs = {}
     for key, value in attrs.items():
-        if key in keys:
+        if key in _MATCH_KEYS:
             # For old field name
-            key = keys[key]
-        if key in convert:
-            value = convert[key](value)
+            key = _MATCH_KEYS[key]
+        if key in _MATCH_CONVERT:
+            value = _MATCH_CONVERT[key](value)
             if key == 'tp_src' or key == 'tp_dst':
                 # TCP/UDP port
-                conv = {inet.IPPROTO_TCP: {'tp_src': 'tcp_src',
-                                           'tp_dst': 'tcp_dst'},
-                        inet.IPPROTO_UDP: {'tp_src': 'udp_src',
-                                           'tp_dst': 'udp_dst'}}
                 ip_proto = attrs.get('nw_proto', attrs.get('ip_proto', 0))
-                key = conv[ip_proto][key]
+                key = _TP_KEYS[ip_proto][key]
                 kwargs[key] = value
             else:
                 # others
@@ -253,10 +261,6 @@ def to_match(dp, attrs):
     return dp.ofproto_parser.OFPMatch(**kwargs)
 
 
-def to_match_vid(value):
-    return ofctl_utils.to_match_vid(value, ofproto_v1_2.OFPVID_PRESENT)
-
-
 def match_to_str(ofmatch):
 
     keys = {'eth_src': 'dl_src',
@@ -273,14 +277,9 @@ def match_to_str(ofmatch):
 
     match = {}
 
-    ofmatch = ofmatch.to_jsondict()['OFPMatch']
-    ofmatch = ofmatch['oxm_fields']
-    for match_field in ofmatch:
-        key = match_field['OXMTlv']['field']
+    for key, value, mask in ofctl_utils.match_fields(ofmatch):
         if key in keys:
             key = keys[key]
-        mask = match_field['OXMTlv']['mask']
-        value = match_field['OXMTlv']['value']
         if key == 'dl_vlan':
             value = match_vid_to_str(value, mask)
         elif key == 'in_port':
@@ -383,7 +382,7 @@ def get_queue_config(dp, waiters, port=None):
     return {str(dp.id): configs}
 
 
-def get_flow_stats(dp, waiters, flow=None):
+def flow_stats_request(dp, flow=None):
     flow = flow if flow else {}
     table_id = UTIL.ofp_table_from_user(
         flow.get('table_id', dp.ofproto.OFPTT_ALL))
@@ -394,12 +393,35 @@ def get_flow_stats(dp, waiters, flow=None):
     cookie = str_to_int(flow.get('cookie', 0))
     cookie_mask = str_to_int(flow.get('cookie_mask', 0))
     match = to_match(dp, flow.get('match', {}))
+
+    return dp.ofproto_parser.OFPFlowStatsRequest(
+        dp, table_id, out_port, out_group, cookie, cookie_mask, match)
+
+
+def flow_stats_to_dict(stats):
+    actions = actions_to_str(stats.instructions)
+    match = match_to_str(stats.match)
+    return {'priority': stats.priority,
+            'cookie': stats.cookie,
+            'idle_timeout': stats.idle_timeout,
+            'hard_timeout': stats.hard_timeout,
+            'actions': actions,
+            'match': match,
+            'byte_count': stats.byte_count,
+            'duration_sec': stats.duration_sec,
+            'duration_nsec': stats.duration_nsec,
+            'packet_count': stats.packet_count,
+            'table_id': UTIL.ofp_table_to_user(stats.table_id),
+            'length': stats.length}
+
+
+def get_flow_stats(dp, waiters, flow=None):
+    flow = flow if flow else {}
     # Note: OpenFlow does not allow to filter flow entries by priority,
     # but for efficiency, ofctl provides the way to do it.
     priority = str_to_int(flow.get('priority', -1))
 
-    stats = dp.ofproto_parser.OFPFlowStatsRequest(
-        dp, table_id, out_port, out_group, cookie, cookie_mask, match)
+    stats = flow_stats_request(dp, flow)
 
     msgs = []
     ofctl_utils.send_stats_request(dp, stats, waiters, msgs, LOG)
@@ -410,21 +432,7 @@ def get_flow_stats(dp, waiters, flow=None):
             if 0 <= priority != stats.priority:
                 continue
 
-            actions = actions_to_str(stats.instructions)
-            match = match_to_str(stats.match)
-            s = {'priority': stats.priority,
-                 'cookie': stats.cookie,
-                 'idle_timeout': stats.idle_timeout,
-                 'hard_timeout': stats.hard_timeout,
-                 'actions': actions,
-                 'match': match,
-                 'byte_count': stats.byte_count,
-                 'duration_sec': stats.duration_sec,
-                 'duration_nsec': stats.duration_nsec,
-                 'packet_count': stats.packet_count,
-                 'table_id': UTIL.ofp_table_to_user(stats.table_id),
-                 'length': stats.length}
-            flows.append(s)
+            flows.append(flow_stats_to_dict(stats))
 
     return {str(dp.id): flows}
 
@@ -767,7 +775,7 @@ def get_role(dp, waiters, to_user=True):
     return ofctl_utils.get_role(dp, waiters, to_user)
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     cookie_mask = str_to_int(flow.get('cookie_mask', 0))
     table_id = UTIL.ofp_table_from_user(flow.get('table_id', 0))
@@ -784,15 +792,26 @@ def mod_flow_entry(dp, flow, cmd):
     match = to_match(dp, flow.get('match', {}))
     inst = to_actions(dp, flow.get('actions', []))
 
-    flow_mod = dp.ofproto_parser.OFPFlowMod(
+    return dp.ofproto_parser.OFPFlowMod(
         dp, cookie, cookie_mask, table_id, cmd, idle_timeout,
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, match, inst)
 
+
+def to_flow_mods(dp, flows, cmd):
+    """
+    Returns the list of the flow mod messages of the flow entries, in
+    the format of mod_flow_entry(), to be sent in bulk.
+    """
+    return [to_flow_mod(dp, flow, cmd) for flow in flows]
+
+
+def mod_flow_entry(dp, flow, cmd):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
 
 
-def mod_group_entry(dp, group, cmd):
+def to_group_mod(dp, group, cmd):
 
     type_convert = {'ALL': dp.ofproto.OFPGT_ALL,
                     'SELECT': dp.ofproto.OFPGT_SELECT,
@@ -820,9 +839,12 @@ def mod_group_entry(dp, group, cmd):
         buckets.append(dp.ofproto_parser.OFPBucket(
             weight, watch_port, watch_group, actions))
 
-    group_mod = dp.ofproto_parser.OFPGroupMod(
+    return dp.ofproto_parser.OFPGroupMod(
         dp, cmd, type_, group_id, buckets)
 
+
+def mod_group_entry(dp, group, cmd):
+    group_mod = to_group_mod(dp, group, cmd)
     ofctl_utils.send_msg(dp, group_mod, LOG)
 
 
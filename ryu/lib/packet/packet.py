@@ -21,8 +21,12 @@ import six
 
 from . import packet_base
 from . import ethernet
+from . import ether_types
+from . import in_proto
+from . import packet_utils
 
 from ryu import utils
+from ryu.lib import addrconv
 from ryu.lib.stringify import StringifyMixin
 
 
@@ -188,3 +192,440 @@ def _PacketBase__div__(self, trailer):
 
 packet_base.PacketBase.__div__ = _PacketBase__div__
 packet_base.PacketBase.__truediv__ = _PacketBase__div__
+
+
+_ETH = struct.Struct('!6s6sH')  # dst, src, ethertype
+_VLAN = struct.Struct('!HH')  # tci, ethertype
+# version_ihl, tos, total_length, identification, flags_offset, ttl,
+# proto, csum, src, dst
+_IPV4 = struct.Struct('!BBHHHBBH4s4s')
+# version_tc_flow, payload_length, nxt, hop_limit, src, dst
+_IPV6 = struct.Struct('!IHBB16s16s')
+_IPV6_EXT = struct.Struct('!BB')  # nxt, size
+_IPV6_FRAG = struct.Struct('!BxH')  # nxt, offset_flags
+_L4_PORTS = struct.Struct('!HH')  # src_port, dst_port
+# src_port, dst_port, seq, ack, offset_flags
+_TCP = struct.Struct('!HHIIH')
+_ICMP = struct.Struct('!BB')  # type, code
+
+_VLAN_TYPES = (ether_types.ETH_TYPE_8021Q, ether_types.ETH_TYPE_8021AD)
+_IPV6_EXT_HEADERS = (in_proto.IPPROTO_HOPOPTS, in_proto.IPPROTO_ROUTING,
+                     in_proto.IPPROTO_DSTOPTS)
+_PORT_PROTOS = (in_proto.IPPROTO_TCP, in_proto.IPPROTO_UDP,
+                in_proto.IPPROTO_SCTP)
+_ICMP_PROTOS = (in_proto.IPPROTO_ICMP, in_proto.IPPROTO_ICMPV6)
+
+
+class PacketHeaders(object):
+    """
+    The headers of a packet decoded by dissect().
+
+    The addresses are kept in binary, and converted to text on access
+    to eth_dst, eth_src, ip_src and ip_dst.  The fields of the headers
+    not in the packet are None.
+
+    ================ ==================================================
+    Attribute        Description
+    ================ ==================================================
+    data             The packet data
+    eth_dst_bin      Destination MAC address in binary
+    eth_src_bin      Source MAC address in binary
+    eth_type         Ethertype following the VLAN tags
+    vlan_vid         VLAN ID of the outermost VLAN tag
+    vlan_pcp         Priority of the outermost VLAN tag
+    ip_proto         Protocol of the payload of IPv4 or IPv6, following
+                     the IPv6 extension headers
+    ip_src_bin       Source IPv4 or IPv6 address in binary
+    ip_dst_bin       Destination IPv4 or IPv6 address in binary
+    src_port         Source port of TCP, UDP or SCTP
+    dst_port         Destination port of TCP, UDP or SCTP
+    tcp_flags        Flags of TCP
+    icmp_type        Type of ICMP or ICMPv6
+    icmp_code        Code of ICMP or ICMPv6
+    l3_offset        Offset of the header following the VLAN tags
+    l4_offset        Offset of the header following IPv4 or IPv6
+    payload_offset   Offset of the payload of TCP, UDP or SCTP
+    ================ ==================================================
+
+    The headers of the IP fragments other than the first are not
+    decoded.
+    """
+
+    __slots__ = ('data', 'eth_dst_bin', 'eth_src_bin', 'eth_type',
+                 'vlan_vid', 'vlan_pcp', 'ip_proto', 'ip_src_bin',
+                 'ip_dst_bin', 'src_port', 'dst_port', 'tcp_flags',
+                 'icmp_type', 'icmp_code', 'l3_offset', 'l4_offset',
+                 'payload_offset')
+
+    def __init__(self, data):
+        self.data = data
+        self.eth_dst_bin = None
+        self.eth_src_bin = None
+        self.eth_type = None
+        self.vlan_vid = None
+        self.vlan_pcp = None
+        self.ip_proto = None
+        self.ip_src_bin = None
+        self.ip_dst_bin = None
+        self.src_port = None
+        self.dst_port = None
+        self.tcp_flags = None
+        self.icmp_type = None
+        self.icmp_code = None
+        self.l3_offset = None
+        self.l4_offset = None
+        self.payload_offset = None
+
+    @property
+    def eth_dst(self):
+        if self.eth_dst_bin is None:
+            return None
+        return addrconv.mac.bin_to_text(self.eth_dst_bin)
+
+    @property
+    def eth_src(self):
+        if self.eth_src_bin is None:
+            return None
+        return addrconv.mac.bin_to_text(self.eth_src_bin)
+
+    @staticmethod
+    def _ip_text(bin_):
+        if bin_ is None:
+            return None
+        if len(bin_) == 4:
+            return addrconv.ipv4.bin_to_text(bin_)
+        return addrconv.ipv6.bin_to_text(bin_)
+
+    @property
+    def ip_src(self):
+        return self._ip_text(self.ip_src_bin)
+
+    @property
+    def ip_dst(self):
+        return self._ip_text(self.ip_dst_bin)
+
+    def __str__(self):
+        return '%s(%s)' % (self.__class__.__name__, ','.join(
+            '%s=%r' % (k, getattr(self, k)) for k in self.__slots__[1:]
+            if getattr(self, k) is not None))
+    __repr__ = __str__
+
+
+def dissect(data):
+    """
+    Decodes only the Ethernet, VLAN, IPv4/IPv6 and TCP/UDP/SCTP/ICMP
+    headers of the packet data, without building any protocol object,
+    and returns a PacketHeaders.
+
+    The rest of the headers, if needed, can be decoded from the offsets
+    with the parsers of the protocols, or by Packet.
+    A truncated packet is decoded as far as possible.
+    """
+    headers = PacketHeaders(data)
+    try:
+        _dissect(headers, data)
+    except struct.error:
+        pass
+    return headers
+
+
+def _dissect(headers, data):
+    (headers.eth_dst_bin, headers.eth_src_bin,
+     eth_type) = _ETH.unpack_from(data)
+    offset = _ETH.size
+    if eth_type in _VLAN_TYPES:
+        tci, eth_type = _VLAN.unpack_from(data, offset)
+        headers.vlan_pcp = tci >> 13
+        headers.vlan_vid = tci & 0xfff
+        offset += _VLAN.size
+        while eth_type in _VLAN_TYPES:
+            _tci, eth_type = _VLAN.unpack_from(data, offset)
+            offset += _VLAN.size
+    headers.eth_type = eth_type
+    headers.l3_offset = offset
+
+    if eth_type == ether_types.ETH_TYPE_IP:
+        (version_ihl, _tos, _total_length, _identification, flags_offset,
+         _ttl, proto, _csum, headers.ip_src_bin,
+         headers.ip_dst_bin) = _IPV4.unpack_from(data, offset)
+        headers.ip_proto = proto
+        offset += (version_ihl & 0xf) * 4
+        if flags_offset & 0x1fff:
+            # Not the first fragment
+            return
+    elif eth_type == ether_types.ETH_TYPE_IPV6:
+        (_version_tc_flow, _payload_length, proto, _hop_limit,
+         headers.ip_src_bin, headers.ip_dst_bin) = _IPV6.unpack_from(
+            data, offset)
+        offset += _IPV6.size
+        while True:
+            headers.ip_proto = proto
+            if proto in _IPV6_EXT_HEADERS:
+                proto, size = _IPV6_EXT.unpack_from(data, offset)
+                offset += (size + 1) * 8
+            elif proto == in_proto.IPPROTO_AH:
+                proto, size = _IPV6_EXT.unpack_from(data, offset)
+                offset += (size + 2) * 4
+            elif proto == in_proto.IPPROTO_FRAGMENT:
+                proto, offset_flags = _IPV6_FRAG.unpack_from(data, offset)
+                offset += 8
+                if offset_flags >> 3:
+                    # Not the first fragment
+                    return
+            else:
+                break
+    else:
+        return
+    headers.l4_offset = offset
+
+    if proto == in_proto.IPPROTO_TCP:
+        (headers.src_port, headers.dst_port, _seq, _ack,
+         offset_flags) = _TCP.unpack_from(data, offset)
+        headers.tcp_flags = offset_flags & 0x1ff
+        headers.payload_offset = offset + (offset_flags >> 12) * 4
+    elif proto in _PORT_PROTOS:
+        headers.src_port, headers.dst_port = _L4_PORTS.unpack_from(
+            data, offset)
+        if proto == in_proto.IPPROTO_UDP:
+            headers.payload_offset = offset + 8
+        else:
+            # SCTP common header
+            headers.payload_offset = offset + 12
+    elif proto in _ICMP_PROTOS:
+        headers.icmp_type, headers.icmp_code = _ICMP.unpack_from(
+            data, offset)
+
+
+_UINT16 = struct.Struct('!H')
+_IPV4_TTL = 8  # offset of ttl and proto in IPv4 header
+_IPV4_CSUM = 10
+_IPV4_SRC = 12
+_IPV4_DST = 16
+_IPV6_HOP_LIMIT = 7
+_IPV6_SRC = 8
+_IPV6_DST = 24
+# offsets of the checksums covering the IP pseudo header
+_L4_CSUMS = {
+    in_proto.IPPROTO_TCP: 16,
+    in_proto.IPPROTO_UDP: 6,
+    in_proto.IPPROTO_ICMPV6: 2,
+}
+_ICMP_CSUM = 2
+
+
+class PacketRewriter(object):
+    """
+    Rewrites the header fields of a packet in place, for example to
+    forward a received packet or to turn it into a reply, without
+    building the protocol objects and serializing the whole packet again
+    with the Packet class.
+
+    The IPv4 header checksum and the TCP, UDP, ICMP and ICMPv6 checksums
+    are updated incrementally from the rewritten fields.  (RFC 1624)
+    The checksums of SCTP are not updated.
+
+    *data* is the packet data; a bytearray is rewritten in place,
+    the other types are copied into a bytearray.
+
+    ================ ==================================================
+    Attribute        Description
+    ================ ==================================================
+    data             The rewritten packet data
+    headers          The PacketHeaders of data, as decoded by dissect()
+    ================ ==================================================
+
+    For example, to route a packet::
+
+        rewriter = packet.PacketRewriter(msg.data)
+        if rewriter.dec_ttl() > 0:
+            rewriter.set_eth_src(router_mac)
+            rewriter.set_eth_dst(next_hop_mac)
+            datapath.send_packet_out(..., data=rewriter.data)
+    """
+
+    def __init__(self, data):
+        super(PacketRewriter, self).__init__()
+        if not isinstance(data, bytearray):
+            data = bytearray(data)
+        self.data = data
+        self.headers = dissect(data)
+
+    def _ip_offset(self):
+        headers = self.headers
+        if headers.eth_type not in (ether_types.ETH_TYPE_IP,
+                                    ether_types.ETH_TYPE_IPV6):
+            raise ValueError('not an IP packet')
+        return headers.l3_offset
+
+    def _l4_csum_offset(self, csums):
+        headers = self.headers
+        if headers.l4_offset is None or headers.ip_proto not in csums:
+            return None
+        offset = headers.l4_offset + csums[headers.ip_proto]
+        if offset + 2 > len(self.data):
+            return None
+        return offset
+
+    def _update_csum(self, offset, old, new, udp=False):
+        data = self.data
+        (csum,) = _UINT16.unpack_from(data, offset)
+        if udp and csum == 0:
+            # No checksum
+            return
+        csum = packet_utils.checksum_update(csum, old, new)
+        if udp and csum == 0:
+            csum = 0xffff
+        _UINT16.pack_into(data, offset, csum)
+
+    def _replace(self, offset, new, csums=(), l4_csum=None):
+        # Replaces the 16-bit aligned bytes at offset with new, and
+        # updates the checksums at the offsets in csums, and the L4
+        # checksum at l4_csum.
+        end = offset + len(new)
+        if end > len(self.data):
+            raise ValueError('truncated packet')
+        old = bytes(self.data[offset:end])
+        self.data[offset:end] = new
+        for csum in csums:
+            self._update_csum(csum, old, new)
+        if l4_csum is not None:
+            self._update_csum(
+                l4_csum, old, new,
+                udp=self.headers.ip_proto == in_proto.IPPROTO_UDP)
+
+    def set_eth_dst(self, dst):
+        """
+        Sets the destination MAC address.
+        """
+        dst = addrconv.mac.text_to_bin(dst)
+        self._replace(0, dst)
+        self.headers.eth_dst_bin = dst
+
+    def set_eth_src(self, src):
+        """
+        Sets the source MAC address.
+        """
+        src = addrconv.mac.text_to_bin(src)
+        self._replace(6, src)
+        self.headers.eth_src_bin = src
+
+    def _ttl_offset(self):
+        offset = self._ip_offset()
+        if self.headers.eth_type == ether_types.ETH_TYPE_IP:
+            offset += _IPV4_TTL
+        else:
+            offset += _IPV6_HOP_LIMIT
+        if offset >= len(self.data):
+            raise ValueError('truncated packet')
+        return offset
+
+    def get_ttl(self):
+        """
+        Returns the TTL of IPv4, or the hop limit of IPv6.
+        """
+        return self.data[self._ttl_offset()]
+
+    def set_ttl(self, ttl):
+        """
+        Sets the TTL of IPv4, or the hop limit of IPv6.
+        """
+        offset = self._ttl_offset()
+        if self.headers.eth_type == ether_types.ETH_TYPE_IP:
+            # TTL shares a 16-bit word with the protocol.
+            self._replace(offset, bytearray((ttl, self.data[offset + 1])),
+                          csums=(offset - _IPV4_TTL + _IPV4_CSUM,))
+        else:
+            self.data[offset] = ttl
+
+    def dec_ttl(self):
+        """
+        Decrements the TTL of IPv4, or the hop limit of IPv6, and returns
+        the decremented value.  A TTL of 0 is left as is.
+        """
+        ttl = self.get_ttl()
+        if ttl == 0:
+            return 0
+        self.set_ttl(ttl - 1)
+        return ttl - 1
+
+    def _set_ip_addr(self, ipv4_offset, ipv6_offset, addr):
+        offset = self._ip_offset()
+        if self.headers.eth_type == ether_types.ETH_TYPE_IP:
+            addr = addrconv.ipv4.text_to_bin(addr)
+            offset += ipv4_offset
+            csums = (self.headers.l3_offset + _IPV4_CSUM,)
+        else:
+            addr = addrconv.ipv6.text_to_bin(addr)
+            offset += ipv6_offset
+            csums = ()
+        self._replace(offset, addr, csums=csums,
+                      l4_csum=self._l4_csum_offset(_L4_CSUMS))
+        return addr
+
+    def set_ip_src(self, src):
+        """
+        Sets the source IPv4 or IPv6 address.
+        """
+        self.headers.ip_src_bin = self._set_ip_addr(_IPV4_SRC, _IPV6_SRC,
+                                                    src)
+
+    def set_ip_dst(self, dst):
+        """
+        Sets the destination IPv4 or IPv6 address.
+        """
+        self.headers.ip_dst_bin = self._set_ip_addr(_IPV4_DST, _IPV6_DST,
+                                                    dst)
+
+    def _set_port(self, offset, port):
+        headers = self.headers
+        if headers.ip_proto not in (in_proto.IPPROTO_TCP,
+                                    in_proto.IPPROTO_UDP) or \
+                headers.src_port is None:
+            raise ValueError('not a TCP or UDP packet')
+        self._replace(headers.l4_offset + offset, _UINT16.pack(port),
+                      l4_csum=self._l4_csum_offset(_L4_CSUMS))
+
+    def set_src_port(self, port):
+        """
+        Sets the source port of TCP or UDP.
+        """
+        self._set_port(0, port)
+        self.headers.src_port = port
+
+    def set_dst_port(self, port):
+        """
+        Sets the destination port of TCP or UDP.
+        """
+        self._set_port(2, port)
+        self.headers.dst_port = port
+
+    def set_icmp_type(self, type_, code=0):
+        """
+        Sets the type and the code of ICMP or ICMPv6.
+        """
+        headers = self.headers
+        if headers.icmp_type is None:
+            raise ValueError('not an ICMP packet')
+        csums = {in_proto.IPPROTO_ICMP: _ICMP_CSUM,
+                 in_proto.IPPROTO_ICMPV6: _ICMP_CSUM}
+        self._replace(headers.l4_offset, bytearray((type_, code)),
+                      l4_csum=self._l4_csum_offset(csums))
+        headers.icmp_type = type_
+        headers.icmp_code = code
+
+    def push_vlan(self, vid, pcp=0, ethertype=ether_types.ETH_TYPE_8021Q):
+        """
+        Inserts a VLAN tag of the ethertype *ethertype* as the outermost
+        one.
+        """
+        self.data[12:12] = _VLAN.pack(ethertype, (pcp << 13) | vid)
+        self.headers = dissect(self.data)
+
+    def pop_vlan(self):
+        """
+        Removes the outermost VLAN tag.
+        """
+        if self.headers.vlan_vid is None:
+            raise ValueError('no VLAN tag')
+        del self.data[12:16]
+        self.headers = dissect(self.data)
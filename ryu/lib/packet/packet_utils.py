@@ -13,9 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import array
+import binascii
 import six
-import socket
 import struct
 from ryu.lib import addrconv
 
@@ -25,15 +24,53 @@ def carry_around_add(a, b):
     return (c & 0xffff) + (c >> 16)
 
 
-def checksum(data):
-    data = six.binary_type(data)    # input can be bytearray.
+if six.PY3:
+    def _to_int(data):
+        return int.from_bytes(data, 'big')
+else:
+    def _to_int(data):
+        return int(binascii.hexlify(data) or b'0', 16)
+
+
+def _sum(data):
+    # The one's complement sum of the 16-bit words of data is congruent
+    # to data as a big endian integer modulo 0xffff, because 0x10000 is
+    # congruent to 1.  The modulo of the whole buffer is computed at
+    # once, instead of adding up the words one by one.
+    n = _to_int(data)
     if len(data) % 2:
-        data += b'\x00'
+        n <<= 8
+    s = n % 0xffff
+    if s == 0 and n:
+        # The one's complement sum is never 0 unless all words are 0.
+        return 0xffff
+    return s
+
 
-    s = sum(array.array('H', data))
+def checksum(data):
+    """
+    Returns the Internet checksum (RFC 1071) of data.
+    """
+    if six.PY2:
+        data = six.binary_type(data)    # input can be bytearray.
+    return ~_sum(data) & 0xffff
+
+
+def checksum_update(csum, old, new):
+    """
+    Returns the checksum updated for a change of a part of the checksummed
+    data from old to new, without the rest of the data.  (RFC 1624)
+
+    old and new are the 16-bit aligned bytes of the data before and after
+    the change, of the same length.  Generating many packets differing only
+    in a few fields from one template packet, the checksum of each can be
+    updated from that of the template in constant time.
+    """
+    # HC' = ~(~HC + ~m + m')  (RFC 1624 Eqn. 3)
+    s = (~csum & 0xffff) + (0xffff - _sum(old)) + _sum(new)
+    s = (s & 0xffff) + (s >> 16)
     s = (s & 0xffff) + (s >> 16)
-    s += (s >> 16)
-    return socket.ntohs(~s & 0xffff)
+    return ~s & 0xffff
 
 
 # avoid circular import
@@ -96,8 +133,10 @@ def checksum_ip(ipvx, length, payload):
     else:
         raise ValueError('Unknown IP version %d' % ipvx.version)
 
-    buf = header + payload
-    return checksum(buf)
+    # The pseudo header is of an even length, so that the sums of it and of
+    # the payload add up without concatenating them.
+    s = _sum(header) + _sum(payload)
+    return ~((s & 0xffff) + (s >> 16)) & 0xffff
 
 
 _MODX = 4102
@@ -35,12 +35,28 @@ Reference source: http://wiki.wireshark.org/Development/LibpcapFileFormat
                 +---------------------+
                 |          ...        |
                 +---------------------+
+
+The files in the pcapng format, and in the pcap format with nanosecond
+resolution timestamps can be read as well.
+Reference source: https://github.com/pcapng/pcapng
 """
 
+import array
+import gzip
+import io
+import logging
+import mmap
+import os
 import struct
 import sys
 import time
 
+import six
+
+from ryu.lib import hub
+
+LOG = logging.getLogger(__name__)
+
 
 class PcapFileHdr(object):
     """
@@ -82,6 +98,9 @@ class PcapFileHdr(object):
     # the byte ordering.
     MAGIC_NUMBER_IDENTICAL = b'\xa1\xb2\xc3\xd4'  # Big Endian
     MAGIC_NUMBER_SWAPPED = b'\xd4\xc3\xb2\xa1'    # Little Endian
+    # The same with nanosecond resolution timestamps.
+    MAGIC_NUMBER_IDENTICAL_NSEC = b'\xa1\xb2\x3c\x4d'  # Big Endian
+    MAGIC_NUMBER_SWAPPED_NSEC = b'\x4d\x3c\xb2\xa1'    # Little Endian
 
     def __init__(self, magic=MAGIC_NUMBER_SWAPPED, version_major=2,
                  version_minor=4, thiszone=0, sigfigs=0, snaplen=0,
@@ -97,11 +116,13 @@ class PcapFileHdr(object):
     @classmethod
     def parser(cls, buf):
         magic_buf = buf[:4]
-        if magic_buf == cls.MAGIC_NUMBER_IDENTICAL:
+        if magic_buf in (cls.MAGIC_NUMBER_IDENTICAL,
+                         cls.MAGIC_NUMBER_IDENTICAL_NSEC):
             # Big Endian
             fmt = cls._FILE_HDR_FMT_BIG_ENDIAN
             byteorder = 'big'
-        elif magic_buf == cls.MAGIC_NUMBER_SWAPPED:
+        elif magic_buf in (cls.MAGIC_NUMBER_SWAPPED,
+                           cls.MAGIC_NUMBER_SWAPPED_NSEC):
             # Little Endian
             fmt = cls._FILE_HDR_FMT_LITTLE_ENDIAN
             byteorder = 'little'
@@ -110,6 +131,12 @@ class PcapFileHdr(object):
 
         return cls(*struct.unpack_from(fmt, buf)), byteorder
 
+    @property
+    def nsec(self):
+        """True if the timestamps are in nanoseconds"""
+        return self.magic in (self.MAGIC_NUMBER_IDENTICAL_NSEC,
+                              self.MAGIC_NUMBER_SWAPPED_NSEC)
+
     def serialize(self):
         if sys.byteorder == 'big':
             # Big Endian
@@ -190,16 +217,83 @@ class PcapPktHdr(object):
                            self.incl_len, self.orig_len)
 
 
+# pcapng blocks
+_PCAPNG_SHB = 0x0a0d0d0a  # Section Header Block
+_PCAPNG_IDB = 0x00000001  # Interface Description Block
+_PCAPNG_PB = 0x00000002   # Packet Block (obsolete)
+_PCAPNG_SPB = 0x00000003  # Simple Packet Block
+_PCAPNG_EPB = 0x00000006  # Enhanced Packet Block
+_PCAPNG_SHB_TYPE = b'\x0a\x0d\x0d\x0a'
+_PCAPNG_BYTE_ORDER_MAGIC = {
+    b'\x1a\x2b\x3c\x4d': 'big',
+    b'\x4d\x3c\x2b\x1a': 'little',
+}
+_PCAPNG_IF_TSRESOL = 9  # if_tsresol option of IDB
+_PCAPNG_OPT_ENDOFOPT = 0
+
+_ENDIAN = {'big': '>', 'little': '<'}
+_PCAP_PKT_HDR = dict(
+    (byteorder, struct.Struct(e + PcapPktHdr._PKT_HDR_FMT))
+    for byteorder, e in _ENDIAN.items())
+# block type, block total length
+_PCAPNG_BLOCK_HDR = dict(
+    (byteorder, struct.Struct(e + 'II')) for byteorder, e in _ENDIAN.items())
+_PCAPNG_BLOCK_HDR_SIZE = 8
+# linktype, reserved, snaplen
+_PCAPNG_IDB_BODY = dict(
+    (byteorder, struct.Struct(e + 'HHI')) for byteorder, e in _ENDIAN.items())
+# interface id, timestamp (high), timestamp (low), captured length
+_PCAPNG_EPB_BODY = dict(
+    (byteorder, struct.Struct(e + 'IIII')) for byteorder, e in _ENDIAN.items())
+# interface id, drops count, timestamp (high), timestamp (low),
+# captured length
+_PCAPNG_PB_BODY = dict(
+    (byteorder, struct.Struct(e + 'HHIII'))
+    for byteorder, e in _ENDIAN.items())
+# original length
+_PCAPNG_SPB_BODY = dict(
+    (byteorder, struct.Struct(e + 'I')) for byteorder, e in _ENDIAN.items())
+# option code, option length
+_PCAPNG_OPT_HDR = dict(
+    (byteorder, struct.Struct(e + 'HH')) for byteorder, e in _ENDIAN.items())
+
+# The file objects which can be memory-mapped.  Others, e.g. GzipFile,
+# which have fileno() of the underlying file, are read into memory.
+_MMAP_FILE_TYPES = (io.FileIO, io.BufferedReader,
+                    getattr(six.moves.builtins, 'file', io.FileIO))
+
+try:
+    array.array('Q')
+    _OFFSET_TYPECODE = 'Q'
+except ValueError:
+    # Python 2
+    _OFFSET_TYPECODE = 'L'
+
+
+def _timestamp(ts, units):
+    # ts is in 1/units seconds
+    return ts // units + (ts % units) / float(units)
+
+
 class Reader(object):
     """
     PCAP file reader
 
-    ================ ===================================
+    ================ ===================================================
     Argument         Description
-    ================ ===================================
+    ================ ===================================================
     file_obj         File object which reading PCAP file
                      in binary mode
-    ================ ===================================
+    copy             (Optional) If False, the packet data are
+                     memoryview slices of the file instead of bytes.
+                     The default is True.
+    ================ ===================================================
+
+    The file is memory-mapped if possible, otherwise read into memory,
+    and the packets are read in place; the cost of reading a packet does
+    not depend on the size of the file.
+    The files in the pcap format, with microsecond or nanosecond
+    resolution timestamps, and in the pcapng format are supported.
 
     Example of usage::
 
@@ -213,35 +307,256 @@ class Reader(object):
             frame_count += 1
             pkt = packet.Packet(buf)
             print("%d, %f, %s" % (frame_count, ts, pkt))
+
+    The packets can also be accessed by index; the first access scans
+    the headers of all the packets in the file::
+
+        reader = pcaplib.Reader(open('test.pcap', 'rb'))
+        print(len(reader))
+        ts, buf = reader[-1]
+
+    and read in batches, as arrays of the timestamps, and of the offsets
+    and lengths of the packet data in buf, the memoryview of the file::
+
+        reader = pcaplib.Reader(open('test.pcap', 'rb'), copy=False)
+        while True:
+            timestamps, offsets, lengths = reader.read_batch(1024)
+            if not timestamps:
+                break
+            for offset, length in zip(offsets, lengths):
+                data = reader.buf[offset:offset + length]
+                ...
+
+    ================ ===================================================
+    Attribute        Description
+    ================ ===================================================
+    pcap_header      Instance of PcapFileHdr, or None for a pcapng file
+    buf              memoryview of the whole file
+    ================ ===================================================
     """
 
-    def __init__(self, file_obj):
+    def __init__(self, file_obj, copy=True):
         self._fp = file_obj
-        buf = self._fp.read(PcapFileHdr.FILE_HDR_SIZE)
-        # Read only pcap file header
-        self.pcap_header, self._file_byteorder = PcapFileHdr.parser(buf)
-        # Read pcap data with out header
-        self._pcap_body = self._fp.read()
+        self._copy = copy
+        self._mmap = None
+        start = 0
+        if isinstance(file_obj, _MMAP_FILE_TYPES):
+            try:
+                start = file_obj.tell()
+                self._mmap = mmap.mmap(file_obj.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except (EnvironmentError, ValueError):
+                # e.g. an empty file
+                start = 0
+                self._mmap = None
+        if self._mmap is not None:
+            self.buf = self._view(self._mmap)
+        else:
+            self.buf = self._view(file_obj.read())
         self._fp.close()
-        self._next_pos = 0
+        self._size = len(self.buf)
+        self._index = None
+        # The timestamp units of the interfaces of the pcapng section
+        self._interfaces = []
+
+        if bytes(self.buf[start:start + 4]) == _PCAPNG_SHB_TYPE:
+            self.pcap_header = None
+            self._read_record = self._read_pcapng_record
+            self._first_pos = start
+            # Only validates the first section header.
+            self._read_shb(start)
+        else:
+            # Read only pcap file header
+            self.pcap_header, self._file_byteorder = PcapFileHdr.parser(
+                bytes(self.buf[start:start + PcapFileHdr.FILE_HDR_SIZE]))
+            self._pkt_hdr = _PCAP_PKT_HDR[self._file_byteorder]
+            self._ts_units = 10 ** 9 if self.pcap_header.nsec else 10 ** 6
+            self._read_record = self._read_pcap_record
+            self._first_pos = start + PcapFileHdr.FILE_HDR_SIZE
+        self._next_pos = self._first_pos
+
+    @staticmethod
+    def _view(buf):
+        try:
+            return memoryview(buf)
+        except TypeError:
+            # mmap of Python 2
+            return buf
+
+    def _data(self, offset, length):
+        data = self.buf[offset:offset + length]
+        if self._copy:
+            return bytes(data)
+        return data
+
+    def _read_pcap_record(self, pos):
+        # Returns (timestamp, data offset, data length, next position),
+        # or None at the end of the file.  A truncated record at the end
+        # is ignored.
+        offset = pos + PcapPktHdr.PKT_HDR_SIZE
+        if offset > self._size:
+            return None
+        ts_sec, ts_frac, incl_len, _orig_len = self._pkt_hdr.unpack_from(
+            self.buf, pos)
+        end = offset + incl_len
+        if end > self._size:
+            return None
+        ts = ts_sec + (ts_frac / float(self._ts_units))
+        return ts, offset, incl_len, end
+
+    def _read_shb(self, pos):
+        byteorder = _PCAPNG_BYTE_ORDER_MAGIC.get(
+            bytes(self.buf[pos + 8:pos + 12]))
+        if byteorder is None:
+            raise struct.error('Invalid byte ordered pcapng file.')
+        self._file_byteorder = byteorder
+        self._interfaces = []
+
+    def _read_idb(self, pos, end):
+        # Returns the units of the timestamps of the interface.
+        byteorder = self._file_byteorder
+        opt_hdr = _PCAPNG_OPT_HDR[byteorder]
+        pos += _PCAPNG_BLOCK_HDR_SIZE + _PCAPNG_IDB_BODY[byteorder].size
+        while pos + opt_hdr.size <= end:
+            code, length = opt_hdr.unpack_from(self.buf, pos)
+            pos += opt_hdr.size
+            if code == _PCAPNG_OPT_ENDOFOPT:
+                break
+            if code == _PCAPNG_IF_TSRESOL and length == 1:
+                tsresol = six.indexbytes(self.buf, pos)
+                if tsresol & 0x80:
+                    return 2 ** (tsresol & 0x7f)
+                return 10 ** tsresol
+            pos += (length + 3) & ~3
+        return 10 ** 6
+
+    def _read_pcapng_record(self, pos):
+        # Returns the same as _read_pcap_record(), skipping the blocks
+        # other than packets.
+        while True:
+            if pos + _PCAPNG_BLOCK_HDR_SIZE > self._size:
+                return None
+            if bytes(self.buf[pos:pos + 4]) == _PCAPNG_SHB_TYPE:
+                # A new section, which may be in the other byte order.
+                self._read_shb(pos)
+            byteorder = self._file_byteorder
+            block_type, block_len = _PCAPNG_BLOCK_HDR[byteorder].unpack_from(
+                self.buf, pos)
+            end = pos + block_len
+            if block_len < _PCAPNG_BLOCK_HDR_SIZE + 4 or end > self._size:
+                return None
+            body = pos + _PCAPNG_BLOCK_HDR_SIZE
+            if block_type == _PCAPNG_EPB:
+                body_fmt = _PCAPNG_EPB_BODY[byteorder]
+                if_id, ts_high, ts_low, caplen = body_fmt.unpack_from(
+                    self.buf, body)
+                offset = body + body_fmt.size + 4  # skip original length
+                break
+            elif block_type == _PCAPNG_SPB:
+                body_fmt = _PCAPNG_SPB_BODY[byteorder]
+                orig_len, = body_fmt.unpack_from(self.buf, body)
+                offset = body + body_fmt.size
+                # No timestamp
+                return 0.0, offset, min(orig_len, end - 4 - offset), end
+            elif block_type == _PCAPNG_PB:
+                body_fmt = _PCAPNG_PB_BODY[byteorder]
+                if_id, _drops, ts_high, ts_low, caplen = body_fmt.unpack_from(
+                    self.buf, body)
+                offset = body + body_fmt.size + 4  # skip original length
+                break
+            elif block_type == _PCAPNG_IDB:
+                self._interfaces.append(self._read_idb(pos, end - 4))
+            pos = end
+
+        try:
+            units = self._interfaces[if_id]
+        except IndexError:
+            units = 10 ** 6
+        ts = _timestamp((ts_high << 32) | ts_low, units)
+        return ts, offset, min(caplen, end - 4 - offset), end
 
     def __iter__(self):
         return self
 
     def next(self):
-        try:
-            pkt_hdr, pkt_data = PcapPktHdr.parser(
-                self._pcap_body[self._next_pos:], self._file_byteorder)
-            self._next_pos += pkt_hdr.incl_len + PcapPktHdr.PKT_HDR_SIZE
-
-        except IndexError:
+        record = self._read_record(self._next_pos)
+        if record is None:
             raise StopIteration()
+        ts, offset, length, self._next_pos = record
 
-        return pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6), pkt_data
+        return ts, self._data(offset, length)
 
     # for Python 3 compatible
     __next__ = next
 
+    def _scan(self, pos, count=None):
+        # Reads up to count packets, or all of them, from pos.
+        timestamps = array.array('d')
+        offsets = array.array(_OFFSET_TYPECODE)
+        lengths = array.array(_OFFSET_TYPECODE)
+        read_record = self._read_record
+        n = 0
+        while count is None or n < count:
+            record = read_record(pos)
+            if record is None:
+                break
+            ts, offset, length, pos = record
+            timestamps.append(ts)
+            offsets.append(offset)
+            lengths.append(length)
+            n += 1
+        return (timestamps, offsets, lengths), pos
+
+    def read_batch(self, count):
+        """
+        Reads up to count packets from the current position of
+        the iteration, and returns a tuple of three arrays, of
+        the timestamps, and the offsets and the lengths of the packet data
+        in buf.  The arrays are empty at the end of the file.
+        """
+        batch, self._next_pos = self._scan(self._next_pos, count)
+        return batch
+
+    def _build_index(self):
+        # The byte order and the interfaces of pcapng are the state of
+        # the iteration, which is restored.
+        state = (self._file_byteorder, self._interfaces)
+        try:
+            self._index, _pos = self._scan(self._first_pos)
+        finally:
+            self._file_byteorder, self._interfaces = state
+
+    def __len__(self):
+        if self._index is None:
+            self._build_index()
+        return len(self._index[0])
+
+    def __getitem__(self, n):
+        """
+        Returns the tuple of the timestamp and the data of the nth packet
+        in the file.
+        """
+        if self._index is None:
+            self._build_index()
+        timestamps, offsets, lengths = self._index
+        return timestamps[n], self._data(offsets[n], lengths[n])
+
+    def close(self):
+        """
+        Releases the memory-mapped file.  The packet data returned as
+        memoryview are invalid after this.
+        """
+        if self._mmap is None:
+            return
+        if isinstance(self.buf, memoryview) and hasattr(self.buf, 'release'):
+            self.buf.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Some slices of it are still alive.
+            pass
+        self._mmap = None
+
 
 class Writer(object):
     """
@@ -320,3 +635,230 @@ class Writer(object):
 
     def __del__(self):
         self._f.close()
+
+
+class AsyncWriter(object):
+    """
+    PCAP file writer which writes in the background
+
+    write_pkt() only appends the packet to an in-memory buffer, which
+    is written to the file when it exceeds flush_size bytes, or every
+    flush_interval seconds.  write_pkt() never blocks; when the buffer
+    already holds buffer_size bytes, e.g. the disk can't keep up, the
+    packet is dropped and counted in the dropped attribute.
+
+    The file writes and the compression are done in a native thread
+    (see hub.execute()), as they would block all the hub threads while
+    the disk is busy.  The hub threads only append the packets to the
+    buffer, and hand the full buffer over to the native thread.
+
+    The files can be rotated by size and/or by time; then the files are
+    named path with a sequence number, e.g. capture-1.pcap,
+    capture-2.pcap, ... for 'capture.pcap'.
+
+    ================ ==================================================
+    Argument         Description
+    ================ ==================================================
+    path             Path of the PCAP file
+    snaplen          Max length of captured packets (in octets)
+    network          Data link type. (e.g. 1 for Ethernet,
+                     see `tcpdump.org`_ for details)
+    flush_size       Size of the buffered packets (in octets) which
+                     is written at once
+    flush_interval   Max time (in seconds) the packets stay buffered
+    buffer_size      Max size of the buffered packets (in octets)
+    rotate_size      (Optional) Max size of a file (in octets, before
+                     compression)
+    rotate_interval  (Optional) Max time (in seconds) a file is written
+    max_files        (Optional) Max number of the files kept; the oldest
+                     ones are removed
+    compress         (Optional) If True, the files are compressed with
+                     gzip and '.gz' is appended to their names
+    ================ ==================================================
+
+    .. _tcpdump.org: http://www.tcpdump.org/linktypes.html
+
+    ================ ==================================================
+    Attribute        Description
+    ================ ==================================================
+    packets          Number of the packets written or buffered
+    dropped          Number of the packets dropped
+    files            List of the paths of the files kept
+    ================ ==================================================
+
+    Example of usage::
+
+        self.pcap_writer = pcaplib.AsyncWriter(
+            'capture.pcap', rotate_size=100 * 1024 * 1024, max_files=10)
+
+        @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+        def _packet_in_handler(self, ev):
+            self.pcap_writer.write_pkt(ev.msg.data)
+
+        def close(self):
+            self.pcap_writer.close()
+    """
+
+    def __init__(self, path, snaplen=65535, network=1,
+                 flush_size=1024 * 1024, flush_interval=1.0,
+                 buffer_size=64 * 1024 * 1024, rotate_size=None,
+                 rotate_interval=None, max_files=None, compress=False):
+        self.path = path
+        self.snaplen = snaplen
+        self.network = network
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.rotate_size = rotate_size
+        self.rotate_interval = rotate_interval
+        self.max_files = max_files
+        self.compress = compress
+        self.packets = 0
+        self.dropped = 0
+        self.files = []
+
+        self._file_hdr = PcapFileHdr(snaplen=snaplen,
+                                     network=network).serialize()
+        self._pkt_hdr = _PCAP_PKT_HDR[sys.byteorder]
+        # Packet headers and data alternately.  Only hub threads, which
+        # never switch in the middle of write_pkt() or of swapping the
+        # list in flush(), touch it, so no lock is needed.
+        self._pending = []
+        self._pending_size = 0
+        self._reported_dropped = 0
+        self._f = None
+        self._f_size = 0
+        self._f_opened = 0
+        self._seq = 0
+        self._open()
+        # Serializes the writes by the native thread, as flush() may be
+        # called while the hub thread flushes.
+        self._write_lock = hub.Semaphore()
+
+        self._flush_ev = hub.Event()
+        self._is_active = True
+        self._thread = hub.spawn(self._flush_loop)
+
+    def _file_name(self):
+        path = self.path
+        if self.rotate_size is not None or self.rotate_interval is not None:
+            root, ext = os.path.splitext(path)
+            path = '%s-%d%s' % (root, self._seq, ext)
+        if self.compress:
+            path += '.gz'
+        return path
+
+    def _open(self):
+        self._seq += 1
+        path = self._file_name()
+        if self.compress:
+            self._f = gzip.open(path, 'wb')
+        else:
+            self._f = open(path, 'wb')
+        self._f.write(self._file_hdr)
+        self._f_size = len(self._file_hdr)
+        self._f_opened = time.time()
+        self.files.append(path)
+        if self.max_files is not None:
+            while len(self.files) > self.max_files:
+                old = self.files.pop(0)
+                try:
+                    os.remove(old)
+                except OSError as e:
+                    LOG.warning('failed to remove %s: %s', old, e)
+
+    def _rotate(self):
+        self._f.close()
+        self._open()
+
+    def write_pkt(self, buf, ts=None):
+        """
+        Buffers the packet, and returns True, or False if the packet has
+        been dropped.
+        """
+        orig_len = len(buf)
+        buf_len = min(orig_len, self.snaplen)
+        size = PcapPktHdr.PKT_HDR_SIZE + buf_len
+        if self._pending_size + size > self.buffer_size:
+            self.dropped += 1
+            return False
+
+        ts = time.time() if ts is None else ts
+        sec = int(ts)
+        usec = int(round(ts % 1, 6) * 1e6) if sec != 0 else 0
+        self._pending.append(self._pkt_hdr.pack(sec, usec, buf_len, orig_len))
+        # A copy, as buf may be a view of the receive buffer.
+        self._pending.append(bytes(buf[:buf_len]))
+        self._pending_size += size
+        self.packets += 1
+        if self._pending_size >= self.flush_size:
+            self._flush_ev.set()
+        return True
+
+    def _flush_loop(self):
+        while self._is_active:
+            self._flush_ev.wait(self.flush_interval)
+            self._flush_ev.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered packets to the file.
+        """
+        pending, self._pending = self._pending, []
+        self._pending_size = 0
+        with self._write_lock:
+            error, dropped = hub.execute(self._write_pending, pending)
+        if error is not None:
+            LOG.error('failed to write %s: %s', self.files[-1], error)
+        self.dropped += dropped
+
+        if self.dropped > self._reported_dropped:
+            LOG.warning('%d packets dropped while capturing to %s',
+                        self.dropped - self._reported_dropped, self.path)
+            self._reported_dropped = self.dropped
+
+    def _write_pending(self, pending):
+        # Runs in the native thread.  Returns the error and the number of
+        # the packets which have not been written.
+        start = 0
+        try:
+            if (pending and self.rotate_interval is not None and
+                    time.time() - self._f_opened >= self.rotate_interval):
+                self._rotate()
+            chunk_size = 0
+            for i in range(0, len(pending), 2):
+                size = len(pending[i]) + len(pending[i + 1])
+                if (self.rotate_size is not None and
+                        self._f_size + chunk_size + size > self.rotate_size and
+                        self._f_size + chunk_size > len(self._file_hdr)):
+                    self._write(pending[start:i], chunk_size)
+                    start = i
+                    chunk_size = 0
+                    self._rotate()
+                chunk_size += size
+            self._write(pending[start:], chunk_size)
+            self._f.flush()
+        except EnvironmentError as e:
+            return e, len(pending[start:]) // 2
+        return None, 0
+
+    def _write(self, records, size):
+        if not records:
+            return
+        self._f.write(b''.join(records))
+        self._f_size += size
+
+    def close(self):
+        """
+        Stops the hub thread, and writes the buffered packets and closes
+        the file.
+        """
+        if not self._is_active:
+            return
+        self._is_active = False
+        self._flush_ev.set()
+        hub.joinall([self._thread])
+        self.flush()
+        with self._write_lock:
+            hub.execute(self._f.close)
@@ -17,10 +17,11 @@
 from __future__ import print_function
 
 import base64
-import inspect
 
 import six
 
+from ryu import utils
+
 # Some arguments to __init__ is mangled in order to avoid name conflicts
 # with builtin names.
 # The standard mangling is to append '_' in order to avoid name clashes
@@ -38,7 +39,7 @@ import six
 # 'len', 'property', 'set', 'type'
 # A bit more generic way is adopted
 
-_RESERVED_KEYWORD = dir(six.moves.builtins)
+_RESERVED_KEYWORD = frozenset(dir(six.moves.builtins))
 
 _mapdict = lambda f, d: dict([(k, f(v)) for k, v in d.items()])
 _mapdict_key = lambda f, d: dict([(f(k), v) for k, v in d.items()])
@@ -111,6 +112,17 @@ _types = {
     'nx-flow-spec-field': NXFlowSpecFieldType,  # XXX this should not be here
 }
 
+# The values which are the same in JSON style dicts.
+_SCALAR_TYPES = six.integer_types + (float, type(None))
+
+# {class: {attribute name: TypeDescr}} built from the _TYPE class
+# attributes on the first use.  (See StringifyMixin._get_types)
+_class_types = {}
+
+# Maximum number of the cached encoders and decoders; one for each pair
+# of a class and an encode_string/decode_string function.
+CODEC_CACHE_SIZE = 4096
+
 
 class StringifyMixin(object):
 
@@ -185,13 +197,31 @@ class StringifyMixin(object):
                 return True
         return False
 
+    @classmethod
+    def _get_types(cls):
+        try:
+            return _class_types[cls]
+        except KeyError:
+            pass
+        types = {}
+        for t, attrs in getattr(cls, '_TYPE', {}).items():
+            for k in attrs:
+                types.setdefault(k, _types[t])
+        _class_types[cls] = types
+        return types
+
+    @classmethod
+    def _clear_types(cls):
+        """
+        Drops the cached type information, which needs to be done when
+        _TYPE is modified after the class has been converted to or from
+        a JSON style dict.
+        """
+        _class_types.clear()
+
     @classmethod
     def _get_type(cls, k):
-        if hasattr(cls, '_TYPE'):
-            for t, attrs in cls._TYPE.items():
-                if k in attrs:
-                    return _types[t]
-        return None
+        return cls._get_types().get(k)
 
     @classmethod
     def _get_encoder(cls, k, encode_string):
@@ -206,8 +236,14 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_default_encoder(cls, encode_string):
+        return _default_encoder(cls, encode_string)
+
+    @classmethod
+    def _make_default_encoder(cls, encode_string):
         def _encode(v):
-            if isinstance(v, (bytes, six.text_type)):
+            if isinstance(v, _SCALAR_TYPES):
+                json_value = v
+            elif isinstance(v, (bytes, six.text_type)):
                 if isinstance(v, six.text_type):
                     v = v.encode('utf-8')
                 json_value = encode_string(v)
@@ -259,9 +295,14 @@ class StringifyMixin(object):
         =============  =====================================================
         """
         dict_ = {}
-        encode = lambda key, val: self._encode_value(key, val, encode_string)
+        types = self._get_types()
+        default_encode = self._get_default_encoder(encode_string)
         for k, v in obj_attrs(self):
-            dict_[k] = encode(k, v)
+            t = types.get(k)
+            if t:
+                dict_[k] = t.encode(v)
+            else:
+                dict_[k] = default_encode(v)
         return {self.__class__.__name__: dict_}
 
     @classmethod
@@ -294,8 +335,14 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_default_decoder(cls, decode_string):
+        return _default_decoder(cls, decode_string)
+
+    @classmethod
+    def _make_default_decoder(cls, decode_string):
         def _decode(json_value, **additional_args):
-            if isinstance(json_value, (bytes, six.text_type)):
+            if isinstance(json_value, _SCALAR_TYPES):
+                v = json_value
+            elif isinstance(json_value, (bytes, six.text_type)):
                 v = decode_string(json_value)
             elif isinstance(json_value, list):
                 v = [_decode(jv) for jv in json_value]
@@ -366,6 +413,18 @@ class StringifyMixin(object):
                                     registered_dict.values()])
 
 
+# The default encoders and decoders are built once for each class, and
+# each encode_string/decode_string function.
+@utils.lru_cache(CODEC_CACHE_SIZE)
+def _default_encoder(cls, encode_string):
+    return cls._make_default_encoder(encode_string)
+
+
+@utils.lru_cache(CODEC_CACHE_SIZE)
+def _default_decoder(cls, decode_string):
+    return cls._make_default_decoder(decode_string)
+
+
 def obj_python_attrs(msg_):
     """iterate object attributes for stringify purposes
     """
@@ -378,17 +437,23 @@ def obj_python_attrs(msg_):
         return
     base = getattr(msg_, '_base_attributes', [])
     opt = getattr(msg_, '_opt_attributes', [])
-    for k, v in inspect.getmembers(msg_):
+    cls = msg_.__class__
+    # Only the instance attributes and the optional ones are candidates;
+    # the attributes of the class are skipped anyway.
+    names = set(getattr(msg_, '__dict__', ()))
+    names.update(opt)
+    for k in sorted(names):
         if k in opt:
-            pass
-        elif k.startswith('_'):
-            continue
-        elif callable(v):
-            continue
-        elif k in base:
-            continue
-        elif hasattr(msg_.__class__, k):
+            try:
+                v = getattr(msg_, k)
+            except AttributeError:
+                continue
+        elif k.startswith('_') or k in base or hasattr(cls, k):
             continue
+        else:
+            v = getattr(msg_, k)
+            if callable(v):
+                continue
         yield (k, v)
 
 
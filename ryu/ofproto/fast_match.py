@@ -0,0 +1,155 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast path decoder of the match of packet-in messages.
+
+The match of a packet-in message usually consists only of in_port and,
+depending on the pipeline, metadata and tunnel_id.  Decoding it with
+OFPMatch.parser, which goes through the generic OXM field tables and the
+old API compatibility code, dominates the cost of a packet-in.
+
+The classes made by packet_in_match_class() decode these fields with
+precompiled struct.Struct layouts into slots, and fall back to the
+OFPMatch.parser of the OpenFlow version for anything else.  A decoded
+match is an instance of (a subclass of) OFPMatch and behaves like one;
+the lookups by __getitem__, get and __contains__ are served from the
+slots, and the first access to anything else parses the whole match with
+OFPMatch.parser.
+"""
+
+import struct
+
+from ryu.ofproto import ofproto_v1_3
+
+
+# OXM headers are common to OpenFlow 1.3, 1.4 and 1.5.
+_FIELDS = {
+    ofproto_v1_3.OXM_OF_IN_PORT: ('in_port', struct.Struct('!I')),
+    ofproto_v1_3.OXM_OF_METADATA: ('metadata', struct.Struct('!Q')),
+    ofproto_v1_3.OXM_OF_TUNNEL_ID: ('tunnel_id', struct.Struct('!Q')),
+}
+
+_MATCH_HEADER = struct.Struct('!HH')  # type, length
+_OXM_HEADER = struct.Struct('!I')
+# The most common match: type, length, OXM header and value of in_port.
+_IN_PORT_ONLY = struct.Struct('!HHII')
+_IN_PORT_ONLY_LEN = _IN_PORT_ONLY.size
+
+
+class _PacketInMatch(object):
+    # A mixin of the classes made by packet_in_match_class().
+    # The slots shadow nothing of OFPMatch, whose instances keep all the
+    # state in the instance dict, which is left empty until the fallback.
+    __slots__ = ('in_port', 'metadata', 'tunnel_id', 'length',
+                 '_buf', '_offset')
+
+    _ofp_match_parser = None  # OFPMatch.parser of the OpenFlow version
+
+    def _parse_all(self):
+        match = self._ofp_match_parser(self._buf, self._offset)
+        self.__dict__.update(match.__dict__)
+
+    def __getattr__(self, name):
+        # Called only for the attributes of OFPMatch not parsed yet.
+        if name.startswith('__') or '_wc' in self.__dict__:
+            raise AttributeError(name)
+        self._parse_all()
+        return object.__getattribute__(self, name)
+
+    def _fast_get(self, key):
+        if key in _FIELD_NAMES:
+            return getattr(self, key)
+        return None
+
+    def __getitem__(self, key):
+        value = self._fast_get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._fast_get(key) is not None
+
+    def get(self, key, default=None):
+        value = self._fast_get(key)
+        if value is None:
+            return default
+        return value
+
+
+_FIELD_NAMES = frozenset(name for name, _ in _FIELDS.values())
+
+
+def packet_in_match_class(ofp_match_cls):
+    """
+    Returns a subclass of ofp_match_cls, the OFPMatch class of an
+    OpenFlow version, whose parser() takes the fast path.
+    """
+    def parser(cls, buf, offset):
+        try:
+            match = _parse(cls, buf, offset)
+        except struct.error:
+            match = None
+        if match is None:
+            # Anything unusual, including truncated messages.
+            return ofp_match_cls.parser(buf, offset)
+        return match
+
+    return type(ofp_match_cls.__name__, (_PacketInMatch, ofp_match_cls), {
+        '__module__': ofp_match_cls.__module__,
+        '__slots__': (),
+        '_ofp_match_parser': staticmethod(ofp_match_cls.parser),
+        'parser': classmethod(parser),
+    })
+
+
+def _parse(cls, buf, offset):
+    match = object.__new__(cls)
+    match.in_port = match.metadata = match.tunnel_id = None
+    match._buf = buf
+    match._offset = offset
+
+    if len(buf) - offset >= _IN_PORT_ONLY_LEN:
+        type_, length, header, in_port = _IN_PORT_ONLY.unpack_from(buf,
+                                                                   offset)
+        if (type_ == ofproto_v1_3.OFPMT_OXM and
+                length == _IN_PORT_ONLY_LEN and
+                header == ofproto_v1_3.OXM_OF_IN_PORT):
+            match.length = length
+            match.in_port = in_port
+            return match
+
+    type_, length = _MATCH_HEADER.unpack_from(buf, offset)
+    if type_ != ofproto_v1_3.OFPMT_OXM:
+        return None
+    match.length = length
+    end = offset + length
+    offset += _MATCH_HEADER.size
+    while offset < end:
+        header, = _OXM_HEADER.unpack_from(buf, offset)
+        field = _FIELDS.get(header)
+        if field is None:
+            return None
+        name, field_struct = field
+        offset += _OXM_HEADER.size
+        if getattr(match, name) is not None:
+            # duplicated field
+            return None
+        setattr(match, name, field_struct.unpack_from(buf, offset)[0])
+        offset += field_struct.size
+    if offset != end:
+        return None
+    return match
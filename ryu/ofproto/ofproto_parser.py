@@ -27,6 +27,7 @@ from ryu import utils
 from ryu.lib import stringify
 
 from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_v1_2
 
 LOG = logging.getLogger('ryu.ofproto.ofproto_parser')
 
@@ -36,13 +37,18 @@ if six.PY3:
 
 
 def header(buf):
+    """
+    Unpack the OpenFlow header at the head of buf, which can be any object
+    supporting the buffer protocol (bytes, bytearray, memoryview), without
+    copying it.
+    """
     assert len(buf) >= ofproto_common.OFP_HEADER_SIZE
     # LOG.debug('len %d bufsize %d', len(buf), ofproto.OFP_HEADER_SIZE)
-    return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR,
-                              six.binary_type(buf))
+    return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR, buf)
 
 
 _MSG_PARSERS = {}
+_LAZY_MSG_PARSERS = {}
 
 
 def register_msg_parser(version):
@@ -52,17 +58,46 @@ def register_msg_parser(version):
     return register
 
 
-def msg(datapath, version, msg_type, msg_len, xid, buf):
+def register_lazy_msg_parser(version):
+    def register(msg_parser):
+        _LAZY_MSG_PARSERS[version] = msg_parser
+        return msg_parser
+    return register
+
+
+def msg(datapath, version, msg_type, msg_len, xid, buf, lazy=False):
+    """
+    Parse an OpenFlow message.
+
+    If lazy is True and the version supports it, the messages which carry
+    a match, instructions or a multipart body are returned with only the
+    headers parsed.  The rest of the message is parsed on the first access
+    to any other attribute, so that errors in it are raised there.
+    (See lazy_msg)
+    """
     exp = None
     try:
         assert len(buf) >= msg_len
     except AssertionError as e:
         exp = e
 
-    msg_parser = _MSG_PARSERS.get(version)
+    msg_parser = None
+    if lazy:
+        msg_parser = _LAZY_MSG_PARSERS.get(version)
+    if msg_parser is None:
+        msg_parser = _MSG_PARSERS.get(version)
     if msg_parser is None:
         raise exception.OFPUnknownVersion(version=version)
 
+    if isinstance(buf, memoryview):
+        # The receiver reuses the memory behind the view for subsequent
+        # messages. Take the copy which the message keeps as msg.buf here,
+        # set_buf() and the parsers then work on it without copying again.
+        buf = buf.tobytes()
+    elif isinstance(buf, bytearray):
+        # Likewise, rather than once in set_buf() and again in parsers.
+        buf = six.binary_type(buf)
+
     try:
         msg = msg_parser(datapath, version, msg_type, msg_len, xid, buf)
     except exception.OFPTruncatedMessage as e:
@@ -242,6 +277,11 @@ class MsgBase(StringifyMixin):
         msg_.set_buf(buf)
         return msg_
 
+    @classmethod
+    def lazy_parser(cls, datapath, version, msg_type, msg_len, xid, buf):
+        return lazy_msg(cls, cls.parser,
+                        datapath, version, msg_type, msg_len, xid, buf)
+
     def _serialize_pre(self):
         self.version = self.datapath.ofproto.OFP_VERSION
         self.msg_type = self.cls_msg_type
@@ -271,6 +311,64 @@ class MsgBase(StringifyMixin):
         self._serialize_header()
 
 
+class _LazyMsg(object):
+    """
+    A mixin of the lazy variants of message classes.  (See lazy_msg)
+    """
+
+    def __getattr__(self, name):
+        # Called only for the attributes not parsed yet.
+        if name.startswith('__') or '_lazy_parser' not in self.__dict__:
+            raise AttributeError(name)
+        self._lazy_parse()
+        return object.__getattribute__(self, name)
+
+    def _lazy_parse(self):
+        parser = self.__dict__.pop('_lazy_parser', None)
+        if parser is None:
+            return
+        msg_ = parser(self.datapath, self.version, self.msg_type,
+                      self.msg_len, self.xid, self.buf)
+        for k, v in msg_.__dict__.items():
+            # Keep the attributes which have been set in the meantime.
+            self.__dict__.setdefault(k, v)
+
+    def stringify_attrs(self):
+        self._lazy_parse()
+        return super(_LazyMsg, self).stringify_attrs()
+
+
+_LAZY_MSG_CLASSES = {}
+
+
+def lazy_msg_class(cls):
+    """
+    Returns the lazy variant of the message class cls, which is a subclass
+    of cls with the same name.
+    """
+    lazy_cls = _LAZY_MSG_CLASSES.get(cls)
+    if lazy_cls is None:
+        lazy_cls = type(cls.__name__, (_LazyMsg, cls),
+                        {'__module__': cls.__module__})
+        _LAZY_MSG_CLASSES[cls] = lazy_cls
+    return lazy_cls
+
+
+def lazy_msg(cls, parser, datapath, version, msg_type, msg_len, xid, buf):
+    """
+    Returns an instance of the lazy variant of the message class cls with
+    only the headers set.  The other attributes are filled with those of
+    parser(datapath, version, msg_type, msg_len, xid, buf) on the first
+    access to any of them.
+    """
+    msg_ = lazy_msg_class(cls).__new__(lazy_msg_class(cls))
+    msg_.datapath = datapath
+    msg_.set_headers(version, msg_type, msg_len, xid)
+    msg_.set_buf(buf)
+    msg_._lazy_parser = parser
+    return msg_
+
+
 class MsgInMsgBase(MsgBase):
     @classmethod
     def _decode_value(cls, k, json_value, decode_string=base64.b64decode,
@@ -295,3 +393,35 @@ def msg_str_attr(msg_, buf, attr_list=None):
             buf += ' %s %s' % (attr, val)
 
     return buf
+
+
+_OXM_MATCH_HEADER = struct.Struct('!HH')  # type, length
+_OXM_HEADER = struct.Struct('!HBB')  # class, field and hasmask, length
+
+
+def match_key(match, buf=None):
+    """
+    Returns a hashable key of the match.
+
+    The key is the serialized match with the OXM fields sorted, so that
+    matches of the same fields in any order, e.g. one built with
+    OFPMatch(**kwargs) and the same one returned by a switch, have the
+    same key.  buf is the serialized match, if already at hand.
+    """
+    if buf is None:
+        buf = bytearray()
+        match.serialize(buf, 0)
+    buf = bytes(buf)
+    if getattr(match, 'type', None) != ofproto_v1_2.OFPMT_OXM:
+        # The match of OpenFlow 1.0 has a fixed layout.
+        return buf
+    _type, length = _OXM_MATCH_HEADER.unpack_from(buf)
+    fields = []
+    offset = _OXM_MATCH_HEADER.size
+    while offset < length:
+        end = (offset + _OXM_HEADER.size +
+               _OXM_HEADER.unpack_from(buf, offset)[2])
+        fields.append(buf[offset:end])
+        offset = end
+    fields.sort()
+    return buf[:_OXM_MATCH_HEADER.size] + b''.join(fields) + buf[length:]
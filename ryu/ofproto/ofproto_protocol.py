@@ -14,36 +14,90 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ryu.ofproto import ofproto_v1_0
-from ryu.ofproto import ofproto_v1_0_parser
-from ryu.ofproto import ofproto_v1_2
-from ryu.ofproto import ofproto_v1_2_parser
-from ryu.ofproto import ofproto_v1_3
-from ryu.ofproto import ofproto_v1_3_parser
-from ryu.ofproto import ofproto_v1_4
-from ryu.ofproto import ofproto_v1_4_parser
-from ryu.ofproto import ofproto_v1_5
-from ryu.ofproto import ofproto_v1_5_parser
-
-
-_versions = {
-    ofproto_v1_0.OFP_VERSION: (ofproto_v1_0, ofproto_v1_0_parser),
-    ofproto_v1_2.OFP_VERSION: (ofproto_v1_2, ofproto_v1_2_parser),
-    ofproto_v1_3.OFP_VERSION: (ofproto_v1_3, ofproto_v1_3_parser),
-    ofproto_v1_4.OFP_VERSION: (ofproto_v1_4, ofproto_v1_4_parser),
-    ofproto_v1_5.OFP_VERSION: (ofproto_v1_5, ofproto_v1_5_parser),
+import importlib
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+
+# OpenFlow version -> name of the module of its constants.
+# The name of the parser module is that with '_parser' appended.
+_VERSION_MODULES = {
+    0x01: 'ryu.ofproto.ofproto_v1_0',
+    0x03: 'ryu.ofproto.ofproto_v1_2',
+    0x04: 'ryu.ofproto.ofproto_v1_3',
+    0x05: 'ryu.ofproto.ofproto_v1_4',
+    0x06: 'ryu.ofproto.ofproto_v1_5',
 }
 
 
+class _Versions(Mapping):
+    """
+    A mapping of OpenFlow versions to the pairs of their constants and
+    parser modules, which imports the modules of a version on the first
+    lookup of it.  Iterating over the keys doesn't import anything.
+    """
+
+    def __init__(self, module_names):
+        self._module_names = module_names
+        self._modules = {}
+
+    def __getitem__(self, version):
+        try:
+            return self._modules[version]
+        except KeyError:
+            pass
+        name = self._module_names[version]
+        mods = (importlib.import_module(name),
+                importlib.import_module(name + '_parser'))
+        assert mods[0].OFP_VERSION == version
+        self._modules[version] = mods
+        return mods
+
+    def __iter__(self):
+        return iter(self._module_names)
+
+    def __len__(self):
+        return len(self._module_names)
+
+    def loaded(self):
+        """
+        Returns the set of the versions whose modules have been imported.
+        """
+        return set(self._modules)
+
+
+_versions = _Versions(_VERSION_MODULES)
+
+
 # OF versions supported by every apps in this process (intersection)
 _supported_versions = set(_versions.keys())
 
+# True if any app has declared the versions it supports
+_app_versions_declared = False
+
 
 def set_app_supported_versions(vers):
     global _supported_versions
+    global _app_versions_declared
 
     _supported_versions &= set(vers)
     assert _supported_versions, 'No OpenFlow version is available'
+    _app_versions_declared = True
+
+
+def load_app_supported_versions():
+    """
+    Import the modules of the versions which the apps have declared to
+    support.  Unless any app has declared them, the modules of a version
+    are imported when a switch negotiates it.
+    """
+    if not _app_versions_declared:
+        return
+    for version in _supported_versions:
+        _versions[version]
 
 
 class ProtocolDesc(object):
@@ -150,8 +150,7 @@ class OFPErrorMsg(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        type_, = struct.unpack_from('!H', six.binary_type(buf),
-                                    ofproto.OFP_HEADER_SIZE)
+        type_, = struct.unpack_from('!H', buf, ofproto.OFP_HEADER_SIZE)
         msg = super(OFPErrorMsg, cls).parser(datapath, version, msg_type,
                                              msg_len, xid, buf)
         if type_ == ofproto.OFPET_EXPERIMENTER:
@@ -3712,14 +3711,11 @@ class OFPMatch(StringifyMixin):
         if self._composed_with_old_api():
             return self.serialize_old(buf, offset)
 
-        fields = [ofproto.oxm_from_user(k, uv) for (k, uv)
-                  in self._fields2]
-
         hdr_pack_str = '!HH'
         field_offset = offset + struct.calcsize(hdr_pack_str)
-        for (n, value, mask) in fields:
-            field_offset += ofproto.oxm_serialize(n, value, mask, buf,
-                                                  field_offset)
+        for (k, uv) in self._fields2:
+            field_offset += ofproto.oxm_serialize_user(k, uv, buf,
+                                                       field_offset)
 
         length = field_offset - offset
         msg_pack_into(hdr_pack_str, buf, offset,
@@ -3957,8 +3953,7 @@ class OFPMatch(StringifyMixin):
 
         fields = []
         while length > 0:
-            n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
-            k, uv = ofproto.oxm_to_user(n, value, mask)
+            k, uv, field_len = ofproto.oxm_parse_user(buf, offset)
             fields.append((k, uv))
             offset += field_len
             length -= field_len
@@ -53,6 +53,7 @@ from ryu import exception
 from ryu import utils
 from ryu.ofproto.ofproto_parser import StringifyMixin, MsgBase
 from ryu.ofproto import ether
+from ryu.ofproto import fast_match
 from ryu.ofproto import nx_actions
 from ryu.ofproto import ofproto_parser
 from ryu.ofproto import ofproto_common
@@ -62,6 +63,7 @@ import logging
 LOG = logging.getLogger('ryu.ofproto.ofproto_v1_3_parser')
 
 _MSG_PARSERS = {}
+_LAZY_MSG_PARSERS = {}
 
 
 def _set_msg_type(msg_type):
@@ -79,6 +81,14 @@ def _register_parser(cls):
     return cls
 
 
+def _register_lazy_parser(cls):
+    '''class decorator to register lazy msg parser'''
+    assert cls.cls_msg_type is not None
+    assert cls.cls_msg_type not in _LAZY_MSG_PARSERS
+    _LAZY_MSG_PARSERS[cls.cls_msg_type] = cls.lazy_parser
+    return cls
+
+
 def _register_exp_type(experimenter, exp_type):
     assert exp_type not in OFPExperimenter._subtypes
 
@@ -94,6 +104,12 @@ def msg_parser(datapath, version, msg_type, msg_len, xid, buf):
     return parser(datapath, version, msg_type, msg_len, xid, buf)
 
 
+@ofproto_parser.register_lazy_msg_parser(ofproto.OFP_VERSION)
+def lazy_msg_parser(datapath, version, msg_type, msg_len, xid, buf):
+    parser = _LAZY_MSG_PARSERS.get(msg_type, _MSG_PARSERS.get(msg_type))
+    return parser(datapath, version, msg_type, msg_len, xid, buf)
+
+
 @_register_parser
 @_set_msg_type(ofproto.OFPT_HELLO)
 class OFPHello(MsgBase):
@@ -260,8 +276,7 @@ class OFPErrorMsg(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        type_, = struct.unpack_from('!H', six.binary_type(buf),
-                                    ofproto.OFP_HEADER_SIZE)
+        type_, = struct.unpack_from('!H', buf, ofproto.OFP_HEADER_SIZE)
         msg = super(OFPErrorMsg, cls).parser(datapath, version, msg_type,
                                              msg_len, xid, buf)
         if type_ == ofproto.OFPET_EXPERIMENTER:
@@ -1049,14 +1064,11 @@ class OFPMatch(StringifyMixin):
         if self._composed_with_old_api():
             return self.serialize_old(buf, offset)
 
-        fields = [ofproto.oxm_from_user(k, uv) for (k, uv)
-                  in self._fields2]
-
         hdr_pack_str = '!HH'
         field_offset = offset + struct.calcsize(hdr_pack_str)
-        for (n, value, mask) in fields:
-            field_offset += ofproto.oxm_serialize(n, value, mask, buf,
-                                                  field_offset)
+        for (k, uv) in self._fields2:
+            field_offset += ofproto.oxm_serialize_user(k, uv, buf,
+                                                       field_offset)
 
         length = field_offset - offset
         msg_pack_into(hdr_pack_str, buf, offset,
@@ -1328,8 +1340,7 @@ class OFPMatch(StringifyMixin):
         fields = []
         try:
             while length > 0:
-                n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
-                k, uv = ofproto.oxm_to_user(n, value, mask)
+                k, uv, field_len = ofproto.oxm_parse_user(buf, offset)
                 fields.append((k, uv))
                 offset += field_len
                 length -= field_len
@@ -1596,6 +1607,8 @@ class OFPPropUnknown(StringifyMixin):
 
     @classmethod
     def parser(cls, buf):
+        if isinstance(buf, memoryview):
+            buf = buf.tobytes()
         return cls(buf=buf)
 
 
@@ -2258,6 +2271,11 @@ class MTIPv6ExtHdr(OFPMatchField):
         self.mask = mask
 
 
+# OFPMatch decoded on the fast path of OFPPacketIn.parser
+_PacketInMatch = fast_match.packet_in_match_class(OFPMatch)
+
+
+@_register_lazy_parser
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
 class OFPPacketIn(MsgBase):
@@ -2328,8 +2346,9 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        msg.match = _PacketInMatch.parser(msg.buf,
+                                          ofproto.OFP_PACKET_IN_SIZE -
+                                          ofproto.OFP_MATCH_SIZE)
 
         match_len = utils.round_up(msg.match.length, 8)
         msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
@@ -2342,6 +2361,7 @@ class OFPPacketIn(MsgBase):
         return msg
 
 
+@_register_lazy_parser
 @_register_parser
 @_set_msg_type(ofproto.OFPT_FLOW_REMOVED)
 class OFPFlowRemoved(MsgBase):
@@ -3884,6 +3904,7 @@ class OFPMultipartRequest(MsgBase):
         self._serialize_stats_body()
 
 
+@_register_lazy_parser
 @_register_parser
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
 class OFPMultipartReply(MsgBase):
@@ -3927,11 +3948,25 @@ class OFPMultipartReply(MsgBase):
         return msg
 
     @classmethod
-    def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
+    def lazy_parser(cls, datapath, version, msg_type, msg_len, xid, buf):
+        # The class depends on the type, parse it eagerly.
         type_, flags = struct.unpack_from(
-            ofproto.OFP_MULTIPART_REPLY_PACK_STR, six.binary_type(buf),
+            ofproto.OFP_MULTIPART_REPLY_PACK_STR, buf,
             ofproto.OFP_HEADER_SIZE)
         stats_type_cls = cls._STATS_MSG_TYPES.get(type_)
+        if stats_type_cls is None:
+            return cls.parser(datapath, version, msg_type, msg_len, xid, buf)
+        msg = ofproto_parser.lazy_msg(stats_type_cls, cls.parser, datapath,
+                                      version, msg_type, msg_len, xid, buf)
+        msg.type = type_
+        msg.flags = flags
+        return msg
+
+    @classmethod
+    def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
+        type_, flags = struct.unpack_from(
+            ofproto.OFP_MULTIPART_REPLY_PACK_STR, buf, ofproto.OFP_HEADER_SIZE)
+        stats_type_cls = cls._STATS_MSG_TYPES.get(type_)
         msg = super(OFPMultipartReply, stats_type_cls).parser(
             datapath, version, msg_type, msg_len, xid, buf)
         msg.type = type_
@@ -5259,8 +5294,10 @@ class OFPTableFeaturesStats(StringifyMixin):
         table_features.name = name.rstrip(b'\0')
 
         props = []
-        rest = buf[offset + ofproto.OFP_TABLE_FEATURES_SIZE:
-                   offset + table_features.length]
+        # Properties and the ids in them are walked through on a memoryview
+        # so that taking the rest of them doesn't copy it each time.
+        rest = memoryview(buf)[offset + ofproto.OFP_TABLE_FEATURES_SIZE:
+                               offset + table_features.length]
         while rest:
             p, rest = OFPTableFeatureProp.parse(rest)
             props.append(p)
@@ -5313,8 +5350,7 @@ class OFPInstructionId(StringifyMixin):
 
     @classmethod
     def parse(cls, buf):
-        (type_, len_,) = struct.unpack_from(cls._PACK_STR,
-                                            six.binary_type(buf), 0)
+        (type_, len_,) = struct.unpack_from(cls._PACK_STR, buf, 0)
         rest = buf[len_:]
         return cls(type_=type_, len_=len_), rest
 
@@ -5367,8 +5403,7 @@ class OFPTableFeaturePropNextTables(OFPTableFeatureProp):
         rest = cls.get_rest(buf)
         ids = []
         while rest:
-            (i,) = struct.unpack_from(cls._TABLE_ID_PACK_STR,
-                                      six.binary_type(rest), 0)
+            (i,) = struct.unpack_from(cls._TABLE_ID_PACK_STR, rest, 0)
             rest = rest[struct.calcsize(cls._TABLE_ID_PACK_STR):]
             ids.append(i)
         return cls(table_ids=ids)
@@ -5401,8 +5436,7 @@ class OFPActionId(StringifyMixin):
 
     @classmethod
     def parse(cls, buf):
-        (type_, len_,) = struct.unpack_from(cls._PACK_STR,
-                                            six.binary_type(buf), 0)
+        (type_, len_,) = struct.unpack_from(cls._PACK_STR, buf, 0)
         rest = buf[len_:]
         return cls(type_=type_, len_=len_), rest
 
@@ -5478,7 +5512,7 @@ class OFPOxmId(StringifyMixin):
 
     @classmethod
     def parse(cls, buf):
-        (oxm,) = struct.unpack_from(cls._PACK_STR, six.binary_type(buf), 0)
+        (oxm,) = struct.unpack_from(cls._PACK_STR, buf, 0)
         # oxm (32 bit) == class (16) | field (7) | hasmask (1) | length (8)
         # in case of experimenter OXMs, another 32 bit value
         # (experimenter id) follows.
@@ -5489,7 +5523,7 @@ class OFPOxmId(StringifyMixin):
         class_ = oxm >> (7 + 1 + 8)
         if class_ == ofproto.OFPXMC_EXPERIMENTER:
             (exp_id,) = struct.unpack_from(cls._EXPERIMENTER_ID_PACK_STR,
-                                           six.binary_type(rest), 0)
+                                           rest, 0)
             rest = rest[struct.calcsize(cls._EXPERIMENTER_ID_PACK_STR):]
             subcls = OFPExperimenterOxmId
             return subcls(type_=type_, exp_id=exp_id, hasmask=hasmask,
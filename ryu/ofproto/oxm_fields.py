@@ -74,8 +74,11 @@ from ryu.ofproto.oxx_fields import (
     _normalize_user,
     _parse,
     _parse_header,
+    _parse_user,
     _serialize,
-    _serialize_header)
+    _serialize_header,
+    _serialize_user,
+    _compile_codecs)
 from ryu.ofproto import ofproto_common
 
 
@@ -205,6 +208,16 @@ def generate(modname):
     add_attr('oxm_serialize_header',
              functools.partial(_serialize_header, oxx, mod))
 
+    # precompiled versions of oxm_from_user + oxm_serialize and
+    # oxm_parse + oxm_to_user.
+    encoders, decoders = _compile_codecs(oxx, mod, mod.oxm_types)
+    add_attr('oxm_serialize_user',
+             functools.partial(_serialize_user, oxx, mod, name_to_field,
+                               encoders))
+    add_attr('oxm_parse_user',
+             functools.partial(_parse_user, oxx, mod, num_to_field,
+                               decoders))
+
     add_attr('oxm_to_jsondict', _to_jsondict)
     add_attr('oxm_from_jsondict', _from_jsondict)
 
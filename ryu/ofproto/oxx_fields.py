@@ -263,3 +263,132 @@ def _serialize(oxx, mod, n, value, mask, buf, offset):
                       (n << 9) | (0 << 8) | (exp_hdr_len + value_len),
                       bytes(exp_hdr), value)
     return struct.calcsize(pack_str)
+
+
+# Precompiled codecs.
+#
+# _compile_codecs() makes an encoder per field name and a decoder per
+# on-wire 32-bit header (i.e. per field and masked/unmasked) with the
+# struct.Struct of the whole TLV compiled in advance, so that
+# _serialize_user() and _parse_user() don't need to look up the field
+# descriptions and build the pack strings for each field.  The integer
+# fields which fit a struct format character are packed and unpacked as
+# integers directly, without IntDescr.to_user/from_user.
+# Anything not covered (unknown fields, experimenter fields on parse,
+# values which don't fit) takes the generic path above.
+
+_HEADER = struct.Struct('!I')
+
+_INT_FMT = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+
+def _compile_field(oxx, mod, f):
+    t = f.type
+    size = t.size
+    name = f.name
+    n, exp_hdr = _make_exp_hdr(oxx, mod, f.num)
+    exp_hdr = bytes(exp_hdr)
+    exp_hdr_len = len(exp_hdr)
+    is_int = isinstance(t, type_desc.IntDescr) and size in _INT_FMT
+    if is_int:
+        value_fmt = _INT_FMT[size]
+    else:
+        value_fmt = '%ds' % size
+    header = (n << 9) | (0 << 8) | (exp_hdr_len + size)
+    header_w = (n << 9) | (1 << 8) | (exp_hdr_len + size * 2)
+    pack = struct.Struct('!I%ds%s' % (exp_hdr_len, value_fmt))
+    pack_w = struct.Struct('!I%ds%s%s' % (exp_hdr_len, value_fmt, value_fmt))
+    unpack = struct.Struct('!' + value_fmt)
+    unpack_w = struct.Struct('!' + value_fmt * 2)
+    value_offset = _HEADER.size + exp_hdr_len
+    from_user = t.from_user
+    to_user = t.to_user
+
+    def encode(user_value, buf, offset):
+        # Returns None if the generic path should be taken instead.
+        if isinstance(user_value, (tuple, list)):
+            (value, mask) = user_value
+        else:
+            value = user_value
+            mask = None
+        if value is None:
+            return None
+        if not is_int:
+            value = from_user(value)
+            if mask is not None:
+                mask = from_user(mask)
+            elif isinstance(value, tuple):
+                # CIDR notations with IPv[46]Addr.  See _from_user.
+                value, mask = value
+            if len(value) != size or (mask is not None and
+                                      len(mask) != size):
+                return None
+        try:
+            if mask is None:
+                data = pack.pack(header, exp_hdr, value)
+            else:
+                data = pack_w.pack(header_w, exp_hdr, value, mask)
+        except struct.error:
+            return None
+        end = offset + len(data)
+        if len(buf) < end:
+            buf += bytearray(end - len(buf))
+        buf[offset:end] = data
+        return len(data)
+
+    if is_int:
+        def decode(buf, offset):
+            (value, ) = unpack.unpack_from(buf, offset + value_offset)
+            return name, value, pack.size
+
+        def decode_w(buf, offset):
+            uv = unpack_w.unpack_from(buf, offset + value_offset)
+            return name, uv, pack_w.size
+    else:
+        def decode(buf, offset):
+            (value, ) = unpack.unpack_from(buf, offset + value_offset)
+            return name, to_user(value), pack.size
+
+        def decode_w(buf, offset):
+            (value, mask) = unpack_w.unpack_from(buf, offset + value_offset)
+            return name, (to_user(value), to_user(mask)), pack_w.size
+
+    return header, header_w, encode, decode, decode_w
+
+
+def _compile_codecs(oxx, mod, fields):
+    encoders = {}
+    decoders = {}
+    for f in fields:
+        if not hasattr(f.type, 'size'):
+            continue
+        (header, header_w, encode, decode,
+         decode_w) = _compile_field(oxx, mod, f)
+        encoders[f.name] = encode
+        if f._class == OFPXXC_EXPERIMENTER:
+            # The 32-bit header doesn't identify the field.
+            continue
+        decoders[header] = decode
+        decoders[header_w] = decode_w
+    return encoders, decoders
+
+
+def _serialize_user(oxx, mod, name_to_field, encoders, name, user_value,
+                    buf, offset):
+    encode = encoders.get(name)
+    if encode is not None:
+        length = encode(user_value, buf, offset)
+        if length is not None:
+            return length
+    (n, value, mask) = _from_user(oxx, name_to_field, name, user_value)
+    return _serialize(oxx, mod, n, value, mask, buf, offset)
+
+
+def _parse_user(oxx, mod, num_to_field, decoders, buf, offset):
+    (header, ) = _HEADER.unpack_from(buf, offset)
+    decode = decoders.get(header)
+    if decode is not None:
+        return decode(buf, offset)
+    (n, value, mask, field_len) = _parse(mod, buf, offset)
+    (name, user_value) = _to_user(oxx, num_to_field, n, value, mask)
+    return name, user_value, field_len
@@ -0,0 +1,103 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro benchmark of the event dispatch in ryu.base.app_manager.
+
+Dispatches packet-in events from the 'ofp_event' brick to five applications
+which observe EventOFPPacketIn, the same way Datapath._recv_loop and
+RyuApp._event_loop do, and reports the number of events per second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_dispatch [count]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from ryu.base import app_manager
+from ryu.controller import ofp_event
+from ryu.controller.handler import MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+DEFAULT_COUNT = 100000
+NUM_APPS = 5
+
+
+class _OFPEventBrick(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_OFPEventBrick, self).__init__(*args, **kwargs)
+        self.name = 'ofp_event'
+
+
+class _PacketInApp(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_PacketInApp, self).__init__(*args, **kwargs)
+        self.name = kwargs['name']
+        self.count = 0
+
+    @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+    def packet_in_handler(self, ev):
+        self.count += 1
+
+
+def _dispatch(brick, apps, ev, state):
+    # Datapath._recv_loop
+    brick.send_event_to_observers(ev, state)
+    for handler in brick.get_handlers(ev, state):
+        handler(ev)
+    # RyuApp._event_loop of each application
+    for app in apps:
+        ev_, state_ = app.events.get()
+        app._events_sem.release()
+        for handler in app.get_handlers(ev_, state_):
+            handler(ev_)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+
+    brick = _OFPEventBrick()
+    app_manager.register_app(brick)
+    apps = []
+    for i in range(NUM_APPS):
+        app = _PacketInApp(name='app%d' % i)
+        app_manager.register_app(app)
+        brick.register_observer(ofp_event.EventOFPPacketIn, app.name,
+                                [MAIN_DISPATCHER])
+        apps.append(app)
+
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    ev = ofp_event.EventOFPPacketIn(ofproto_v1_3_parser.OFPPacketIn(dp))
+
+    start = time.time()
+    for _ in range(count):
+        _dispatch(brick, apps, ev, MAIN_DISPATCHER)
+    elapsed = time.time() - start
+
+    assert all(app.count == count for app in apps)
+    print('packet-in dispatch to %d apps: %10.0f events/sec' % (
+        NUM_APPS, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
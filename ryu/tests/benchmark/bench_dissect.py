@@ -0,0 +1,88 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of packet.dissect() against packet.Packet().
+
+Decodes every packet of the pcap files in ryu/tests/packet_data/pcap
+with Packet(), with dissect(), and with dissect() converting the
+addresses to text, as an application reading the MAC and IP addresses
+does, and reports the number of packets per second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_dissect [count]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from ryu.lib import pcaplib
+from ryu.lib.packet import packet
+
+
+DEFAULT_COUNT = 2000
+PCAP_DIR = os.path.join(os.path.dirname(__file__), '../packet_data/pcap')
+
+
+def _corpus():
+    bufs = []
+    for name in sorted(os.listdir(PCAP_DIR)):
+        if not name.endswith('.pcap'):
+            continue
+        with open(os.path.join(PCAP_DIR, name), 'rb') as f:
+            bufs.extend(buf for _ts, buf in pcaplib.Reader(f))
+    return bufs
+
+
+def _packet(buf):
+    packet.Packet(buf)
+
+
+def _dissect(buf):
+    packet.dissect(buf)
+
+
+def _dissect_text(buf):
+    headers = packet.dissect(buf)
+    (headers.eth_dst, headers.eth_src, headers.ip_src, headers.ip_dst)
+
+
+def bench(corpus, count, func):
+    start = time.time()
+    for _ in range(count):
+        for buf in corpus:
+            func(buf)
+    elapsed = time.time() - start
+    return count * len(corpus) / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    corpus = _corpus()
+    print('%d packets' % len(corpus))
+    base = bench(corpus, count, _packet)
+    print('%-20s %10.0f pkts/sec' % ('Packet()', base))
+    for func, label in ((_dissect, 'dissect()'),
+                        (_dissect_text, 'dissect() and text')):
+        rate = bench(corpus, count, func)
+        print('%-20s %10.0f pkts/sec (x%.2f)' % (label, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the flow-mod construction of OpenFlow 1.3.
+
+Builds and serializes flow-mod messages with typical matches, and parses
+the matches back, with the precompiled OXM codecs (oxm_serialize_user and
+oxm_parse_user) and with the generic ones (oxm_from_user + oxm_serialize
+and oxm_parse + oxm_to_user), and reports the number of messages per
+second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_flow_mod [count]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+DEFAULT_COUNT = 20000
+MATCHES = [
+    {'in_port': 1, 'eth_dst': '00:11:22:33:44:55'},
+    {'in_port': 1, 'eth_type': 0x0800, 'ip_proto': 6,
+     'ipv4_src': '192.0.2.1', 'ipv4_dst': ('198.51.100.0', '255.255.255.0'),
+     'tcp_dst': 80},
+    {'metadata': (0x1234, 0xffff), 'vlan_vid': 0x1000 | 10,
+     'eth_type': 0x86dd, 'ipv6_dst': '2001:db8::1'},
+]
+
+
+def _generic_serialize_user(k, uv, buf, offset):
+    (n, value, mask) = ofproto_v1_3.oxm_from_user(k, uv)
+    return ofproto_v1_3.oxm_serialize(n, value, mask, buf, offset)
+
+
+def _generic_parse_user(buf, offset):
+    (n, value, mask, field_len) = ofproto_v1_3.oxm_parse(buf, offset)
+    (k, uv) = ofproto_v1_3.oxm_to_user(n, value, mask)
+    return k, uv, field_len
+
+
+def bench(match, count):
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    parser = ofproto_v1_3_parser
+    actions = [parser.OFPActionOutput(2)]
+    inst = [parser.OFPInstructionActions(ofproto_v1_3.OFPIT_APPLY_ACTIONS,
+                                         actions)]
+    offset = ofproto_v1_3.OFP_FLOW_MOD_SIZE - ofproto_v1_3.OFP_MATCH_SIZE
+    start = time.time()
+    for _ in range(count):
+        msg = parser.OFPFlowMod(dp, match=parser.OFPMatch(**match),
+                                instructions=inst)
+        msg.serialize()
+        parser.OFPMatch.parser(msg.buf, offset)
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    for match in MATCHES:
+        fast = bench(match, count)
+        orig = (ofproto_v1_3.oxm_serialize_user, ofproto_v1_3.oxm_parse_user)
+        ofproto_v1_3.oxm_serialize_user = _generic_serialize_user
+        ofproto_v1_3.oxm_parse_user = _generic_parse_user
+        try:
+            slow = bench(match, count)
+        finally:
+            (ofproto_v1_3.oxm_serialize_user,
+             ofproto_v1_3.oxm_parse_user) = orig
+        print('%-48s generic %8.0f msgs/sec precompiled %8.0f msgs/sec '
+              '(x%.2f)' % (','.join(sorted(match)), slow, fast, fast / slow))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the lazy parsing of OpenFlow messages.
+
+Parses every message of the OpenFlow 1.3 packet_data corpus which has
+a lazy parser (packet-in, flow-removed and multipart replies) eagerly and
+lazily, once reading only the headers, as an application which only counts
+the messages does, and once reading the body too, and reports the number
+of messages per second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_lazy_parse [count]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+DEFAULT_COUNT = 2000
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../packet_data/of13')
+
+
+def _corpus():
+    msgs = []
+    for name in sorted(os.listdir(PACKET_DATA_DIR)):
+        if not name.endswith('.packet'):
+            continue
+        with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+            buf = f.read()
+        (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+        if (version == ofproto_v1_3.OFP_VERSION and
+                msg_type in ofproto_v1_3_parser._LAZY_MSG_PARSERS):
+            msgs.append((name, (version, msg_type, msg_len, xid, buf)))
+    return msgs
+
+
+def _touch_body(msg):
+    for attr in ('match', 'body'):
+        getattr(msg, attr, None)
+
+
+def bench(corpus, count, lazy, access_body):
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    start = time.time()
+    for _ in range(count):
+        for _name, args in corpus:
+            msg = ofproto_parser.msg(dp, *args, lazy=lazy)
+            if access_body:
+                _touch_body(msg)
+    elapsed = time.time() - start
+    return count * len(corpus) / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    corpus = _corpus()
+    print('%d messages: %s' % (len(corpus),
+                               ', '.join(name for name, _ in corpus)))
+    for access_body, label in ((False, 'headers only'),
+                               (True, 'headers and body')):
+        eager = bench(corpus, count, False, access_body)
+        lazy = bench(corpus, count, True, access_body)
+        print('%-18s eager %10.0f msgs/sec lazy %10.0f msgs/sec (x%.2f)' % (
+            label, eager, lazy, lazy / eager))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the packet-in parser of OpenFlow 1.3.
+
+Parses packet-in messages with the common matches and reads in_port from
+them, as a learning switch does, with the fast path of OFPPacketIn.parser
+(see ryu.ofproto.fast_match) and with OFPMatch.parser, and reports the
+number of messages per second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_packet_in [count]
+"""
+
+from __future__ import print_function
+
+import struct
+import sys
+import time
+
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+DEFAULT_COUNT = 100000
+MATCHES = [
+    {'in_port': 1},
+    {'in_port': 1, 'metadata': 0x1234},
+    {'in_port': 1, 'metadata': 0x1234, 'tunnel_id': 100},
+]
+
+
+def _packet_in(match):
+    ofp = ofproto_v1_3
+    buf = bytearray(ofp.OFP_PACKET_IN_SIZE - ofp.OFP_MATCH_SIZE)
+    ofproto_v1_3_parser.OFPMatch(**match).serialize(buf, len(buf))
+    data = b'\x00' * 64
+    buf += b'\x00' * 2 + data
+    struct.pack_into(ofp.OFP_HEADER_PACK_STR, buf, 0, ofp.OFP_VERSION,
+                     ofp.OFPT_PACKET_IN, len(buf), 0)
+    struct.pack_into(ofp.OFP_PACKET_IN_PACK_STR, buf, ofp.OFP_HEADER_SIZE,
+                     ofp.OFP_NO_BUFFER, len(data), ofp.OFPR_NO_MATCH, 0, 0)
+    return bytes(buf)
+
+
+def bench(buf, count):
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    args = (dp, ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_PACKET_IN,
+            len(buf), 0, buf)
+    parser = ofproto_v1_3_parser.OFPPacketIn.parser
+    start = time.time()
+    for _ in range(count):
+        msg = parser(*args)
+        msg.match['in_port']
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    for match in MATCHES:
+        buf = _packet_in(match)
+        fast = bench(buf, count)
+        # Disable the fast path.
+        orig = ofproto_v1_3_parser._PacketInMatch
+        ofproto_v1_3_parser._PacketInMatch = ofproto_v1_3_parser.OFPMatch
+        try:
+            slow = bench(buf, count)
+        finally:
+            ofproto_v1_3_parser._PacketInMatch = orig
+        print('%-32s OFPMatch.parser %8.0f msgs/sec fast path %8.0f '
+              'msgs/sec (x%.2f)' % (','.join(sorted(match)), slow, fast,
+                                    fast / slow))
+
+
+if __name__ == '__main__':
+    main()
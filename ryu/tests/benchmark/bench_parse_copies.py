@@ -0,0 +1,115 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Audit of the bytes copied by the OpenFlow 1.3 parser.
+
+Parses every message of the OpenFlow 1.3 packet_data corpus which has
+a parser, as Datapath._recv_loop does, and reports the number of bytes
+copied per message.
+
+The message is handed to ofproto_parser.msg() in a bytes subclass which
+records every slice taken of it, or of a slice of it, and every
+conversion of it by bytes().  The copy of msg_len bytes which
+ofproto_parser.msg() takes out of the receive buffer is not seen by the
+audit and is counted separately.  Slices of memoryviews are not copies
+and are not counted.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_parse_copies [-v]
+"""
+
+from __future__ import print_function
+
+import logging
+import os
+import sys
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../packet_data/of13')
+
+
+class _Audit(object):
+    copied = 0
+
+
+class _AuditedBytes(bytes):
+    def __getitem__(self, key):
+        ret = bytes.__getitem__(self, key)
+        if isinstance(key, slice):
+            _Audit.copied += len(ret)
+            ret = _AuditedBytes(ret)
+        return ret
+
+    def __bytes__(self):
+        # bytes(b) of an exact bytes object b returns b itself.
+        return self
+
+
+def _corpus():
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    msgs = []
+    for name in sorted(os.listdir(PACKET_DATA_DIR)):
+        if not name.endswith('.packet'):
+            continue
+        with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+            buf = f.read()
+        args = ofproto_parser.header(buf)
+        if args[0] != ofproto_v1_3.OFP_VERSION:
+            continue
+        try:
+            msg = ofproto_parser.msg(dp, *(args + (buf,)))
+        except Exception:
+            msg = None
+        if msg is None:
+            # Messages which only the controller sends.
+            continue
+        msgs.append((name, args, buf))
+    return msgs
+
+
+def audit(corpus):
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    results = []
+    for name, args, buf in corpus:
+        _Audit.copied = 0
+        ofproto_parser.msg(dp, *(args + (_AuditedBytes(buf),)))
+        results.append((name, len(buf), len(buf) + _Audit.copied))
+    return results
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    verbose = '-v' in sys.argv[1:]
+    results = audit(_corpus())
+    if verbose:
+        for name, msg_len, copied in results:
+            print('%-60s %6d bytes %8d copied' % (name, msg_len, copied))
+    total_len = sum(r[1] for r in results)
+    total_copied = sum(r[2] for r in results)
+    print('%d messages, %d bytes: %.1f bytes copied per message '
+          '(%.2f per byte received)' % (
+              len(results), total_len, float(total_copied) / len(results),
+              float(total_copied) / total_len))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the receive path of ryu.controller.controller.Datapath.
+
+Feeds a stream of OpenFlow 1.3 messages into Datapath._recv_loop through
+a fake socket and reports the number of parsed messages per second.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_recv_loop [count]
+"""
+
+from __future__ import print_function
+
+import struct
+import sys
+import time
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+DEFAULT_COUNT = 100000
+RECV_CHUNK_SIZE = 64 * 1024
+
+
+class _SocketMock(object):
+    def __init__(self, data):
+        self.data = memoryview(bytes(data))
+        self.pos = 0
+
+    def setsockopt(self, *_args):
+        pass
+
+    def settimeout(self, _timeout):
+        pass
+
+    def recv_into(self, buf, nbytes=0):
+        size = min(len(buf), RECV_CHUNK_SIZE, len(self.data) - self.pos)
+        buf[:size] = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+    def shutdown(self, _how):
+        pass
+
+    def close(self):
+        pass
+
+
+class _OFPEventBrick(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_OFPEventBrick, self).__init__(*args, **kwargs)
+        self.name = 'ofp_event'
+
+
+def _echo_reply(size):
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    msg = ofproto_v1_3_parser.OFPEchoReply(
+        dp, data=b'\x00' * (size - ofproto_v1_3.OFP_HEADER_SIZE))
+    msg.serialize()
+    return bytes(msg.buf)
+
+
+def _packet_in(size):
+    buf = bytearray(ofproto_v1_3.OFP_HEADER_SIZE +
+                    struct.calcsize(ofproto_v1_3.OFP_PACKET_IN_PACK_STR))
+    ofproto_v1_3_parser.OFPMatch(in_port=1).serialize(buf, len(buf))
+    buf += b'\x00' * 2  # pad
+    data_len = size - len(buf)
+    buf += b'\x00' * data_len
+    struct.pack_into(ofproto_v1_3.OFP_HEADER_PACK_STR, buf, 0,
+                     ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_PACKET_IN,
+                     len(buf), 0)
+    struct.pack_into(ofproto_v1_3.OFP_PACKET_IN_PACK_STR, buf,
+                     ofproto_v1_3.OFP_HEADER_SIZE,
+                     ofproto_v1_3.OFP_NO_BUFFER, data_len,
+                     ofproto_v1_3.OFPR_NO_MATCH, 0, 0)
+    return bytes(buf)
+
+
+def bench(name, msg, count):
+    sock = _SocketMock(msg * count)
+    dp = controller.Datapath(sock, ('127.0.0.1', 0))
+    dp.set_state(handler.MAIN_DISPATCHER)
+    start = time.time()
+    dp._recv_loop()
+    elapsed = time.time() - start
+    print('%-24s %6d bytes %10.0f msgs/sec %8.1f MB/sec' % (
+        name, len(msg), count / elapsed,
+        count * len(msg) / elapsed / 1000000))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    app_manager.register_app(_OFPEventBrick())
+    bench('OFPEchoReply', _echo_reply(64), count)
+    bench('OFPPacketIn', _packet_in(1500), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the startup of ryu-manager.
+
+Starts ryu-manager with the given applications (simple_switch_13 by
+default) listening on a free port, and reports the time until it
+accepts a connection on the OpenFlow port and its RSS at that point.
+The RSS is read from /proc and is reported only on Linux.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_startup [-n count] [app ...]
+"""
+
+from __future__ import print_function
+
+import socket
+import subprocess
+import sys
+import time
+
+
+DEFAULT_APPS = ['ryu.app.simple_switch_13']
+DEFAULT_COUNT = 5
+TIMEOUT = 60
+
+
+def _free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+def _rss(pid):
+    try:
+        with open('/proc/%d/status' % pid) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    return None
+
+
+def _wait_listen(proc, port):
+    deadline = time.time() + TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('ryu-manager exited with %d' % proc.returncode)
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.1).close()
+            return
+        except socket.error:
+            time.sleep(0.01)
+    raise RuntimeError('ryu-manager did not listen in %d seconds' % TIMEOUT)
+
+
+def bench(apps):
+    port = _free_port()
+    args = [sys.executable, '-m', 'ryu.cmd.manager',
+            '--ofp-listen-host', '127.0.0.1',
+            '--ofp-tcp-listen-port', str(port)] + apps
+    start = time.time()
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT)
+    try:
+        _wait_listen(proc, port)
+        elapsed = time.time() - start
+        rss = _rss(proc.pid)
+    finally:
+        proc.terminate()
+        proc.communicate()
+    return elapsed, rss
+
+
+def main():
+    argv = sys.argv[1:]
+    count = DEFAULT_COUNT
+    if argv[:1] == ['-n']:
+        count = int(argv[1])
+        argv = argv[2:]
+    apps = argv or DEFAULT_APPS
+    results = [bench(apps) for _ in range(count)]
+    elapsed = sorted(r[0] for r in results)[count // 2]
+    rss = sorted(r[1] or 0 for r in results)[count // 2]
+    print('%s: time-to-listen %.3f sec (median of %d), RSS %s' % (
+        ' '.join(apps), elapsed, count,
+        '%.1f MiB' % (rss / 1024.0 / 1024.0) if rss else 'n/a'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the JSON style dict conversions of OpenFlow messages.
+
+Converts every message of the jsondict corpus of the packet_data tests
+(ryu/tests/unit/ofproto/json) from and to a JSON style dict with
+ofp_msg_from_jsondict() and to_jsondict(), and reports the number of
+messages per second for each OpenFlow version, and the slowest message
+classes.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_stringify [count]
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import sys
+import time
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+
+
+DEFAULT_COUNT = 200
+JSON_DIR = os.path.join(os.path.dirname(__file__), '../unit/ofproto/json')
+VERSIONS = (('of10', 1), ('of12', 3), ('of13', 4), ('of14', 5), ('of15', 6))
+SLOWEST = 10
+
+
+def _corpus(dirname, version):
+    dp = ofproto_protocol.ProtocolDesc(version)
+    path = os.path.join(JSON_DIR, dirname)
+    msgs = []
+    for name in sorted(os.listdir(path)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(path, name)) as f:
+            jsondict = json.load(f)
+        try:
+            msg = ofproto_parser.ofp_msg_from_jsondict(dp, jsondict)
+            msg.to_jsondict()
+        except Exception:
+            # not implemented for this version
+            continue
+        msgs.append((dp, jsondict, msg))
+    return msgs
+
+
+def _time(func, args, count):
+    start = time.time()
+    for _ in range(count):
+        func(*args)
+    return time.time() - start
+
+
+def bench(corpus, count):
+    """
+    Returns the numbers of messages per second of to_jsondict() and
+    ofp_msg_from_jsondict(), and the seconds spent on each message class.
+    """
+    to_elapsed = from_elapsed = 0.0
+    per_class = {}
+    for dp, jsondict, msg in corpus:
+        to_ = _time(msg.to_jsondict, (), count)
+        from_ = _time(ofproto_parser.ofp_msg_from_jsondict, (dp, jsondict),
+                      count)
+        to_elapsed += to_
+        from_elapsed += from_
+        name = msg.__class__.__name__
+        per_class[name] = per_class.get(name, 0.0) + (to_ + from_) / count
+    n = count * len(corpus)
+    return n / to_elapsed, n / from_elapsed, per_class
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    per_class = {}
+    for dirname, version in VERSIONS:
+        corpus = _corpus(dirname, version)
+        to_rate, from_rate, classes = bench(corpus, count)
+        print('%s %4d messages: to_jsondict %9.0f msgs/sec '
+              'from_jsondict %9.0f msgs/sec' % (
+                  dirname, len(corpus), to_rate, from_rate))
+        for name, elapsed in classes.items():
+            per_class['%s %s' % (dirname, name)] = elapsed
+    print('slowest classes (usec per to_jsondict + from_jsondict):')
+    for name in sorted(per_class, key=per_class.get, reverse=True)[:SLOWEST]:
+        print('  %-40s %8.1f' % (name, per_class[name] * 1e6))
+
+
+if __name__ == '__main__':
+    main()
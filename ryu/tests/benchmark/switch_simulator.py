@@ -0,0 +1,173 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A software simulator of OpenFlow 1.3 switches, to exercise a controller
+with many switches locally.
+
+Each switch connects to the controller, answers the handshake with its own
+datapath ID, replies to echo, barrier and port description requests and,
+optionally, sends packet-in messages at the given rate.  Every second the
+number of switches which have finished the handshake and the number of
+messages sent and received are reported.
+
+Usage::
+
+    $ ryu-manager --ofp-workers 4 --ofp-worker-by-dpid &
+    $ python -m ryu.tests.benchmark.switch_simulator \\
+        --switches 200 --packet-in-rate 100
+"""
+
+from __future__ import print_function
+
+import argparse
+import struct
+import time
+
+from ryu.lib import hub
+hub.patch(thread=False)
+
+from ryu.lib import addrconv
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+class _Stats(object):
+    def __init__(self):
+        self.connected = 0
+        self.ready = 0
+        self.sent = 0
+        self.received = 0
+
+
+class _Switch(object):
+    def __init__(self, dpid, stats, packet_in_rate, packet_in_size):
+        self.dpid = dpid
+        self.stats = stats
+        self.packet_in_rate = packet_in_rate
+        self.packet_in_size = packet_in_size
+        self.sock = None
+
+    def _recv_msgs(self):
+        buf = b''
+        while True:
+            data = self.sock.recv(64 * 1024)
+            if not data:
+                return
+            buf += data
+            while len(buf) >= ofproto_common.OFP_HEADER_SIZE:
+                _version, msg_type, msg_len, xid = struct.unpack_from(
+                    ofproto_common.OFP_HEADER_PACK_STR, buf)
+                if len(buf) < msg_len:
+                    break
+                self.stats.received += 1
+                yield msg_type, xid, buf[:msg_len]
+                buf = buf[msg_len:]
+
+    def _send_raw(self, msg_type, xid, body=b''):
+        self.sock.sendall(struct.pack(
+            ofproto_common.OFP_HEADER_PACK_STR, ofproto_v1_3.OFP_VERSION,
+            msg_type, ofproto_common.OFP_HEADER_SIZE + len(body), xid) + body)
+        self.stats.sent += 1
+
+    def _handle(self, msg_type, xid, buf):
+        ofp = ofproto_v1_3
+        if msg_type == ofp.OFPT_FEATURES_REQUEST:
+            self._send_raw(ofp.OFPT_FEATURES_REPLY, xid, struct.pack(
+                ofp.OFP_SWITCH_FEATURES_PACK_STR, self.dpid, 0, 254, 0, 0, 0))
+        elif msg_type == ofp.OFPT_ECHO_REQUEST:
+            self._send_raw(ofp.OFPT_ECHO_REPLY, xid,
+                           buf[ofp.OFP_HEADER_SIZE:])
+        elif msg_type == ofp.OFPT_BARRIER_REQUEST:
+            self._send_raw(ofp.OFPT_BARRIER_REPLY, xid)
+        elif msg_type == ofp.OFPT_MULTIPART_REQUEST:
+            mp_type, = struct.unpack_from('!H', buf, ofp.OFP_HEADER_SIZE)
+            if mp_type == ofp.OFPMP_PORT_DESC:
+                port = struct.pack(ofp.OFP_PORT_PACK_STR, 1,
+                                   b'\x02\x00\x00\x00\x00\x01', b'eth1',
+                                   0, 0, 0, 0, 0, 0, 0, 0)
+                self._send_raw(ofp.OFPT_MULTIPART_REPLY, xid, struct.pack(
+                    ofp.OFP_MULTIPART_REPLY_PACK_STR, mp_type, 0) + port)
+                # The controller moves onto MAIN_DISPATCHER.
+                self.stats.ready += 1
+                if self.packet_in_rate:
+                    hub.spawn(self._packet_in_loop)
+
+    def _packet_in_loop(self):
+        ofp = ofproto_v1_3
+        match = bytearray()
+        ofproto_v1_3_parser.OFPMatch(in_port=1).serialize(match, 0)
+        body = struct.pack(ofp.OFP_PACKET_IN_PACK_STR,
+                           ofp.OFP_NO_BUFFER, self.packet_in_size,
+                           ofp.OFPR_NO_MATCH, 0, 0)
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet(
+            dst='ff:ff:ff:ff:ff:ff',
+            src=addrconv.mac.bin_to_text(struct.pack('!HI', 2, self.dpid))))
+        pkt.serialize()
+        data = bytes(pkt.data)
+        data += b'\x00' * (self.packet_in_size - len(data))
+        body += bytes(match) + b'\x00' * 2 + data
+        interval = 1.0 / self.packet_in_rate
+        while True:
+            self._send_raw(ofp.OFPT_PACKET_IN, 0, body)
+            hub.sleep(interval)
+
+    def run(self, addr):
+        self.sock = hub.connect(addr)
+        self.stats.connected += 1
+        self._send_raw(ofproto_v1_3.OFPT_HELLO, 0)
+        for msg_type, xid, buf in self._recv_msgs():
+            self._handle(msg_type, xid, buf)
+        self.stats.connected -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int,
+                        default=ofproto_common.OFP_TCP_PORT)
+    parser.add_argument('--switches', type=int, default=10)
+    parser.add_argument('--first-dpid', type=int, default=1)
+    parser.add_argument('--packet-in-rate', type=float, default=0,
+                        help='packet-in messages per second per switch')
+    parser.add_argument('--packet-in-size', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=0,
+                        help='seconds to run, 0 runs forever')
+    args = parser.parse_args()
+
+    stats = _Stats()
+    for i in range(args.switches):
+        switch = _Switch(args.first_dpid + i, stats,
+                         args.packet_in_rate, args.packet_in_size)
+        hub.spawn(switch.run, (args.host, args.port))
+
+    start = time.time()
+    last_sent = last_received = 0
+    while not args.duration or time.time() - start < args.duration:
+        hub.sleep(1)
+        print('connected %5d ready %5d sent %8d msgs/sec received %8d '
+              'msgs/sec' % (stats.connected, stats.ready,
+                            stats.sent - last_sent,
+                            stats.received - last_received))
+        last_sent = stats.sent
+        last_received = stats.received
+
+
+if __name__ == '__main__':
+    main()
@@ -25,17 +25,22 @@ try:
     import mock  # Python 2
 except ImportError:
     from unittest import mock  # Python 3
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from ryu.app import ofctl_rest
 from ryu.app.wsgi import Request
 from ryu.app.wsgi import WSGIApplication
+from ryu.controller import controller
+from ryu.controller import request
 from ryu.controller.dpset import DPSet
+from ryu.lib import ofctl_utils
 from ryu.ofproto import ofproto_protocol
 from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import ofproto_v1_2
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
 from ryu.ofproto import ofproto_v1_4
+from ryu.ofproto import ofproto_v1_4_parser
 from ryu.ofproto import ofproto_v1_5
 from ryu.tests import test_lib
 
@@ -92,6 +97,241 @@ class Test_ofctl_rest(unittest.TestCase):
         eq_(res.status, '200 OK')
 
 
+class Test_ofctl_rest_stream(unittest.TestCase):
+
+    def setUp(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        dp.address = ('127.0.0.1', 6653)
+        dp.reply_handlers = {}
+        dp.request = self._request
+        self.dp = dp
+        self.requests = []
+        # The flags of the parts of the reply the switch sends
+        self.parts = (ofproto_v1_3.OFPMPF_REPLY_MORE, 0)
+
+        dpset = DPSet()
+        dpset._register(dp)
+        self.wsgi = WSGIApplication()
+        ofctl_rest.RestStatsApi(dpset=dpset, wsgi=self.wsgi)
+
+    def _request(self, msg, timeout=None):
+        # The switch replies to the flow stats request with 2 parts of
+        # 2 flows each, with the priorities 0 to 3.
+        self.requests.append(msg)
+        msg.xid = 1
+        future = request.ReplyFuture(self.dp, msg, timeout)
+        self.dp.reply_handlers[msg.xid] = future
+        parser = ofproto_v1_3_parser
+        for i, flags in enumerate(self.parts):
+            body = [parser.OFPFlowStats(
+                table_id=0, duration_sec=0, duration_nsec=0,
+                priority=i * 2 + j, idle_timeout=0, hard_timeout=0,
+                flags=0, cookie=0, packet_count=0, byte_count=0,
+                match=parser.OFPMatch(), instructions=[])
+                for j in range(2)]
+            reply = parser.OFPFlowStatsReply(self.dp, body=body, flags=flags)
+            reply.xid = msg.xid
+            future(reply)
+        return future
+
+    def _get(self, query, body=None, status='200 OK'):
+        req = Request.blank('/stats/flow/1?' + query)
+        if body is not None:
+            req.method = 'POST'
+            req.body = json.dumps(body).encode('utf-8')
+        with mock.patch.object(ofctl_utils, 'DEFAULT_TIMEOUT', 0.01):
+            res = req.get_response(self.wsgi)
+        eq_(res.status, status)
+        return res
+
+    def test_json(self):
+        res = self._get('format=json')
+        eq_('application/json', res.content_type)
+        eq_([0, 1, 2, 3],
+            [f['priority'] for f in json.loads(res.text)['1']])
+        eq_({}, self.dp.reply_handlers)
+
+    def test_ndjson(self):
+        res = self._get('format=ndjson&limit=3&table_id=1', {'priority': 2})
+        eq_('application/x-ndjson', res.content_type)
+        eq_([{'priority': 2}], [{'priority': json.loads(line)['priority']}
+                                for line in res.text.splitlines()])
+        eq_(1, self.requests[0].table_id)
+
+    def test_pagination(self):
+        body = json.loads(self._get('format=json&limit=3').text)
+        eq_([0, 1, 2], [f['priority'] for f in body['1']])
+        eq_(3, body['next_cursor'])
+
+        body = json.loads(self._get('format=json&limit=3&cursor=3').text)
+        eq_([3], [f['priority'] for f in body['1']])
+        ok_('next_cursor' not in body)
+
+        lines = self._get('format=ndjson&limit=2&cursor=1').text.splitlines()
+        eq_([1, 2], [json.loads(line)['priority'] for line in lines[:-1]])
+        eq_({'next_cursor': 3}, json.loads(lines[-1]))
+
+    def test_timeout(self):
+        # The switch sends only the first part of the reply.
+        self.parts = (ofproto_v1_3.OFPMPF_REPLY_MORE,)
+        body = json.loads(self._get('format=json').text)
+        eq_([0, 1], [f['priority'] for f in body['1']])
+        ok_('timed out' in body['error'])
+        eq_({}, self.dp.reply_handlers)
+
+        lines = self._get('format=ndjson&limit=3').text.splitlines()
+        eq_([0, 1], [json.loads(line)['priority'] for line in lines[:-1]])
+        ok_('timed out' in json.loads(lines[-1])['error'])
+
+    def test_timeout_first(self):
+        # The switch does not reply at all.
+        self.parts = ()
+        self._get('format=json', status='504 Gateway Timeout')
+        eq_({}, self.dp.reply_handlers)
+
+    def test_invalid(self):
+        req = Request.blank('/stats/flow/1?format=xml')
+        eq_(req.get_response(self.wsgi).status, '400 Bad Request')
+
+
+class Test_ofctl_rest_bulk(unittest.TestCase):
+
+    def setUp(self):
+        dpset = DPSet()
+        self.dps = {}
+        for dpid, version in ((1, ofproto_v1_3.OFP_VERSION),
+                              (2, ofproto_v1_4.OFP_VERSION)):
+            dp = self._datapath(dpid, version)
+            dpset._register(dp)
+            self.dps[dpid] = dp
+        self.wsgi = WSGIApplication()
+        ofctl_rest.RestStatsApi(dpset=dpset, wsgi=self.wsgi)
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def _datapath(self, dpid, version, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.set_version(version)
+        dp.id = dpid
+        dp.ports = {}
+        dp.send = mock.Mock(return_value=True)
+        dp.sent = []
+        send_msg = dp.send_msg
+
+        def _send_msg(msg, close_socket=False):
+            dp.sent.append(msg)
+            ret = send_msg(msg, close_socket)
+            self._switch(dp, msg)
+            return ret
+
+        dp.send_msg = _send_msg
+        return dp
+
+    def _switch(self, dp, msg):
+        # The switch replies right away, and fails the flow entries of
+        # priority 666 and the group 666.
+        ofp = dp.ofproto
+        parser = dp.ofproto_parser
+        inner = getattr(msg, 'message', msg)
+        reply = None
+        if getattr(inner, 'priority', None) == 666 or \
+                getattr(inner, 'group_id', None) == 666:
+            reply = parser.OFPErrorMsg(dp, ofp.OFPET_BAD_REQUEST,
+                                       ofp.OFPBRC_EPERM)
+            dp.failed_bundle = getattr(msg, 'bundle_id', None)
+        elif isinstance(msg, parser.OFPBarrierRequest):
+            reply = parser.OFPBarrierReply(dp)
+        elif isinstance(msg, getattr(parser, 'OFPBundleCtrlMsg', ())):
+            if getattr(dp, 'failed_bundle', None) == msg.bundle_id:
+                reply = parser.OFPErrorMsg(dp, ofp.OFPET_BUNDLE_FAILED,
+                                           ofp.OFPBFC_MSG_FAILED)
+            else:
+                reply = parser.OFPBundleCtrlMsg(
+                    dp, msg.bundle_id, msg.type + 1, 0, [])
+        if reply is not None:
+            reply.xid = msg.xid
+            dp.reply_handlers[msg.xid](reply)
+
+    def _post(self, body, content_type='application/json'):
+        req = Request.blank('/stats/bulk')
+        req.method = 'POST'
+        req.content_type = content_type
+        req.body = body.encode('utf-8')
+        res = req.get_response(self.wsgi)
+        eq_(res.status, '200 OK')
+        return json.loads(res.text)
+
+    def test_bulk(self):
+        entries = [
+            {'dpid': 1, 'flow': {'priority': 1}},
+            {'dpid': 1, 'cmd': 'modify', 'flow': {'priority': 666}},
+            {'dpid': 1, 'flow': {'priority': 2}},
+            {'dpid': 2, 'flow': {'priority': 1}},
+            {'dpid': 2, 'group': {'group_id': 666}},
+            {'dpid': 3, 'flow': {}},
+            {'dpid': 1, 'cmd': 'bogus', 'meter': {'meter_id': 1}},
+            {'dpid': 1},
+        ]
+        body = self._post(json.dumps(entries))
+        eq_(8, body['entries'])
+        failed = body['failed']
+        eq_([1, 3, 4, 5, 6, 7], [f['index'] for f in failed])
+
+        # Without bundles, the other entries are applied.
+        dp = self.dps[1]
+        flow_mods = [m for m in dp.sent
+                     if isinstance(m, ofproto_v1_3_parser.OFPFlowMod)]
+        eq_([1, 666, 2], [m.priority for m in flow_mods])
+        eq_(ofproto_v1_3.OFPFC_MODIFY, flow_mods[1].command)
+        eq_(flow_mods[1].xid, failed[0]['xid'])
+        eq_(ofproto_v1_3.OFPET_BAD_REQUEST, failed[0]['type'])
+        ok_(isinstance(dp.sent[-1], ofproto_v1_3_parser.OFPBarrierRequest))
+
+        # The bundle has failed as a whole.
+        eq_('Bundle failed', failed[1]['reason'])
+        eq_(ofproto_v1_4.OFPET_BUNDLE_FAILED, failed[1]['type'])
+        eq_(ofproto_v1_4.OFPET_BAD_REQUEST, failed[2]['type'])
+        ok_(isinstance(self.dps[2].sent[1].message,
+                       ofproto_v1_4_parser.OFPFlowMod))
+
+        eq_(3, failed[3]['dpid'])
+        ok_('3' in failed[3]['reason'])
+        ok_('bogus' in failed[4]['reason'])
+        for dp in self.dps.values():
+            eq_({}, dp.reply_handlers)
+
+    def test_ndjson(self):
+        lines = [json.dumps({'dpid': 1, 'flow': {'priority': i}})
+                 for i in range(3)]
+        lines.insert(1, '{"dpid": 1,')
+        body = self._post('\n'.join(lines) + '\n', 'application/x-ndjson')
+        eq_({'entries': 4, 'failed': [1]},
+            {'entries': body['entries'],
+             'failed': [f['index'] for f in body['failed']]})
+
+    def test_out_of_range(self):
+        entries = [{'dpid': dpid, 'flow': {'priority': priority}}
+                   for dpid in (1, 2) for priority in (1, 70000, 2)]
+        body = self._post(json.dumps(entries))
+        eq_(6, body['entries'])
+        eq_([(1, 1), (4, 2)],
+            [(f['index'], f['dpid']) for f in body['failed']])
+        for dp in self.dps.values():
+            eq_({}, dp.reply_handlers)
+
+    @mock.patch('ryu.app.ofctl_rest.BULK_TIMEOUT', 0.01)
+    def test_timeout(self):
+        dp = self.dps[1]
+        dp.send_msg = functools.partial(controller.Datapath.send_msg, dp)
+        body = self._post(json.dumps([{'dpid': 1, 'flow': {}}]))
+        eq_('No reply from the switch', body['failed'][0]['reason'])
+
+    def test_invalid(self):
+        req = Request.blank('/stats/bulk')
+        req.method = 'POST'
+        req.body = b'{"dpid": 1}'
+        eq_(req.get_response(self.wsgi).status, '400 Bad Request')
+
+
 def _add_tests():
     _ofp_vers = {
         'of10': ofproto_v1_0.OFP_VERSION,
@@ -0,0 +1,285 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import collections
+import unittest
+
+from nose.tools import eq_, ok_, raises
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+
+
+def _patch_ryu_app(cls):
+    # The test apps below keep the RyuApp of before cmd/test_manager.py
+    # reloads app_manager, so they are built and registered with that
+    # RyuApp in place.
+    base = [c for c in cls.__mro__ if c.__name__ == 'RyuApp'][0]
+    return mock.patch.object(app_manager, 'RyuApp', base)
+
+
+def _new_app(cls):
+    with _patch_ryu_app(cls):
+        return cls()
+
+
+class _EventTest(event.EventBase):
+    pass
+
+
+class _EventOther(event.EventBase):
+    pass
+
+
+class _TestApp(app_manager.RyuApp):
+    @set_ev_cls(_EventTest, MAIN_DISPATCHER)
+    def main_handler(self, ev):
+        pass
+
+    @set_ev_cls(_EventTest)
+    def any_handler(self, ev):
+        pass
+
+
+class Test_RyuApp(unittest.TestCase):
+    """
+    Test cases for the dispatch tables of app_manager.RyuApp
+    """
+
+    def setUp(self):
+        self.app = _new_app(_TestApp)
+        self.app.register_handler(_EventTest, self.app.main_handler)
+        self.app.register_handler(_EventTest, self.app.any_handler)
+        self.ev = _EventTest()
+
+    def test_get_handlers(self):
+        eq_((self.app.main_handler, self.app.any_handler),
+            self.app.get_handlers(self.ev, MAIN_DISPATCHER))
+        eq_((self.app.any_handler,),
+            self.app.get_handlers(self.ev, CONFIG_DISPATCHER))
+        eq_([self.app.main_handler, self.app.any_handler],
+            self.app.get_handlers(self.ev))
+
+    def test_get_handlers_after_unregister(self):
+        eq_(2, len(self.app.get_handlers(self.ev, MAIN_DISPATCHER)))
+        self.app.unregister_handler(_EventTest, self.app.main_handler)
+        eq_((self.app.any_handler,),
+            self.app.get_handlers(self.ev, MAIN_DISPATCHER))
+
+        def handler(ev):
+            pass
+
+        self.app.register_handler(_EventTest, handler)
+        eq_((self.app.any_handler, handler),
+            self.app.get_handlers(self.ev, MAIN_DISPATCHER))
+
+    def test_get_observers(self):
+        eq_((), self.app.get_observers(self.ev, MAIN_DISPATCHER))
+        self.app.register_observer(_EventTest, 'main', [MAIN_DISPATCHER])
+        self.app.register_observer(_EventTest, 'any')
+        eq_(set(['main', 'any']),
+            set(self.app.get_observers(self.ev, MAIN_DISPATCHER)))
+        eq_(('any',), self.app.get_observers(self.ev, CONFIG_DISPATCHER))
+
+        self.app.unregister_observer(_EventTest, 'any')
+        eq_(('main',), self.app.get_observers(self.ev, MAIN_DISPATCHER))
+        self.app.unregister_observer_all_event('main')
+        eq_((), self.app.get_observers(self.ev, MAIN_DISPATCHER))
+
+
+class _BatchApp(app_manager.RyuApp):
+    EVENT_BATCH_SIZE = 3
+
+    def __init__(self, *args, **kwargs):
+        super(_BatchApp, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @set_ev_cls(_EventTest, batch=True)
+    def batch_handler(self, evs):
+        self.received.append(('batch', list(evs)))
+
+    @set_ev_cls(_EventTest)
+    def single_handler(self, ev):
+        self.received.append(('single', ev))
+
+    @set_ev_cls(_EventOther)
+    def other_handler(self, ev):
+        self.received.append(('other', ev))
+
+
+class Test_RyuApp_batch(unittest.TestCase):
+    """
+    Test cases for the batch event delivery of app_manager.RyuApp
+    """
+
+    def setUp(self):
+        with _patch_ryu_app(_BatchApp):
+            self.app = _BatchApp()
+            app_manager.register_app(self.app)
+
+    def tearDown(self):
+        app_manager.unregister_app(self.app)
+
+    def _run_event_loop(self):
+        # Process the queued events and return.
+        self.app.is_active = False
+        self.app._event_loop()
+
+    def test_send_events(self):
+        evs = [_EventTest() for _ in range(4)]
+        other = _EventOther()
+        self.app.send_events(self.app.name, evs[:2])
+        self.app.send_event(self.app.name, evs[2])
+        self.app.send_event(self.app.name, other)
+        self.app.send_event(self.app.name, evs[3])
+        # A batch costs a single slot of the event queue.
+        eq_(4, self.app.events.qsize())
+
+        self._run_event_loop()
+
+        eq_([('single', evs[0]), ('single', evs[1]), ('single', evs[2]),
+             ('batch', evs[:3]),
+             ('other', other),
+             ('single', evs[3]), ('batch', evs[3:])],
+            self.app.received)
+
+    def test_batch_size(self):
+        evs = [_EventTest() for _ in range(5)]
+        self.app.send_events(self.app.name, evs)
+
+        self._run_event_loop()
+
+        eq_([('batch', evs[:3]), ('batch', evs[3:])],
+            [r for r in self.app.received if r[0] == 'batch'])
+
+
+class _EventKeyed(event.EventBase):
+    def __init__(self, key):
+        super(_EventKeyed, self).__init__()
+        self.key = key
+
+
+class _QueueApp(app_manager.RyuApp):
+    EVENT_QUEUE_SIZE = 2
+
+    def event_coalesce_key(self, ev):
+        return getattr(ev, 'key', None)
+
+
+class Test_RyuApp_event_queue(unittest.TestCase):
+    """
+    Test cases for the event queue overflow policies of app_manager.RyuApp
+    """
+
+    def _app(self, overflow):
+        app = _new_app(_QueueApp)
+        app.event_queue_overflow = overflow
+        return app
+
+    def _queued(self, app):
+        evs = []
+        pending = collections.deque()
+        while not app.events.empty() or pending:
+            evs.append(app._get_event(pending)[0])
+        return evs
+
+    def test_queue_size_from_conf(self):
+        app_manager.CONF.set_override('app_event_queue_size',
+                                      ['_QueueApp:16'])
+        app_manager.CONF.set_override('app_event_queue_overflow',
+                                      ['_QueueApp:drop-newest'])
+        try:
+            app = _new_app(_QueueApp)
+        finally:
+            app_manager.CONF.clear_override('app_event_queue_size')
+            app_manager.CONF.clear_override('app_event_queue_overflow')
+        eq_(16, app.events.maxsize)
+        eq_(app_manager.EVENT_QUEUE_DROP_NEWEST, app.event_queue_overflow)
+        eq_(2, _new_app(_QueueApp).events.maxsize)
+
+    @raises(ValueError)
+    def test_zero_queue_size(self):
+        class _App(app_manager.RyuApp):
+            EVENT_QUEUE_SIZE = 0
+        _App()
+
+    def test_invalid_queue_size_from_conf(self):
+        for size in ('-1', '0', 'xxx'):
+            app_manager.CONF.set_override('app_event_queue_size',
+                                          ['_QueueApp:%s' % size])
+            try:
+                _new_app(_QueueApp)
+            except ValueError:
+                pass
+            else:
+                ok_(False, size)
+            finally:
+                app_manager.CONF.clear_override('app_event_queue_size')
+
+    @raises(ValueError)
+    def test_unknown_overflow_policy(self):
+        class _App(app_manager.RyuApp):
+            EVENT_QUEUE_OVERFLOW = 'unknown'
+        _App()
+
+    def test_drop_newest(self):
+        app = self._app(app_manager.EVENT_QUEUE_DROP_NEWEST)
+        evs = [_EventTest() for _ in range(3)]
+        for ev in evs:
+            app._send_event(ev, None)
+        eq_(evs[:2], self._queued(app))
+        stats = app.get_event_stats()
+        eq_(2, stats['enqueued'])
+        eq_(1, stats['dropped'])
+        eq_(2, stats['max_depth'])
+
+    def test_drop_oldest(self):
+        app = self._app(app_manager.EVENT_QUEUE_DROP_OLDEST)
+        evs = [_EventTest() for _ in range(2)]
+        app._send_events(evs, None)
+        for ev in evs:
+            app._send_event(ev, None)
+        # The batch of two events is dropped at once.
+        eq_(evs, self._queued(app))
+        eq_(2, app.events_dropped)
+
+    def test_drop_oldest_keeps_request(self):
+        app = self._app(app_manager.EVENT_QUEUE_DROP_OLDEST)
+        req = event.EventRequestBase()
+        ev = _EventTest()
+        app._send_event(req, None)
+        app._send_event(ev, None)
+        app._send_event(_EventTest(), None)
+        eq_([ev, req], self._queued(app))
+        eq_(1, app.events_dropped)
+
+    def test_coalesce(self):
+        app = self._app(app_manager.EVENT_QUEUE_COALESCE)
+        evs = [_EventKeyed(k) for k in (1, 2, 1, 3)]
+        for ev in evs[:3]:
+            app._send_event(ev, None)
+        eq_(1, app.events_coalesced)
+        # The queue is full and nothing to coalesce, the oldest is dropped.
+        app._send_event(evs[3], None)
+        eq_(1, app.events_dropped)
+        eq_([evs[1], evs[3]], self._queued(app))
+        eq_({}, app._events_coalesced)
@@ -0,0 +1,268 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import struct
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.controller import request
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto import ofproto_v1_4
+from ryu.ofproto import ofproto_v1_4_parser
+
+
+class Test_Bundle(unittest.TestCase):
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def _datapath(self, version, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.set_version(version)
+        dp.id = 1
+        dp.sent = []
+        dp.send = mock.Mock(return_value=True)
+        send_msg = dp.send_msg
+
+        def _send_msg(msg, close_socket=False):
+            dp.sent.append(msg)
+            return send_msg(msg, close_socket)
+
+        dp.send_msg = _send_msg
+        return dp
+
+    def _reply(self, dp, msg):
+        # as Datapath._recv_loop does
+        dp.reply_handlers[msg.xid](msg)
+
+    def _flow_mod(self, dp, priority):
+        return dp.ofproto_parser.OFPFlowMod(dp, priority=priority)
+
+    def test_bundle(self):
+        ofp = ofproto_v1_4
+        parser = ofproto_v1_4_parser
+        dp = self._datapath(ofp.OFP_VERSION)
+        mirrored = []
+        hook = lambda dp, msg: mirrored.append(msg)
+
+        with dp.bundle() as b:
+            bundle_ids = [b.add(self._flow_mod(dp, i)) for i in range(3)]
+        ok_(b.use_bundles)
+        ok_(not b.completed)
+
+        eq_([parser.OFPBundleCtrlMsg] + [parser.OFPBundleAddMsg] * 3 +
+            [parser.OFPBundleCtrlMsg],
+            [m.__class__ for m in dp.sent])
+        open_, commit = dp.sent[0], dp.sent[-1]
+        eq_(ofp.OFPBCT_OPEN_REQUEST, open_.type)
+        eq_(ofp.OFPBCT_COMMIT_REQUEST, commit.type)
+        eq_(ofp.OFPBF_ATOMIC | ofp.OFPBF_ORDERED, commit.flags)
+        eq_(set([open_.bundle_id]), set(m.bundle_id for m in dp.sent))
+        eq_([open_.bundle_id] * 3, bundle_ids)
+        eq_([0, 1, 2], [m.message.priority for m in dp.sent[1:-1]])
+        # The inner message has the xid of the bundle add message.
+        eq_([m.xid for m in dp.sent[1:-1]],
+            [m.message.xid for m in dp.sent[1:-1]])
+
+        # The messages are given to the hooks once committed.
+        controller.Datapath.send_msg_hooks.append(hook)
+        try:
+            reply = parser.OFPBundleCtrlMsg(
+                dp, open_.bundle_id, ofp.OFPBCT_OPEN_REPLY, 0, [])
+            reply.xid = open_.xid
+            self._reply(dp, reply)
+            ok_(not b.completed)
+            reply = parser.OFPBundleCtrlMsg(
+                dp, commit.bundle_id, ofp.OFPBCT_COMMIT_REPLY, 0, [])
+            reply.xid = commit.xid
+            self._reply(dp, reply)
+        finally:
+            controller.Datapath.send_msg_hooks.remove(hook)
+        ok_(b.completed)
+        ok_(b.wait(0))
+        ok_(not b.failed)
+        eq_([0, 1, 2], [m.priority for m in mirrored])
+        eq_({}, dp.reply_handlers)
+
+    def test_bundle_error(self):
+        ofp = ofproto_v1_4
+        parser = ofproto_v1_4_parser
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        mods = [self._flow_mod(dp, i) for i in range(3)]
+        with dp.bundle() as b:
+            for mod in mods:
+                b.add(mod)
+        error = parser.OFPErrorMsg(dp, ofp.OFPET_FLOW_MOD_FAILED,
+                                   ofp.OFPFMFC_TABLE_FULL)
+        error.xid = dp.sent[2].xid
+        self._reply(dp, error)
+        ok_(not b.completed)
+
+        error = parser.OFPErrorMsg(dp, ofp.OFPET_BUNDLE_FAILED,
+                                   ofp.OFPBFC_MSG_FAILED)
+        error.xid = dp.sent[-1].xid
+        self._reply(dp, error)
+        ok_(b.completed)
+        ok_(b.failed)
+        eq_([mods[1], dp.sent[-1]], [msg for msg, _error in b.errors])
+        eq_(ofp.OFPFMFC_TABLE_FULL, b.errors[0][1].code)
+        eq_({}, dp.reply_handlers)
+
+    def test_bundle_chunks(self):
+        ofp = ofproto_v1_4
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        with dp.bundle(max_msgs=2) as b:
+            for i in range(5):
+                b.add(self._flow_mod(dp, i))
+        ctrls = [m for m in dp.sent if m.msg_type == ofp.OFPT_BUNDLE_CONTROL]
+        eq_([ofp.OFPBCT_OPEN_REQUEST, ofp.OFPBCT_COMMIT_REQUEST] * 3,
+            [m.type for m in ctrls])
+        eq_(3, len(set(m.bundle_id for m in ctrls)))
+
+        for m in ctrls[1::2]:
+            ok_(not b.completed)
+            reply = dp.ofproto_parser.OFPBundleCtrlMsg(
+                dp, m.bundle_id, ofp.OFPBCT_COMMIT_REPLY, 0, [])
+            reply.xid = m.xid
+            self._reply(dp, reply)
+        ok_(b.completed)
+
+        # By size; a flow-mod in a bundle add message is 72 bytes long,
+        # and a bundle is committed once it has reached max_bytes.
+        dp.sent = []
+        with dp.bundle(max_bytes=100) as b:
+            for i in range(3):
+                b.add(self._flow_mod(dp, i))
+        eq_([ofp.OFPT_BUNDLE_CONTROL, ofp.OFPT_BUNDLE_ADD_MESSAGE,
+             ofp.OFPT_BUNDLE_ADD_MESSAGE, ofp.OFPT_BUNDLE_CONTROL,
+             ofp.OFPT_BUNDLE_CONTROL, ofp.OFPT_BUNDLE_ADD_MESSAGE,
+             ofp.OFPT_BUNDLE_CONTROL],
+            [m.msg_type for m in dp.sent])
+
+    def test_bundle_discard(self):
+        ofp = ofproto_v1_4
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        try:
+            with dp.bundle() as b:
+                b.add(self._flow_mod(dp, 1))
+                raise ValueError()
+        except ValueError:
+            pass
+        eq_(ofp.OFPBCT_DISCARD_REQUEST, dp.sent[-1].type)
+
+    def test_barrier(self):
+        ofp = ofproto_v1_3
+        parser = ofproto_v1_3_parser
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        mods = [self._flow_mod(dp, i) for i in range(3)]
+        with dp.bundle(max_msgs=2) as b:
+            for mod in mods:
+                eq_(None, b.add(mod))
+        ok_(not b.use_bundles)
+        eq_([parser.OFPFlowMod] * 2 + [parser.OFPBarrierRequest] +
+            [parser.OFPFlowMod, parser.OFPBarrierRequest],
+            [m.__class__ for m in dp.sent])
+
+        error = parser.OFPErrorMsg(dp, ofp.OFPET_FLOW_MOD_FAILED,
+                                   ofp.OFPFMFC_TABLE_FULL)
+        error.xid = mods[2].xid
+        self._reply(dp, error)
+        for m in (dp.sent[2], dp.sent[4]):
+            reply = parser.OFPBarrierReply(dp)
+            reply.xid = m.xid
+            self._reply(dp, reply)
+        ok_(b.completed)
+        eq_([mods[2]], [msg for msg, _error in b.errors])
+        eq_({}, dp.reply_handlers)
+
+    def test_add_invalid(self):
+        ofp = ofproto_v1_3
+        parser = ofproto_v1_3_parser
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        with dp.bundle() as b:
+            try:
+                b.add(self._flow_mod(dp, 70000))  # out of range
+            except struct.error:
+                pass
+            else:
+                ok_(False)
+            b.add(self._flow_mod(dp, 1))
+        # Nothing waits for the reply to the invalid one.
+        eq_(sorted(m.xid for m in dp.sent[1:]), sorted(dp.reply_handlers))
+        barrier = dp.sent[-1]
+        reply = parser.OFPBarrierReply(dp)
+        reply.xid = barrier.xid
+        self._reply(dp, reply)
+        ok_(b.completed)
+        ok_(not b.failed)
+        eq_({}, dp.reply_handlers)
+
+    def _disconnect(self, dp):
+        with mock.patch.object(dp, '_recv_loop'), \
+                mock.patch.object(dp, '_send_loop'), \
+                mock.patch.object(dp, '_echo_request_loop'):
+            dp.serve()
+
+    def test_disconnect(self):
+        ofp = ofproto_v1_4
+        parser = ofproto_v1_4_parser
+        dp = self._datapath(ofp.OFP_VERSION)
+        future = dp.request(parser.OFPPortStatsRequest(dp, 0, ofp.OFPP_ANY))
+
+        b = dp.bundle(max_msgs=2)
+        for i in range(3):
+            b.add(self._flow_mod(dp, i))
+        # The first batch has been committed, the second is still open.
+        ok_(not b.completed)
+        waiter = hub.spawn(b.wait)
+        hub.sleep(0)
+
+        self._disconnect(dp)
+        eq_(True, waiter.wait())
+        ok_(b.completed)
+        ok_(b.failed)
+        ok_(b.connection_lost)
+        eq_([], b.errors)
+        eq_({}, dp.reply_handlers)
+        ok_(isinstance(future.exception(0), request.RequestError))
+
+        # Nothing is sent any more.
+        b.commit()
+        ok_(b.wait(0))
+
+    def test_disconnect_barrier(self):
+        ofp = ofproto_v1_3
+        dp = self._datapath(ofp.OFP_VERSION)
+
+        with dp.bundle() as b:
+            b.add(self._flow_mod(dp, 1))
+        ok_(not b.completed)
+        self._disconnect(dp)
+        ok_(b.wait(0))
+        ok_(b.failed)
+        eq_({}, dp.reply_handlers)
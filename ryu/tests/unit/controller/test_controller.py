@@ -26,9 +26,10 @@ import sys
 import warnings
 import logging
 import random
+import struct
 import unittest
 
-from nose.tools import eq_, raises
+from nose.tools import eq_, ok_, raises
 
 from ryu.base import app_manager  # To suppress cyclic import
 from ryu.controller import controller
@@ -72,6 +73,90 @@ class TestUtils(unittest.TestCase):
     def test_split_addr_with_non_bracketed_ipv6_addr(self):
         controller._split_addr('::1:6653')
 
+    def test_split_send_queue_size(self):
+        eq_((1, 1024), controller._split_send_queue_size('0000000000000001:1024'))
+        eq_((0x10, 64), controller._split_send_queue_size('10:64'))
+
+    @raises(ValueError)
+    def test_split_send_queue_size_with_invalid_pair(self):
+        controller._split_send_queue_size('0000000000000001')
+
+    @raises(ValueError)
+    def test_split_send_queue_size_with_invalid_size(self):
+        controller._split_send_queue_size('0000000000000001:xxx')
+
+    @raises(ValueError)
+    def test_split_send_queue_size_with_zero_size(self):
+        controller._split_send_queue_size('0000000000000001:0')
+
+    @raises(ValueError)
+    def test_split_send_queue_size_with_negative_size(self):
+        controller._split_send_queue_size('0000000000000001:-1')
+
+    def test_send_queue_sizes(self):
+        eq_({1: 1024, 2: 256},
+            controller._send_queue_sizes(('0000000000000001:1024', '2:256')))
+
+    @raises(ValueError)
+    def test_send_queue_sizes_with_invalid_pair(self):
+        controller._send_queue_sizes(('1:1024', '2:0'))
+
+
+class Test_RecvBuffer(unittest.TestCase):
+    """
+    Test cases for controller._RecvBuffer
+    """
+
+    class _SocketMock(object):
+        def __init__(self, data, chunk):
+            self.data = bytearray(data)
+            self.chunk = chunk
+
+        def recv_into(self, buf, nbytes=0):
+            size = min(len(buf), self.chunk, len(self.data))
+            buf[:size] = self.data[:size]
+            self.data = self.data[size:]
+            return size
+
+    def _msg(self, length, xid):
+        return (struct.pack('!BBHI', 4, 2, length, xid) +
+                b'\xab' * (length - 8))
+
+    def test_consume(self):
+        data = self._msg(16, 1) + self._msg(8, 2)
+        buf = controller._RecvBuffer(64)
+        eq_(len(data), buf.recv_into(self._SocketMock(data, 64), 8))
+        eq_((4, 2, 16, 1), buf.header())
+        eq_(self._msg(16, 1), buf.consume(16).tobytes())
+        eq_((4, 2, 8, 2), buf.header())
+        eq_(self._msg(8, 2), buf.consume(8).tobytes())
+        eq_(0, len(buf))
+
+    def test_compact(self):
+        data = self._msg(12, 1) + self._msg(12, 2)
+        sock = self._SocketMock(data, 16)
+        buf = controller._RecvBuffer(16)
+        buf.recv_into(sock, 8)
+        eq_(self._msg(12, 1), buf.consume(12).tobytes())
+        # The partial message is moved to the head, no need to grow.
+        buf.recv_into(sock, 8)
+        eq_(16, buf.capacity)
+        eq_(self._msg(12, 2), buf.consume(12).tobytes())
+
+    def test_grow(self):
+        data = self._msg(100, 1) + self._msg(8, 2)
+        sock = self._SocketMock(data, 10)
+        buf = controller._RecvBuffer(16)
+        buf.recv_into(sock, 8)
+        eq_((4, 2, 100, 1), buf.header())
+        while len(buf) < 100:
+            buf.recv_into(sock, 100 - len(buf))
+        ok_(buf.capacity >= 100)
+        eq_(self._msg(100, 1), buf.consume(100).tobytes())
+        while len(buf) < 8:
+            buf.recv_into(sock, 8 - len(buf))
+        eq_(self._msg(8, 2), buf.consume(8).tobytes())
+
 
 class Test_Datapath(unittest.TestCase):
     """
@@ -114,6 +199,115 @@ class Test_Datapath(unittest.TestCase):
     def test_ports_accessibility_v10(self):
         self._test_ports_accessibility(ofproto_v1_0_parser, 0)
 
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def test_send_loop(self, _set_state_mock):
+        class SocketMock(object):
+            def __init__(self):
+                self.writes = []
+
+            def setsockopt(self, *args):
+                pass
+
+            def settimeout(self, timeout):
+                pass
+
+            def gettimeout(self):
+                return None
+
+            def sendmsg(self, buffers):
+                self.writes.append([bytes(b) for b in buffers])
+                return sum(len(b) for b in buffers)
+
+            def sendall(self, data):
+                self.writes.append([bytes(data)])
+
+            def shutdown(self, how):
+                pass
+
+        sock_mock = SocketMock()
+        dp = controller.Datapath(sock_mock, mock.Mock())
+        dp.send_batch_msgs = 4
+        msgs = [bytearray([i]) * 8 for i in range(6)]
+        for buf in msgs[:-1]:
+            dp.send(buf)
+        dp.send(msgs[-1], close_socket=True)
+
+        dp._send_loop()
+
+        # Queued messages are coalesced up to send_batch_msgs per write.
+        eq_([b''.join(msgs[:4]), b''.join(msgs[4:])],
+            [b''.join(w) for w in sock_mock.writes])
+        stats = dp.get_send_stats()
+        eq_(2, stats['batches'])
+        eq_(6, stats['msgs'])
+        eq_(48, stats['bytes'])
+        eq_(3.0, stats['avg_batch_msgs'])
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def test_send_queue_size(self, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        eq_(controller.CONF.ofp_send_queue_size, dp.send_q_size)
+
+        dp.set_send_queue_size(4)
+        for i in range(4):
+            ok_(dp.send(bytearray(8)))
+        eq_(4, dp.send_q_high_water)
+        ok_(not dp._send_q_sem.acquire(blocking=False))
+
+        # Shrinking withdraws the slots as the queued messages are sent.
+        dp.set_send_queue_size(2)
+        eq_(2, dp._send_q_withdraw)
+        dp._dequeue_batch()
+        eq_(0, dp._send_q_withdraw)
+        ok_(dp._send_q_sem.acquire(blocking=False))
+        ok_(dp._send_q_sem.acquire(blocking=False))
+        ok_(not dp._send_q_sem.acquire(blocking=False))
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def test_send_queue_size_per_dpid(self, _set_state_mock):
+        controller.CONF.set_override('ofp_send_queue_size_per_dpid',
+                                     ['0000000000000001:64'])
+        try:
+            dp = controller.Datapath(mock.Mock(), mock.Mock())
+            dp.id = 2
+            eq_(controller.CONF.ofp_send_queue_size, dp.send_q_size)
+            dp.id = 1
+            eq_(64, dp.send_q_size)
+            eq_(64, dp.send_q_base_size)
+        finally:
+            controller.CONF.clear_override('ofp_send_queue_size_per_dpid')
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def test_send_queue_adaptive(self, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.send_q_adaptive = True
+        dp.send_q_max_size = 8
+        dp.set_send_queue_size(2)
+        dp.send_q_base_size = 2
+
+        # The queue doubles once half of its size worth of sends have
+        # been blocked, up to send_q_max_size.
+        dp._grow_send_q()
+        eq_(4, dp.send_q_size)
+        dp._grow_send_q()
+        eq_(4, dp.send_q_size)
+        dp._grow_send_q()
+        eq_(8, dp.send_q_size)
+        for i in range(2):
+            dp._grow_send_q()
+        eq_(8, dp.send_q_size)
+        for i in range(8):
+            ok_(dp.send(bytearray(8)))
+        eq_(8, dp.get_send_stats()['queue_high_water'])
+
+        # An idle queue shrinks back to the base size.
+        while not dp.send_q.empty():
+            dp._dequeue_batch()
+        dp._send_q_adapt_high_water = 0
+        dp._send_q_last_adapt -= controller.SEND_QUEUE_SHRINK_INTERVAL + 1
+        dp._shrink_send_q()
+        eq_(4, dp.send_q_size)
+
     @mock.patch("ryu.base.app_manager", spec=app_manager)
     def test_recv_loop(self, app_manager_mock):
         # Prepare test data
@@ -150,6 +344,11 @@ class Test_Datapath(unittest.TestCase):
                 self.buf = self.buf[size:]
                 return out
 
+            def recv_into(self, buf, nbytes=0):
+                out = self.recv(nbytes or len(buf))
+                buf[:len(out)] = out
+                return len(out)
+
         # Prepare mock
         ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
         app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
@@ -162,9 +361,13 @@ class Test_Datapath(unittest.TestCase):
         dp = controller.Datapath(sock_mock, addr_mock)
         dp.set_state(handler.MAIN_DISPATCHER)
         ofp_brick_mock.reset_mock()
+        # All the test messages have xid 0.
+        replies = []
+        dp.reply_handlers[0] = replies.append
 
         # Test
         dp._recv_loop()
+        eq_(len(test_messages), len(replies))
 
         # Assert calls
         output_json = list()
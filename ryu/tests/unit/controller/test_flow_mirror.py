@@ -0,0 +1,331 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import unittest
+
+from nose.tools import eq_, ok_, raises
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import flow_mirror
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_0_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+ofp = ofproto_v1_3
+parser = ofproto_v1_3_parser
+
+
+def _new_app(cls):
+    # cmd/test_manager.py reloads app_manager, which leaves cls deriving
+    # from the RyuApp of before the reload, while RyuApp.__init__ looks up
+    # RyuApp by name in the reloaded module.  Constructs cls with the
+    # RyuApp it derives from.
+    base = [c for c in cls.__mro__ if c.__name__ == 'RyuApp'][0]
+    with mock.patch.object(app_manager, 'RyuApp', base):
+        return cls()
+
+
+class Test_FlowMirror(unittest.TestCase):
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def _datapath(self, version, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.set_version(version)
+        dp.id = 1
+        return dp
+
+    def setUp(self):
+        self.app = _new_app(flow_mirror.FlowMirror)
+        controller.Datapath.send_msg_hooks.append(self.app._msg_sent)
+        self.dp = self._datapath(ofp.OFP_VERSION)
+
+    def tearDown(self):
+        controller.Datapath.send_msg_hooks.remove(self.app._msg_sent)
+
+    def _flow_mod(self, dp=None, out=1, **kwargs):
+        dp = dp or self.dp
+        actions = [parser.OFPActionOutput(out)]
+        kwargs.setdefault('instructions', [parser.OFPInstructionActions(
+            ofp.OFPIT_APPLY_ACTIONS, actions)])
+        kwargs.setdefault('out_port', ofp.OFPP_ANY)
+        kwargs.setdefault('out_group', ofp.OFPG_ANY)
+        return parser.OFPFlowMod(dp, **kwargs)
+
+    def _flows(self):
+        return sorted((e.table_id, e.priority, e.cookie)
+                      for e in self.app.get_flows(self.dp.id))
+
+    def test_flow_mod(self):
+        match = parser.OFPMatch(in_port=1, eth_type=0x800,
+                                ipv4_dst=('10.0.0.0', '255.0.0.0'))
+        self.dp.send_msg(self._flow_mod(priority=10, match=match,
+                                        cookie=0x101))
+        self.dp.send_msg(self._flow_mod(priority=20, cookie=0x102))
+        self.dp.send_msg(self._flow_mod(table_id=1, cookie=0x201))
+        eq_([(0, 10, 0x101), (0, 20, 0x102), (1, 0x8000, 0x201)],
+            self._flows())
+
+        match = parser.OFPMatch(in_port=1, eth_type=0x800,
+                                ipv4_dst=('10.0.0.0', '255.0.0.0'))
+        entry = self.app.get_flow(self.dp.id, 0, 10, match)
+        eq_(0x101, entry.cookie)
+        eq_([0x201], [e.cookie for e in self.app.get_flows(
+            self.dp.id, cookie=0x201, cookie_mask=0xffffffffffffffff)])
+        eq_([0x201], [e.cookie for e in self.app.get_flows(
+            self.dp.id, table_id=1)])
+
+        # MODIFY_STRICT replaces the instructions but not the cookie.
+        self.dp.send_msg(self._flow_mod(
+            priority=10, match=match, command=ofp.OFPFC_MODIFY_STRICT,
+            out=2))
+        entry = self.app.get_flow(self.dp.id, 0, 10, match)
+        eq_(0x101, entry.cookie)
+        eq_(2, entry.instructions[0].actions[0].port)
+
+        # MODIFY does not add any entry as of OpenFlow 1.2.
+        self.dp.send_msg(self._flow_mod(
+            priority=30, match=parser.OFPMatch(in_port=3),
+            command=ofp.OFPFC_MODIFY_STRICT))
+        eq_(3, len(self._flows()))
+
+        # Non-strict DELETE by cookie over all tables.
+        self.dp.send_msg(self._flow_mod(
+            table_id=ofp.OFPTT_ALL, command=ofp.OFPFC_DELETE,
+            cookie=0x100, cookie_mask=0xf00))
+        eq_([(1, 0x8000, 0x201)], self._flows())
+        ok_(not self.app.get(self.dp.id).cookies.get(0x101))
+
+        self.dp.send_msg(self._flow_mod(
+            table_id=1, command=ofp.OFPFC_DELETE_STRICT))
+        eq_([], self._flows())
+
+    def test_delete_out_port(self):
+        self.dp.send_msg(self._flow_mod(priority=1, out=1))
+        self.dp.send_msg(self._flow_mod(priority=2, out=2))
+        self.dp.send_msg(self._flow_mod(command=ofp.OFPFC_DELETE,
+                                        out_port=2))
+        eq_([(0, 1, 0)], self._flows())
+
+    def test_delete_non_strict_match(self):
+        self.dp.send_msg(self._flow_mod(
+            priority=1, match=parser.OFPMatch(in_port=1, eth_type=0x800)))
+        self.dp.send_msg(self._flow_mod(
+            priority=2, match=parser.OFPMatch(in_port=2, eth_type=0x800)))
+        self.dp.send_msg(self._flow_mod(
+            priority=3, match=parser.OFPMatch(eth_type=0x800)))
+        tables = self.app.get(self.dp.id)
+        tables.in_sync = True
+
+        self.dp.send_msg(self._flow_mod(
+            command=ofp.OFPFC_DELETE, match=parser.OFPMatch(in_port=1)))
+        eq_([(0, 2, 0), (0, 3, 0)], self._flows())
+        ok_(tables.in_sync)
+
+        # A masked field can not be compared without interpreting it.
+        self.dp.send_msg(self._flow_mod(
+            priority=4, match=parser.OFPMatch(eth_dst=('00:00:00:00:00:01',
+                                                       'ff:ff:ff:00:00:00'))))
+        self.dp.send_msg(self._flow_mod(
+            command=ofp.OFPFC_DELETE,
+            match=parser.OFPMatch(eth_dst=('00:00:00:00:00:00',
+                                           'ff:ff:00:00:00:00'))))
+        eq_([(0, 2, 0), (0, 3, 0), (0, 4, 0)], self._flows())
+        ok_(not tables.in_sync)
+
+    def test_flow_removed(self):
+        match = parser.OFPMatch(in_port=1)
+        self.dp.send_msg(self._flow_mod(priority=5, match=match))
+        msg = parser.OFPFlowRemoved(self.dp, priority=5, table_id=0,
+                                    match=parser.OFPMatch(in_port=1))
+        msg.datapath = self.dp
+        self.app._flow_removed_handler(mock.Mock(msg=msg))
+        eq_([], self._flows())
+
+    def test_group_delete(self):
+        self.dp.send_msg(parser.OFPGroupMod(
+            self.dp, group_id=1, buckets=[parser.OFPBucket(
+                actions=[parser.OFPActionOutput(1)])]))
+        self.dp.send_msg(self._flow_mod(
+            priority=1, instructions=[parser.OFPInstructionActions(
+                ofp.OFPIT_APPLY_ACTIONS, [parser.OFPActionGroup(1)])]))
+        self.dp.send_msg(self._flow_mod(priority=2))
+        eq_([1], list(self.app.get(self.dp.id).groups))
+
+        self.dp.send_msg(parser.OFPGroupMod(
+            self.dp, command=ofp.OFPGC_DELETE, group_id=ofp.OFPG_ALL))
+        eq_({}, self.app.get(self.dp.id).groups)
+        eq_([(0, 2, 0)], self._flows())
+
+    def test_pending(self):
+        dp = self._datapath(ofp.OFP_VERSION)
+        dp.id = None
+        dp.send_msg(self._flow_mod(dp=dp))
+        eq_(None, self.app.get(1))
+
+        dp.id = 1
+        self.app._state_change_handler(mock.Mock(
+            datapath=dp, state=flow_mirror.handler.MAIN_DISPATCHER))
+        eq_([(0, 0x8000, 0)], self._flows())
+
+    def test_diff(self):
+        self.dp.send_msg(self._flow_mod(priority=1, cookie=0x1))
+        self.dp.send_msg(self._flow_mod(priority=2, cookie=0x1))
+        self.dp.send_msg(self._flow_mod(priority=3, cookie=0x1))
+        self.dp.send_msg(self._flow_mod(priority=4, cookie=0x2))
+
+        desired = [
+            self._flow_mod(priority=1, cookie=0x1),  # as it is
+            self._flow_mod(priority=2, cookie=0x1, out=2),  # changed
+            self._flow_mod(priority=5, cookie=0x1),  # new
+        ]
+        msgs = self.app.diff(self.dp, flows=desired,
+                             cookie=0x1, cookie_mask=0xff)
+        eq_([(ofp.OFPFC_ADD, 2), (ofp.OFPFC_ADD, 5),
+             (ofp.OFPFC_DELETE_STRICT, 3)],
+            [(m.command, m.priority) for m in msgs])
+
+        # Applying the diff reaches the desired state.
+        for msg in msgs:
+            self.dp.send_msg(msg)
+        eq_([], self.app.diff(self.dp, flows=desired,
+                              cookie=0x1, cookie_mask=0xff))
+        eq_([(0, 1, 0x1), (0, 2, 0x1), (0, 4, 0x2), (0, 5, 0x1)],
+            self._flows())
+
+    def test_diff_groups(self):
+        self.dp.send_msg(parser.OFPGroupMod(self.dp, group_id=1))
+        desired_groups = [parser.OFPGroupMod(self.dp, group_id=2)]
+        desired_flows = [self._flow_mod(
+            instructions=[parser.OFPInstructionActions(
+                ofp.OFPIT_APPLY_ACTIONS, [parser.OFPActionGroup(2)])])]
+        msgs = self.app.diff(self.dp, flows=desired_flows,
+                             groups=desired_groups)
+        eq_([parser.OFPGroupMod, parser.OFPBarrierRequest,
+             parser.OFPFlowMod, parser.OFPBarrierRequest,
+             parser.OFPGroupMod],
+            [m.__class__ for m in msgs])
+        eq_((ofp.OFPGC_ADD, 2), (msgs[0].command, msgs[0].group_id))
+        eq_((ofp.OFPGC_DELETE, 1), (msgs[4].command, msgs[4].group_id))
+
+    def _stats(self, priority, cookie, out=1):
+        return parser.OFPFlowStats(
+            table_id=0, priority=priority, idle_timeout=0, hard_timeout=0,
+            flags=0, cookie=cookie, match=parser.OFPMatch(),
+            instructions=[parser.OFPInstructionActions(
+                ofp.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(out)])])
+
+    def test_sync(self):
+        self.dp.send_msg(self._flow_mod(priority=1, cookie=0x1))
+        self.dp.send_msg(self._flow_mod(priority=2, cookie=0x2))
+
+        def _request(datapath, req):
+            if isinstance(req, parser.OFPFlowStatsRequest):
+                eq_((0x1, 0xff), (req.cookie, req.cookie_mask))
+                # sent while waiting for the reply
+                datapath.send_msg(self._flow_mod(priority=4, cookie=0x1))
+                return [self._stats(3, 0x1)]
+            return []
+
+        with mock.patch.object(self.app, '_request', side_effect=_request):
+            tables = self.app.sync(self.dp, cookie=0x1, cookie_mask=0xff)
+        eq_([(0, 2, 0x2), (0, 3, 0x1), (0, 4, 0x1)], self._flows())
+        ok_(not tables.in_sync)
+
+        with mock.patch.object(self.app, '_request',
+                               side_effect=lambda dp, req: []):
+            tables = self.app.sync(self.dp)
+        eq_([], self._flows())
+        ok_(tables.in_sync)
+
+    def test_reconcile(self):
+        self.dp.send_msg(self._flow_mod(priority=1))
+        self.app._state_change_handler(mock.Mock(
+            datapath=self.dp, state=flow_mirror.handler.DEAD_DISPATCHER))
+        ok_(not self.app.get(self.dp.id).in_sync)
+
+        # After the reconnect, the switch has kept priority 1 only.
+        with mock.patch.object(self.app, '_request',
+                               side_effect=lambda dp, req:
+                               [self._stats(1, 0)]
+                               if isinstance(req, parser.OFPFlowStatsRequest)
+                               else []):
+            msgs = self.app.reconcile(self.dp, flows=[
+                self._flow_mod(priority=1), self._flow_mod(priority=2)])
+        eq_([(ofp.OFPFC_ADD, 2)], [(m.command, m.priority) for m in msgs])
+        ok_(self.app.get(self.dp.id).in_sync)
+        eq_([(0, 1, 0), (0, 2, 0)], self._flows())
+
+    def _switch_match(self, fields):
+        # A match parsed from the fields in the order sent by a switch
+        buf = bytearray()
+        parser.OFPMatch(_ordered_fields=fields).serialize(buf, 0)
+        return parser.OFPMatch.parser(bytes(buf), 0)
+
+    def test_reconcile_field_order(self):
+        match = parser.OFPMatch(in_port=1, eth_type=0x800)
+        stats = self._stats(1, 0)
+        stats.match = self._switch_match([('eth_type', 0x800),
+                                          ('in_port', 1)])
+        with mock.patch.object(self.app, '_request',
+                               side_effect=lambda dp, req:
+                               [stats]
+                               if isinstance(req, parser.OFPFlowStatsRequest)
+                               else []):
+            msgs = self.app.reconcile(self.dp, flows=[
+                self._flow_mod(priority=1, match=match)])
+        eq_([], msgs)
+        ok_(self.app.get_flow(self.dp.id, 0, 1, match) is not None)
+
+        msg = parser.OFPFlowRemoved(self.dp, priority=1, table_id=0,
+                                    match=stats.match)
+        msg.datapath = self.dp
+        self.app._flow_removed_handler(mock.Mock(msg=msg))
+        eq_([], self._flows())
+
+    @raises(flow_mirror.FlowMirrorSyncError)
+    def test_sync_timeout(self):
+        # The switch never replies.
+        with mock.patch.object(flow_mirror, 'REQUEST_TIMEOUT', 0.01):
+            self.app.sync(self.dp)
+
+    def test_flow_mod_v10(self):
+        ofp10 = ofproto_v1_0
+        parser10 = ofproto_v1_0_parser
+        dp = self._datapath(ofp10.OFP_VERSION)
+        dp.id = 2
+
+        def flow_mod(**kwargs):
+            kwargs.setdefault('actions', [parser10.OFPActionOutput(1)])
+            return parser10.OFPFlowMod(dp, **kwargs)
+
+        match = parser10.OFPMatch(in_port=1)
+        dp.send_msg(flow_mod(match=match, priority=1))
+        ok_(self.app.get_flow(2, 0, 1, parser10.OFPMatch(in_port=1)))
+
+        # MODIFY adds the entry if there is none in OpenFlow 1.0.
+        dp.send_msg(flow_mod(match=match, priority=2,
+                             command=ofp10.OFPFC_MODIFY_STRICT))
+        eq_([1, 2], sorted(e.priority for e in self.app.get_flows(2)))
+
+        dp.send_msg(flow_mod(command=ofp10.OFPFC_DELETE))
+        eq_([], self.app.get_flows(2))
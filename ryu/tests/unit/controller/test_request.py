@@ -0,0 +1,196 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import unittest
+
+from nose.tools import eq_, ok_, raises
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.controller import request
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_0_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+ofp = ofproto_v1_3
+parser = ofproto_v1_3_parser
+
+
+class Test_Request(unittest.TestCase):
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def _datapath(self, version, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.set_version(version)
+        dp.id = 1
+        dp.send = mock.Mock(return_value=True)
+        return dp
+
+    def setUp(self):
+        self.dp = self._datapath(ofp.OFP_VERSION)
+
+    def _reply(self, xid, flags=0, body=None):
+        msg = parser.OFPPortStatsReply(self.dp, body=body or [],
+                                       flags=flags)
+        msg.xid = xid
+        # as Datapath._recv_loop does
+        self.dp.reply_handlers[xid](msg)
+        return msg
+
+    def test_multipart(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp))
+        xid = future.msg.xid
+        ok_(xid in self.dp.reply_handlers)
+        ok_(not future.done())
+
+        replies = [self._reply(xid, flags=ofp.OFPMPF_REPLY_MORE)
+                   for _ in range(2)]
+        ok_(not future.done())
+        replies.append(self._reply(xid))
+        ok_(future.done())
+        ok_(not future.cancelled())
+        eq_(replies, future.result())
+        eq_(None, future.exception())
+        eq_({}, self.dp.reply_handlers)
+
+    def test_multipart_v10(self):
+        dp = self._datapath(ofproto_v1_0.OFP_VERSION)
+        parser10 = ofproto_v1_0_parser
+        req = parser10.OFPPortStatsRequest(dp, 0, ofproto_v1_0.OFPP_NONE)
+        future = dp.request(req)
+
+        msg = parser10.OFPPortStatsReply(dp)
+        msg.xid = req.xid
+        msg.flags = ofproto_v1_0.OFPSF_REPLY_MORE
+        future(msg)
+        ok_(not future.done())
+        msg = parser10.OFPPortStatsReply(dp)
+        msg.xid = req.xid
+        msg.flags = 0
+        future(msg)
+        eq_(2, len(future.result(0)))
+
+    def test_single_reply(self):
+        future = self.dp.request(parser.OFPBarrierRequest(self.dp))
+        reply = parser.OFPBarrierReply(self.dp)
+        reply.xid = future.msg.xid
+        self.dp.reply_handlers[reply.xid](reply)
+        eq_([reply], future.result())
+
+    def test_error(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp))
+        error = parser.OFPErrorMsg(self.dp, ofp.OFPET_BAD_REQUEST,
+                                   ofp.OFPBRC_BAD_MULTIPART)
+        error.xid = future.msg.xid
+        self.dp.reply_handlers[error.xid](error)
+        e = future.exception()
+        ok_(isinstance(e, request.RequestFailed))
+        eq_(error, e.error)
+        try:
+            future.result()
+        except request.RequestFailed:
+            pass
+        else:
+            ok_(False)
+        eq_({}, self.dp.reply_handlers)
+
+    @raises(request.RequestTimeout)
+    def test_timeout(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp),
+                                 timeout=0.01)
+        try:
+            future.result()
+        finally:
+            eq_({}, self.dp.reply_handlers)
+
+    @raises(request.RequestTimeout)
+    def test_result_timeout(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp))
+        try:
+            future.result(timeout=0.01)
+        finally:
+            # The request is still in flight.
+            ok_(not future.done())
+
+    def test_cancel(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp),
+                                 timeout=0.01)
+        done = []
+        future.add_done_callback(done.append)
+        ok_(future.cancel())
+        ok_(future.cancelled())
+        ok_(not future.cancel())
+        eq_([future], done)
+        eq_({}, self.dp.reply_handlers)
+        ok_(isinstance(future.exception(), request.RequestCancelled))
+        # The timer has been stopped.
+        hub.sleep(0.02)
+        ok_(future.cancelled())
+
+    def test_in_flight(self):
+        futures = [self.dp.request(parser.OFPPortStatsRequest(self.dp))
+                   for _ in range(3)]
+        eq_(3, len(self.dp.reply_handlers))
+        for future in reversed(futures):
+            reply = self._reply(future.msg.xid)
+            eq_([reply], future.result(0))
+        eq_({}, self.dp.reply_handlers)
+
+    @raises(request.RequestError)
+    def test_send_failure(self):
+        self.dp.send.return_value = False
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp))
+        ok_(future.done())
+        eq_({}, self.dp.reply_handlers)
+        future.result()
+
+    def test_close(self):
+        dp = self.dp
+        future = dp.request(parser.OFPPortStatsRequest(dp))
+        with mock.patch.object(dp, '_recv_loop'), \
+                mock.patch.object(dp, '_send_loop'), \
+                mock.patch.object(dp, '_echo_request_loop'):
+            dp.serve()
+        ok_(future.done())
+        ok_(isinstance(future.exception(), request.RequestError))
+        eq_({}, dp.reply_handlers)
+
+    def test_iter_replies(self):
+        future = self.dp.request(parser.OFPPortStatsRequest(self.dp))
+        xid = future.msg.xid
+        replies = future.iter_replies(timeout=0.01)
+        first = self._reply(xid, flags=ofp.OFPMPF_REPLY_MORE)
+        eq_(first, next(replies))
+        # The yielded replies are not kept.
+        eq_([], future.replies)
+        try:
+            next(replies)
+        except request.RequestTimeout:
+            pass
+        else:
+            ok_(False)
+
+        replies = future.iter_replies()
+        msgs = [self._reply(xid, flags=ofp.OFPMPF_REPLY_MORE),
+                self._reply(xid)]
+        eq_(msgs, list(replies))
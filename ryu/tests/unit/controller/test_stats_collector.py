@@ -0,0 +1,250 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import importlib
+import math
+import sys
+import types
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu import cfg
+from ryu.base import app_manager
+from ryu import controller as ryu_controller
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.controller import stats_collector
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+ofp = ofproto_v1_3
+parser = ofproto_v1_3_parser
+
+
+def _port_stats(port_no, tx_bytes, duration_sec):
+    return parser.OFPPortStats(port_no, 0, 0, 0, tx_bytes, 0, 0, 0, 0,
+                               0, 0, 0, 0, duration_sec, 0)
+
+
+def _new_app(cls):
+    # cmd/test_manager.py reloads app_manager, which leaves cls deriving
+    # from the RyuApp of before the reload, while RyuApp.__init__ looks up
+    # RyuApp by name in the reloaded module.  Constructs cls with the
+    # RyuApp it derives from.
+    base = [c for c in cls.__mro__ if c.__name__ == 'RyuApp'][0]
+    with mock.patch.object(app_manager, 'RyuApp', base):
+        return cls()
+
+
+class Test_StatsTable(unittest.TestCase):
+
+    def _update(self, table, dpid, entries, time_):
+        table.update(dpid, [(port_no,) for port_no, _ in entries], time_,
+                     [[0, 0, 0, tx_bytes, 0, 0, 0, 0]
+                      for _, tx_bytes in entries])
+
+    def test_rates(self):
+        table = stats_collector.StatsTable('port', 3)
+        tx_bytes = table.counters.index('tx_bytes')
+        self._update(table, 1, [(1, 100), (2, 200)], 10.0)
+        self._update(table, 2, [(1, 1000)], 10.0)
+        eq_([(1, 1), (1, 2), (2, 1)], table.keys)
+        ok_(all(math.isnan(r) for r in table.rates()[:, tx_bytes]))
+
+        self._update(table, 1, [(1, 300), (2, 200)], 12.0)
+        self._update(table, 2, [(1, 500)], 12.0)  # reset
+        rates = table.rates()[:, tx_bytes]
+        eq_([100.0, 0.0], list(rates[:2]))
+        ok_(math.isnan(rates[2]))
+        eq_([300, 200, 500], list(table.values()[:, tx_bytes]))
+
+    def test_samples(self):
+        table = stats_collector.StatsTable('port', 3)
+        tx_bytes = table.counters.index('tx_bytes')
+        for i in range(5):
+            self._update(table, 1, [(1, i * 10)], float(i))
+        times, values = table.samples((1, 1))
+        eq_([2.0, 3.0, 4.0], list(times))
+        eq_([20, 30, 40], list(values[:, tx_bytes]))
+        eq_(10.0, table.rates()[0, tx_bytes])
+
+    def test_grow_and_remove(self):
+        table = stats_collector.StatsTable('port', 2)
+        tx_bytes = table.counters.index('tx_bytes')
+        self._update(table, 1, [(i, i) for i in range(100)], 1.0)
+        self._update(table, 2, [(1, 7)], 1.0)
+        eq_(101, len(table))
+        self._update(table, 1, [(i, i * 2) for i in range(0, 100, 2)], 2.0)
+        eq_(51, len(table))
+        eq_(7, table.values()[-1, tx_bytes])
+        eq_((1, 98), table.keys[-2])
+        eq_(98.0, table.rates()[-2, tx_bytes])
+        table.remove(1)
+        eq_([(2, 1)], table.keys)
+        eq_(7, table.values()[0, tx_bytes])
+
+
+class Test_StatsCollector(unittest.TestCase):
+
+    @mock.patch('ryu.controller.controller.Datapath.set_state')
+    def _datapath(self, dpid, _set_state_mock):
+        dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.set_version(ofp.OFP_VERSION)
+        dp.id = dpid
+        dp.send = mock.Mock(return_value=True)
+        dp.requests = []
+        request = dp.request
+
+        def _request(msg, timeout=None):
+            # The switch replies right away.
+            dp.requests.append(msg)
+            future = request(msg, timeout)
+            reply = self.replies.get((dpid, msg.__class__))
+            if reply is not None:
+                reply.xid = msg.xid
+                future(reply)
+            return future
+
+        dp.request = _request
+        return dp
+
+    def setUp(self):
+        self.app = _new_app(stats_collector.StatsCollector)
+        self.app.timeout = 0.01
+        self.replies = {}
+
+    def _connect(self, dp, state=handler.MAIN_DISPATCHER):
+        self.app._state_change_handler(mock.Mock(datapath=dp, state=state))
+
+    def _port_stats_reply(self, dpid, stats):
+        dp = self.app.datapaths[dpid]
+        self.replies[(dpid, parser.OFPPortStatsRequest)] = \
+            parser.OFPPortStatsReply(dp, flags=0, body=stats)
+
+    def test_poll(self):
+        for dpid in (1, 2):
+            self._connect(self._datapath(dpid))
+        events = []
+        self.app.send_event_to_observers = events.append
+        self.app.concurrency = 2
+
+        self._port_stats_reply(1, [_port_stats(1, 100, 10),
+                                   _port_stats(2, 100, 10)])
+        self._port_stats_reply(2, [_port_stats(1, 100, 10)])
+        self.app.poll()
+        # Those with no reply have timed out.
+        eq_(5, len(self.app.datapaths[1].requests))
+        eq_({}, self.app.datapaths[1].reply_handlers)
+
+        self._port_stats_reply(1, [_port_stats(1, 300, 12),
+                                   _port_stats(2, 100, 12)])
+        self._port_stats_reply(2, [_port_stats(1, 1100, 20)])
+        self.app.poll()
+        eq_(2, len(events))
+        snapshot = events[-1].snapshots['port']
+        eq_(snapshot, self.app.get_snapshot('port'))
+        eq_(100.0, snapshot.rate((1, 1), 'tx_bytes'))
+        eq_(0.0, snapshot.rate((1, 2), 'tx_bytes'))
+        eq_(100.0, snapshot.rate((2, 1), 'tx_bytes'))
+        eq_(0, len(events[-1].snapshots['flow'].keys))
+
+        times, _values = self.app.get_samples('port', (2, 1))
+        eq_([10.0, 20.0], list(times))
+
+    def test_disconnect(self):
+        dp = self._datapath(1)
+        self._connect(dp)
+        self.app.send_event_to_observers = mock.Mock()
+        self._port_stats_reply(1, [_port_stats(1, 100, 10)])
+        self.app.poll()
+        eq_(1, len(self.app.tables['port']))
+
+        self._connect(dp, handler.DEAD_DISPATCHER)
+        eq_({}, self.app.datapaths)
+        eq_(0, len(self.app.tables['port']))
+
+    def test_poll_error(self):
+        for dpid in (1, 2):
+            self._connect(self._datapath(dpid))
+        events = []
+        self.app.send_event_to_observers = events.append
+        self.app.tables = dict((kind, self.app.tables[kind])
+                               for kind in ('port',))
+        self._port_stats_reply(1, [_port_stats(1, 100, 10)])
+        self._port_stats_reply(2, [_port_stats(1, 100, 10)])
+        # The datapath 1 has gone mid-request.
+        self.app.datapaths[1].request = mock.Mock(side_effect=IOError)
+        self.app.poll()
+        eq_(1, len(events))
+        eq_([(2, 1)], events[0].snapshots['port'].keys)
+
+        # The reply of the datapath 2 is unexpected.
+        self.app.datapaths[2].request = mock.Mock(
+            return_value=mock.Mock(result=mock.Mock(return_value=[None])))
+        self.app.poll()
+        eq_(2, len(events))
+
+    def test_poll_loop(self):
+        class _Stop(BaseException):
+            pass
+
+        self.app.interval = 0
+        self.app.poll = mock.Mock(side_effect=[ValueError, None, _Stop])
+        try:
+            self.app._poll_loop()
+        except _Stop:
+            pass
+        eq_(3, self.app.poll.call_count)
+
+
+class Test_StatsCollector_load(unittest.TestCase):
+
+    def setUp(self):
+        # ryu-manager parses the command line and the config file before
+        # it imports the applications.
+        cfg.CONF(args=[], project='ryu', default_config_files=[])
+        self.addCleanup(cfg.CONF.clear)
+        self.addCleanup(setattr, ryu_controller, 'stats_collector',
+                        stats_collector)
+        self.modules = mock.patch.dict(sys.modules)
+        self.modules.start()
+        self.addCleanup(self.modules.stop)
+        del sys.modules['ryu.controller.stats_collector']
+
+    def test_load_as_context(self):
+        mod = importlib.import_module('ryu.controller.stats_collector')
+
+        class _App(app_manager.RyuApp):
+            _CONTEXTS = {'stats_collector': mod.StatsCollector}
+
+        app_mod = types.ModuleType('_stats_app')
+        app_mod._App = _App
+        _App.__module__ = app_mod.__name__
+        sys.modules[app_mod.__name__] = app_mod
+
+        manager = app_manager.AppManager()
+        manager.load_apps([app_mod.__name__])
+        contexts = manager.create_contexts()
+        app = contexts['stats_collector']
+        self.addCleanup(app_manager.unregister_app, app)
+        ok_(isinstance(app, mod.StatsCollector))
+        eq_(10.0, app.interval)
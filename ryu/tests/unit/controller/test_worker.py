@@ -0,0 +1,187 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import os
+import socket
+import sys
+import unittest
+
+from nose.tools import eq_, ok_, raises
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.controller import worker
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+this_dir = os.path.dirname(sys.modules[__name__].__file__)
+packet_data_dir = os.path.join(this_dir, '../../packet_data/of13')
+
+
+def _packet_data(name):
+    with open(os.path.join(packet_data_dir, name), 'rb') as f:
+        return f.read()
+
+
+class Test_Channel(unittest.TestCase):
+    def setUp(self):
+        a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sender = worker._Channel(a)
+        self.receiver = worker._Channel(b)
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def test_send_recv(self):
+        pipes = [os.pipe() for _ in range(3)]
+        for i, (_r, w) in enumerate(pipes):
+            self.sender.send({'worker': i}, b'data%d' % i * 1000, w)
+
+        for i, (r, w) in enumerate(pipes):
+            meta, data, fd = self.receiver.recv()
+            eq_({'worker': i}, meta)
+            eq_(b'data%d' % i * 1000, data)
+            # The received fd refers to the same pipe.
+            ok_(fd != w)
+            os.write(fd, b'x')
+            eq_(b'x', os.read(r, 1))
+            for fd_ in (fd, r, w):
+                os.close(fd_)
+
+    @raises(EOFError)
+    def test_recv_eof(self):
+        self.sender.close()
+        self.receiver.recv()
+
+
+class Test_handoff(unittest.TestCase):
+    def setUp(self):
+        self._orig = (worker._index, worker._count, worker._channel)
+        worker._index = 1
+        worker._count = 4
+        worker._channel = mock.MagicMock()
+
+    def tearDown(self):
+        worker._index, worker._count, worker._channel = self._orig
+
+    def _datapath(self):
+        dp = mock.MagicMock()
+        dp.ofproto = ofproto_v1_3
+        dp.ofproto_parser = ofproto_v1_3_parser
+        dp.address = ('127.0.0.1', 10000)
+        dp.socket.family = socket.AF_INET
+        dp.socket.fileno.return_value = 10
+        return dp
+
+    def _features(self, dp, dpid):
+        msg = dp.ofproto_parser.OFPSwitchFeatures(dp, datapath_id=dpid)
+        msg.buf = b'features'
+        return msg
+
+    def test_handoff(self):
+        dp = self._datapath()
+        buf = controller._RecvBuffer(64)
+        buf.extend(b'rest')
+        ok_(worker._handoff(dp, self._features(dp, 6), buf))
+        worker._channel.send.assert_called_once_with(
+            {'worker': 2, 'addr': ('127.0.0.1', 10000),
+             'family': socket.AF_INET, 'version': ofproto_v1_3.OFP_VERSION},
+            b'featuresrest', 10)
+        eq_(None, dp.handoff)
+
+    def test_handoff_stay(self):
+        dp = self._datapath()
+        ok_(not worker._handoff(dp, self._features(dp, 5),
+                                controller._RecvBuffer(64)))
+        ok_(not worker._channel.send.called)
+        eq_(None, dp.handoff)
+
+    def test_handoff_other_msg(self):
+        dp = self._datapath()
+        msg = dp.ofproto_parser.OFPEchoReply(dp)
+        ok_(not worker._handoff(dp, msg, controller._RecvBuffer(64)))
+        ok_(not worker._channel.send.called)
+
+
+class Test_Datapath_handoff(unittest.TestCase):
+    class _SocketMock(mock.MagicMock):
+        buf = b''
+
+        def recv_into(self, buf, nbytes=0):
+            size = min(len(buf), len(self.buf))
+            buf[:size] = self.buf[:size]
+            self.buf = self.buf[size:]
+            return size
+
+    @mock.patch("ryu.base.app_manager", spec=app_manager)
+    def test_recv_loop_handoff(self, app_manager_mock):
+        ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
+        app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
+        features = _packet_data('4-6-ofp_features_reply.packet')
+        echo = _packet_data('4-14-ofp_echo_reply.packet')
+        sock_mock = self._SocketMock()
+        sock_mock.buf = features + echo
+
+        dp = controller.Datapath(sock_mock, mock.MagicMock())
+        dp.set_version(ofproto_v1_3.OFP_VERSION)
+        dp.set_state(handler.CONFIG_DISPATCHER)
+        handed_over = []
+
+        def _handoff(datapath, msg, buf):
+            handed_over.append(msg.buf + buf.tobytes())
+            return True
+
+        dp.handoff = _handoff
+        ofp_brick_mock.reset_mock()
+        dp._recv_loop()
+
+        ok_(dp.handed_off)
+        eq_([features + echo], handed_over)
+        ok_(not ofp_brick_mock.send_event_to_observers.called)
+        # The connection must not be shut down.
+        dp.close()
+        ok_(not sock_mock.shutdown.called)
+
+    @mock.patch("ryu.base.app_manager", spec=app_manager)
+    def test_resume(self, app_manager_mock):
+        ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
+        app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
+        features = _packet_data('4-6-ofp_features_reply.packet')
+        echo = _packet_data('4-14-ofp_echo_reply.packet')
+        sock_mock = self._SocketMock()
+        sock_mock.buf = echo
+
+        dp = controller.Datapath(sock_mock, mock.MagicMock())
+        dp.resume(ofproto_v1_3.OFP_VERSION, features)
+        eq_(ofproto_v1_3.OFP_VERSION, dp.ofproto.OFP_VERSION)
+        eq_(handler.CONFIG_DISPATCHER, dp.state)
+        ofp_brick_mock.reset_mock()
+        dp._recv_loop()
+
+        msgs = [args[0].msg
+                for args, _kwargs in
+                ofp_brick_mock.send_event_to_observers.call_args_list
+                if hasattr(args[0], 'msg')]
+        eq_(2, len(msgs))
+        ok_(isinstance(msgs[0], dp.ofproto_parser.OFPSwitchFeatures))
+        ok_(isinstance(msgs[1], dp.ofproto_parser.OFPEchoReply))
@@ -15,7 +15,10 @@
 # limitations under the License.
 
 import unittest
+
+import netaddr
 from nose.tools import eq_
+from nose.tools import raises
 
 from ryu.lib import addrconv
 
@@ -54,3 +57,29 @@ class Test_addrconv(unittest.TestCase):
     def test_mac(self):
         self._test_conv(addrconv.mac, 'f2:0b:a4:01:0a:23',
                         b'\xf2\x0b\xa4\x01\x0a\x23')
+
+    def test_other_formats(self):
+        # converted by netaddr
+        eq_(b'\xf2\x0b\xa4\x01\x0a\x23',
+            addrconv.mac.text_to_bin('f2-0b-a4-01-0a-23'))
+        eq_(b'\xf2\x0b\xa4\x01\x0a\x23',
+            addrconv.mac.text_to_bin('F2:0B:A4:01:0A:23'))
+        eq_((b'\x0a\x00\x00\x00', b'\xff\xff\xff\x00'),
+            addrconv.ipv4.text_to_bin('10.0.0.0/24'))
+        eq_(b'\x00' * 10 + b'\xff\xff\x0a\x00\x00\x01',
+            addrconv.ipv6.text_to_bin('::ffff:10.0.0.1'))
+
+    @raises(netaddr.AddrFormatError)
+    def test_invalid(self):
+        addrconv.ipv4.text_to_bin('01.2.3.4')
+
+    def test_cache(self):
+        conv = addrconv.mac
+        conv.cache_clear()
+        for _ in range(3):
+            conv.bin_to_text(b'\xf2\x0b\xa4\x01\x0a\x23')
+        info = conv.cache_info()
+        eq_((2, 1, 1), (info['bin_to_text'].hits,
+                        info['bin_to_text'].misses,
+                        info['bin_to_text'].currsize))
+        eq_(0, info['text_to_bin'].misses)
@@ -18,6 +18,7 @@ import unittest
 
 from ryu.lib import ofctl_utils
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
 
 
 LOG = logging.getLogger(__name__)
@@ -140,3 +141,29 @@ class Test_ofctl_utils(unittest.TestCase):
             'ALL',
             self.util.ofp_queue_to_user(ofproto_v1_3.OFPQ_ALL)
         )
+
+    def test_reserved_num_to_user_cached(self):
+        util = ofctl_utils.OFCtlUtil(ofproto_v1_3)
+        self.assertEqual('ANY', util.ofp_port_to_user(ofproto_v1_3.OFPP_ANY))
+        self.assertTrue('OFPP_' in util._reserved_names)
+        self.assertEqual('ANY', util.ofp_port_to_user(ofproto_v1_3.OFPP_ANY))
+        self.assertEqual('1', util.ofp_port_to_user('1'))  # not int
+
+    def test_to_match_ip(self):
+        self.assertEqual(('10.0.0.0', '255.255.255.0'),
+                         ofctl_utils.to_match_ip('10.0.0.0/24'))
+        self.assertEqual('10.0.0.1', ofctl_utils.to_match_ip('10.0.0.1'))
+
+    def test_match_fields(self):
+        match = ofproto_v1_3_parser.OFPMatch(
+            in_port=1, eth_dst=('00:00:00:00:00:01', 'ff:ff:ff:00:00:00'))
+        self.assertEqual(
+            [('in_port', 1, None),
+             ('eth_dst', '00:00:00:00:00:00', 'ff:ff:ff:00:00:00')],
+            ofctl_utils.match_fields(match))
+
+        # composed with the old API
+        match = ofproto_v1_3_parser.OFPMatch()
+        match.append_field(ofproto_v1_3.OXM_OF_IN_PORT, 1)
+        self.assertEqual([('in_port', 1, None)],
+                         ofctl_utils.match_fields(match))
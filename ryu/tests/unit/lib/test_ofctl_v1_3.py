@@ -52,3 +52,23 @@ class Test_ofctl_v1_3(unittest.TestCase):
         act = insts.actions[0]
         ok_(isinstance(act, OFPActionPopMpls))
         eq_(act.ethertype, 0x0800)
+
+    def test_to_flow_mods(self):
+        dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+
+        flows = [{'priority': i,
+                  'match': {'in_port': i, 'ipv4_dst': '10.0.0.%d/24' % i,
+                            'eth_type': 0x0800},
+                  'actions': [{'type': 'OUTPUT', 'port': 'CONTROLLER'}]}
+                 for i in range(1, 4)]
+        mods = ofctl_v1_3.to_flow_mods(dp, flows, ofproto_v1_3.OFPFC_ADD)
+        eq_(3, len(mods))
+        for i, mod in enumerate(mods, 1):
+            ok_(isinstance(mod, ofproto_v1_3_parser.OFPFlowMod))
+            eq_(ofproto_v1_3.OFPFC_ADD, mod.command)
+            eq_(i, mod.priority)
+            eq_({'in_port': i, 'nw_dst': '10.0.0.0/255.255.255.0',
+                 'dl_type': 0x0800},
+                ofctl_v1_3.match_to_str(mod.match))
+            eq_(['OUTPUT:CONTROLLER'],
+                ofctl_v1_3.actions_to_str(mod.instructions))
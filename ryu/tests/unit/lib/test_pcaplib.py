@@ -15,10 +15,15 @@
 
 from __future__ import print_function
 
+import gzip
+import io
 import logging
 import os
+import shutil
 import struct
 import sys
+import tempfile
+import threading
 import unittest
 
 try:
@@ -27,9 +32,11 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 from nose.tools import raises
 
 from ryu.utils import binary_str
+from ryu.lib import hub
 from ryu.lib import pcaplib
 
 LOG = logging.getLogger(__name__)
@@ -182,6 +189,127 @@ class Test_pcaplib_Reader(unittest.TestCase):
     def test_with_little_endian(self):
         self._test(os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap'))
 
+    def _reader(self, buf, **kwargs):
+        # A memory-mapped file
+        f = tempfile.NamedTemporaryFile()
+        self.addCleanup(f.close)
+        f.write(buf)
+        f.flush()
+        return pcaplib.Reader(open(f.name, 'rb'), **kwargs)
+
+    def test_with_file_object(self):
+        file_name = os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap')
+        buf = open(file_name, 'rb').read()
+        eq_(self.expected_outputs, list(pcaplib.Reader(io.BytesIO(buf))))
+        eq_(self.expected_outputs, list(self._reader(buf)))
+
+    def test_with_nsec(self):
+        buf = (
+            b'\x4d\x3c\xb2\xa1'  # magic (Little Endian, nanoseconds)
+            b'\x02\x00\x04\x00'  # version_major, version_minor
+            b'\x00\x00\x00\x00'  # thiszone
+            b'\x00\x00\x00\x00'  # sigfigs
+            b'\xff\xff\x00\x00'  # snaplen
+            b'\x01\x00\x00\x00'  # network
+            b'\x34\x12\x00\x00'  # ts_sec = 0x1234
+            b'\x78\x56\x34\x12'  # ts_nsec = 0x12345678
+            b'\x04\x00\x00\x00'  # incl_len
+            b'\x04\x00\x00\x00'  # orig_len
+            b'test'
+        )
+        reader = pcaplib.Reader(io.BytesIO(buf))
+        ok_(reader.pcap_header.nsec)
+        eq_([(0x1234 + (0x12345678 / 1e9), b'test')], list(reader))
+
+    def test_truncated(self):
+        file_name = os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap')
+        buf = open(file_name, 'rb').read()
+        eq_(self.expected_outputs[:1],
+            list(pcaplib.Reader(io.BytesIO(buf[:-1]))))
+
+    def test_index_and_batch(self):
+        file_name = os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap')
+        reader = self._reader(open(file_name, 'rb').read(), copy=False)
+        eq_(2, len(reader))
+        ts, data = reader[-1]
+        ok_(isinstance(data, memoryview))
+        eq_(self.expected_outputs[1], (ts, bytes(data)))
+
+        timestamps, offsets, lengths = reader.read_batch(1)
+        eq_([self.expected_outputs[0][0]], list(timestamps))
+        eq_(b'test_data_1',
+            bytes(reader.buf[offsets[0]:offsets[0] + lengths[0]]))
+        ts, data = next(reader)
+        eq_(self.expected_outputs[1], (ts, bytes(data)))
+        eq_(0, len(reader.read_batch(10)[0]))
+        del data
+        reader.close()
+
+
+def _pcapng_block(byteorder, block_type, body):
+    e = '>' if byteorder == 'big' else '<'
+    body += b'\x00' * (-len(body) % 4)
+    length = 12 + len(body)
+    return (struct.pack(e + 'II', block_type, length) + body +
+            struct.pack(e + 'I', length))
+
+
+def _pcapng(byteorder, tsresol=None):
+    e = '>' if byteorder == 'big' else '<'
+    shb = _pcapng_block(byteorder, 0x0a0d0d0a,
+                        struct.pack(e + 'IHHq', 0x1a2b3c4d, 1, 0, -1))
+    options = b''
+    if tsresol is not None:
+        options = struct.pack(e + 'HHB3x', 9, 1, tsresol)
+    options += struct.pack(e + 'HH', 0, 0)
+    idb = _pcapng_block(byteorder, 1,
+                        struct.pack(e + 'HHI', 1, 0, 65535) + options)
+    units = 10 ** (tsresol or 6)
+    ts = 0x1234 * units + 0x5678
+    epb = _pcapng_block(byteorder, 6,
+                        struct.pack(e + 'IIIII', 0, ts >> 32,
+                                    ts & 0xffffffff, 11, 11) +
+                        b'test_data_1')
+    # A block to skip
+    nrb = _pcapng_block(byteorder, 4, struct.pack(e + 'HH', 0, 0))
+    spb = _pcapng_block(byteorder, 3, struct.pack(e + 'I', 11) +
+                        b'test_data_2')
+    return shb + idb + nrb + epb + spb
+
+
+class Test_pcaplib_Reader_pcapng(unittest.TestCase):
+    """
+    Test case for pcaplib.Reader class with pcapng files
+    """
+
+    def _test(self, buf, expected_ts):
+        reader = pcaplib.Reader(io.BytesIO(buf))
+        eq_(None, reader.pcap_header)
+        eq_([(expected_ts, b'test_data_1'), (0.0, b'test_data_2')],
+            list(reader))
+        eq_(2, len(reader))
+        eq_((0.0, b'test_data_2'), reader[1])
+
+    def test_with_big_endian(self):
+        self._test(_pcapng('big'), 0x1234 + (0x5678 / 1e6))
+
+    def test_with_little_endian(self):
+        self._test(_pcapng('little'), 0x1234 + (0x5678 / 1e6))
+
+    def test_with_tsresol(self):
+        self._test(_pcapng('little', tsresol=9), 0x1234 + (0x5678 / 1e9))
+
+    def test_with_sections(self):
+        buf = _pcapng('big') + _pcapng('little', tsresol=9)
+        outputs = list(pcaplib.Reader(io.BytesIO(buf)))
+        eq_(4, len(outputs))
+        eq_((0x1234 + (0x5678 / 1e9), b'test_data_1'), outputs[2])
+
+    @raises(struct.error)
+    def test_with_invalid_byte_order(self):
+        buf = _pcapng('big')
+        pcaplib.Reader(io.BytesIO(buf[:8] + b'\xff' * 4 + buf[12:]))
+
 
 class DummyFile(object):
 
@@ -228,3 +356,117 @@ class Test_pcaplib_Writer(unittest.TestCase):
         expected_buf = b'hoge'  # b'hogehoge'[:snaplen]
         eq_(expected_buf, f.buf)
         eq_(snaplen, len(f.buf))
+
+
+class Test_pcaplib_AsyncWriter(unittest.TestCase):
+    """
+    Test case for pcaplib.AsyncWriter class
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'capture.pcap')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    @mock.patch('sys.byteorder', 'little')
+    def _writer(self, **kwargs):
+        w = pcaplib.AsyncWriter(self.path, **kwargs)
+        self.addCleanup(w.close)
+        return w
+
+    def _read(self, path):
+        if path.endswith('.gz'):
+            f = gzip.open(path, 'rb')
+        else:
+            f = open(path, 'rb')
+        return [buf for _, buf in pcaplib.Reader(f)]
+
+    def test_write(self):
+        w = self._writer()
+        w.write_pkt(b'test_data_1', ts=(0x1234 + (0x5678 / 1e6)))
+        w.write_pkt(b'test_data_2', ts=(0x2345 + (0x6789 / 1e6)))
+        w.close()
+        expected_buf = open(os.path.join(PCAP_PACKET_DATA_DIR,
+                                         'little_endian.pcap'), 'rb').read()
+        eq_(expected_buf, open(self.path, 'rb').read())
+        eq_([self.path], w.files)
+        eq_(2, w.packets)
+
+    def test_flush_size(self):
+        w = self._writer(flush_size=10, flush_interval=10)
+        w.write_pkt(b'test_data_1', ts=1)
+        w.write_pkt(memoryview(b'test_data_2'), ts=2)
+        hub.sleep(0)  # the hub thread flushes
+        eq_([b'test_data_1', b'test_data_2'], self._read(self.path))
+
+    def test_snaplen(self):
+        w = self._writer(snaplen=4)
+        w.write_pkt(b'hogehoge', ts=0)
+        w.close()
+        reader = pcaplib.Reader(open(self.path, 'rb'))
+        eq_([(0, b'hoge')], list(reader))
+
+    def test_drop(self):
+        w = self._writer(buffer_size=40, flush_interval=10)
+        ok_(w.write_pkt(b'test_data_1', ts=1))
+        ok_(not w.write_pkt(b'test_data_2', ts=2))
+        eq_(1, w.dropped)
+        eq_(1, w.packets)
+        w.flush()
+        ok_(w.write_pkt(b'test_data_3', ts=3))
+        w.close()
+        eq_([b'test_data_1', b'test_data_3'], self._read(self.path))
+
+    def test_rotate_size(self):
+        # The file header and a packet of 11 octets fit in 60 octets.
+        w = self._writer(rotate_size=60, max_files=2, compress=True)
+        for i in range(3):
+            w.write_pkt(b'test_data_%d' % i, ts=i)
+        w.close()
+        files = [os.path.join(self.dir, 'capture-%d.pcap.gz' % i)
+                 for i in (2, 3)]
+        eq_(files, w.files)
+        eq_(files, sorted(os.path.join(self.dir, f)
+                          for f in os.listdir(self.dir)))
+        eq_([b'test_data_1'], self._read(files[0]))
+        eq_([b'test_data_2'], self._read(files[1]))
+
+    def test_rotate_interval(self):
+        w = self._writer(rotate_interval=0)
+        w.write_pkt(b'test_data_1', ts=1)
+        w.flush()
+        w.write_pkt(b'test_data_2', ts=2)
+        w.close()
+        eq_(3, len(w.files))
+        eq_([], self._read(w.files[0]))
+        eq_([b'test_data_1'], self._read(w.files[1]))
+        eq_([b'test_data_2'], self._read(w.files[2]))
+
+    def test_write_in_native_thread(self):
+        w = self._writer()
+        threads = []
+        orig_write = w._write
+
+        def _write(records, size):
+            threads.append(threading.current_thread())
+            orig_write(records, size)
+
+        w._write = _write
+        w.write_pkt(b'test_data_1', ts=1)
+        w.flush()
+        ok_(threads)
+        ok_(threading.current_thread() not in threads)
+        eq_([b'test_data_1'], self._read(self.path))
+
+    def test_rotate_error(self):
+        w = self._writer(rotate_size=60, flush_interval=10)
+        w.write_pkt(b'test_data_1', ts=1)
+        w.write_pkt(b'test_data_2', ts=2)
+        with mock.patch.object(w, '_rotate', side_effect=IOError('error')):
+            w.flush()
+        w.close()
+        # Only the packet which would go to the next file is lost.
+        eq_(1, w.dropped)
+        eq_([b'test_data_1'], self._read(w.files[0]))
@@ -73,3 +73,48 @@ class Test_stringify(unittest.TestCase):
         eq_(c.__class__, c2.__class__)
         eq_(c.__dict__, c2.__dict__)
         eq_(j, c.to_jsondict(encode_string=my_encode))
+
+    def test_attrs(self):
+        class C2(stringify.StringifyMixin):
+            _base_attributes = ['base']
+            _opt_attributes = ['opt', 'missing']
+
+            def __init__(self, type_, z, a):
+                self.type_ = type_
+                self.z = z
+                self.a = a
+                self.base = 'BASE'
+                self.func = len
+
+            @property
+            def opt(self):
+                return 3
+
+            @property
+            def missing(self):
+                raise AttributeError('missing')
+
+        c = C2(type_=1, z=2, a=None)
+        eq_([('a', None), ('opt', 3), ('type_', 1), ('z', 2)],
+            list(stringify.obj_python_attrs(c)))
+        eq_({'C2': {'a': None, 'opt': 3, 'type': 1, 'z': 2}},
+            c.to_jsondict())
+
+    def test_types(self):
+        class C3(stringify.StringifyMixin):
+            _TYPE = {
+                'ascii': ['a'],
+            }
+
+            def __init__(self, a, b):
+                self.a = a
+                self.b = b
+
+        j = {'C3': {'a': 'AAA', 'b': 'QkJC'}}
+        c = C3(a='AAA', b=b'BBB')
+        eq_(j, c.to_jsondict())
+        eq_(c.__dict__, C3.from_jsondict(j['C3']).__dict__)
+
+        C3._TYPE['ascii'].append('b')
+        C3._clear_types()
+        eq_({'C3': {'a': 'AAA', 'b': 'BBB'}}, c.to_jsondict())
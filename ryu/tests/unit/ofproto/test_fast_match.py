@@ -0,0 +1,114 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import struct
+import unittest
+
+from nose.tools import eq_, ok_, raises
+
+from ryu import exception
+from ryu.ofproto import fast_match
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto import ofproto_v1_4_parser
+from ryu.ofproto import ofproto_v1_5_parser
+
+
+def _match_buf(parser, **kwargs):
+    buf = bytearray()
+    parser.OFPMatch(**kwargs).serialize(buf, 0)
+    return bytes(buf)
+
+
+class Test_PacketInMatch(unittest.TestCase):
+    """ Test case for the fast path decoder of packet-in matches
+    """
+
+    parsers = [ofproto_v1_3_parser, ofproto_v1_4_parser, ofproto_v1_5_parser]
+
+    def _test_fast(self, **kwargs):
+        for parser in self.parsers:
+            buf = _match_buf(parser, **kwargs)
+            match = parser._PacketInMatch.parser(buf, 0)
+            ok_(isinstance(match, fast_match._PacketInMatch))
+            ok_(isinstance(match, parser.OFPMatch))
+            expected = parser.OFPMatch.parser(buf, 0)
+            eq_(expected.length, match.length)
+            for k, v in kwargs.items():
+                eq_(v, match[k])
+                eq_(v, match.get(k))
+                ok_(k in match)
+            ok_('eth_type' not in match)
+            eq_(None, match.get('eth_type'))
+            eq_('', match.get('eth_type', ''))
+            # nothing else has been parsed
+            eq_({}, match.__dict__)
+
+            eq_(expected.to_jsondict(), match.to_jsondict())
+            eq_(str(expected), str(match))
+            eq_(expected.items(), match.items())
+
+    def test_in_port(self):
+        self._test_fast(in_port=1)
+
+    def test_in_port_metadata_tunnel_id(self):
+        self._test_fast(in_port=0xfffffff0, metadata=0x0123456789abcdef,
+                        tunnel_id=100)
+
+    def test_metadata(self):
+        self._test_fast(metadata=1)
+
+    def test_empty(self):
+        self._test_fast()
+
+    def test_fallback(self):
+        for parser in self.parsers:
+            for kwargs in ({'in_port': 1, 'eth_type': 0x800},
+                           {'metadata': (1, 0xff)}):
+                buf = _match_buf(parser, **kwargs)
+                match = parser._PacketInMatch.parser(buf, 0)
+                ok_(not isinstance(match, fast_match._PacketInMatch))
+                eq_(parser.OFPMatch.parser(buf, 0).to_jsondict(),
+                    match.to_jsondict())
+
+    @raises(exception.OFPTruncatedMessage)
+    def test_truncated(self):
+        buf = _match_buf(ofproto_v1_3_parser, in_port=1, tunnel_id=1)
+        ofproto_v1_3_parser._PacketInMatch.parser(buf[:-4], 0)
+
+    def test_copy(self):
+        buf = _match_buf(ofproto_v1_3_parser, in_port=1)
+        match = ofproto_v1_3_parser._PacketInMatch.parser(buf, 0)
+        match2 = copy.deepcopy(match)
+        eq_(1, match2['in_port'])
+        eq_(match.to_jsondict(), match2.to_jsondict())
+
+    def test_packet_in(self):
+        dp = None
+        ofp = ofproto_v1_3_parser.ofproto
+        match = _match_buf(ofproto_v1_3_parser, in_port=3)
+        data = b'\x01' * 60
+        buf = bytearray(ofp.OFP_PACKET_IN_SIZE - ofp.OFP_MATCH_SIZE)
+        buf += match + b'\x00' * 2 + data
+        struct.pack_into(ofp.OFP_HEADER_PACK_STR, buf, 0, ofp.OFP_VERSION,
+                         ofp.OFPT_PACKET_IN, len(buf), 0)
+        struct.pack_into(ofp.OFP_PACKET_IN_PACK_STR, buf, ofp.OFP_HEADER_SIZE,
+                         ofp.OFP_NO_BUFFER, len(data), ofp.OFPR_NO_MATCH,
+                         0, 0)
+        msg = ofproto_v1_3_parser.OFPPacketIn.parser(
+            dp, ofp.OFP_VERSION, ofp.OFPT_PACKET_IN, len(buf), 0,
+            bytes(buf))
+        eq_(3, msg.match['in_port'])
+        eq_(data, msg.data)
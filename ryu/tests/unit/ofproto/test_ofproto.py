@@ -25,7 +25,7 @@ except ImportError:
 
 import unittest
 import logging
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 
 LOG = logging.getLogger('test_ofproto')
@@ -79,3 +79,30 @@ class TestOfprotCommon(unittest.TestCase):
                               ryu.ofproto.ofproto_v1_4_parser,
                               ryu.ofproto.ofproto_v1_5_parser,
                               ]))
+
+    def test_versions_lazy(self):
+        from ryu.ofproto import ofproto_protocol
+        versions = ofproto_protocol._Versions(
+            ofproto_protocol._VERSION_MODULES)
+        eq_(set(versions.keys()), set(ofproto_protocol._VERSION_MODULES))
+        eq_(versions.loaded(), set())
+
+        import ryu.ofproto.ofproto_v1_3
+        import ryu.ofproto.ofproto_v1_3_parser
+        eq_(versions[ryu.ofproto.ofproto_v1_3.OFP_VERSION],
+            (ryu.ofproto.ofproto_v1_3, ryu.ofproto.ofproto_v1_3_parser))
+        eq_(versions.loaded(), set([ryu.ofproto.ofproto_v1_3.OFP_VERSION]))
+
+    def test_ofp_event_lazy(self):
+        from ryu.controller import ofp_event
+        import ryu.ofproto.ofproto_v1_3_parser as parser
+
+        ev_cls = ofp_event.EventOFPExperimenter
+        eq_(ev_cls.__name__, 'EventOFPExperimenter')
+        eq_(ev_cls, ofp_event.ofp_msg_to_ev_cls(parser.OFPExperimenter))
+        self.assertRaises(AttributeError, getattr, ofp_event, 'EventFoo')
+        # Not an OpenFlow message of any version
+        self.assertRaises(AttributeError, getattr, ofp_event,
+                          'EventOFPPacketInnn')
+        ok_(not hasattr(ofp_event, 'EventOFPWhatever'))
+        ok_(hasattr(ofp_event, 'EventOFPPacketIn'))
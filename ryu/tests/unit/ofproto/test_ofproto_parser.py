@@ -25,6 +25,7 @@ from ryu import exception
 
 from ryu.ofproto import ofproto_common, ofproto_parser
 from ryu.ofproto import ofproto_v1_0, ofproto_v1_0_parser
+from ryu.ofproto import ofproto_v1_3_parser
 
 import logging
 LOG = logging.getLogger(__name__)
@@ -108,6 +109,27 @@ class TestOfproto_Parser(unittest.TestCase):
         LOG.debug(msg)
         ok_(isinstance(msg, ofproto_v1_0_parser.OFPPacketIn))
 
+    def testPacketInBuffers(self):
+        for buf in (bytearray(self.bufPacketIn),
+                    memoryview(bytearray(self.bufPacketIn))):
+            (version,
+             msg_type,
+             msg_len,
+             xid) = ofproto_parser.header(buf)
+            eq_(ofproto_parser.header(self.bufPacketIn),
+                (version, msg_type, msg_len, xid))
+
+            msg = ofproto_parser.msg(self,
+                                     version,
+                                     msg_type,
+                                     msg_len,
+                                     xid,
+                                     buf)
+            ok_(isinstance(msg, ofproto_v1_0_parser.OFPPacketIn))
+            ok_(isinstance(msg.buf, six.binary_type))
+            eq_(self.bufPacketIn, msg.buf)
+            eq_(self.bufPacketIn[-msg.total_len:], msg.data)
+
     @raises(AssertionError)
     def test_check_msg_len(self):
         (version,
@@ -242,3 +264,28 @@ class TestMsgStrAttr(unittest.TestCase):
         str_ = str_.rsplit()
         eq_('check', str_[0])
         eq_('msg_str_attr_test', str_[1])
+
+
+class TestMatchKey(unittest.TestCase):
+    """ Test case for ofproto_parser.match_key
+    """
+
+    def test_field_order(self):
+        parser = ofproto_v1_3_parser
+        buf = bytearray()
+        parser.OFPMatch(_ordered_fields=[('eth_type', 0x800),
+                                         ('in_port', 1)]).serialize(buf, 0)
+        # in the wire order of a switch
+        match = parser.OFPMatch.parser(six.binary_type(buf), 0)
+        eq_(ofproto_parser.match_key(parser.OFPMatch(in_port=1,
+                                                     eth_type=0x800)),
+            ofproto_parser.match_key(match))
+        ok_(ofproto_parser.match_key(parser.OFPMatch(in_port=2,
+                                                     eth_type=0x800)) !=
+            ofproto_parser.match_key(match))
+
+    def test_v10(self):
+        match = ofproto_v1_0_parser.OFPMatch(in_port=1)
+        buf = bytearray()
+        match.serialize(buf, 0)
+        eq_(six.binary_type(buf), ofproto_parser.match_key(match))
@@ -26,12 +26,19 @@ class Test_OXM(unittest.TestCase):
         buf = bytearray()
         ofp.oxm_serialize(n, v, m, buf, 0)
         self.assertEqual(on_wire, buf)
+        buf = bytearray()
+        l = ofp.oxm_serialize_user(f, uv, buf, 0)
+        self.assertEqual(len(on_wire), l)
+        self.assertEqual(on_wire, buf)
 
     def _test_decode(self, user, on_wire):
         (n, v, m, l) = ofp.oxm_parse(on_wire, 0)
         self.assertEqual(len(on_wire), l)
         (f, uv) = ofp.oxm_to_user(n, v, m)
         self.assertEqual(user, (f, uv))
+        (f, uv, l) = ofp.oxm_parse_user(on_wire, 0)
+        self.assertEqual(len(on_wire), l)
+        self.assertEqual(user, (f, uv))
 
     def _test_encode_header(self, user, on_wire):
         f = user
@@ -186,3 +193,33 @@ class Test_OXM(unittest.TestCase):
             b'fugafuga'
         )
         self._test(user, on_wire, 4)
+
+    def test_basic_cidr(self):
+        buf = bytearray()
+        l = ofp.oxm_serialize_user('ipv4_src', '192.0.2.1/16', buf, 0)
+        on_wire = (
+            b'\x80\x00\x17\x08'
+            b'\xc0\x00\x02\x01'
+            b'\xff\xff\x00\x00'
+        )
+        self.assertEqual(len(on_wire), l)
+        self.assertEqual(on_wire, buf)
+
+    def test_basic_int_out_of_range(self):
+        # Not packable as '!I'; takes the generic path, which truncates.
+        user = ('in_port', 0x123456789)
+        buf = bytearray()
+        l = ofp.oxm_serialize_user(user[0], user[1], buf, 0)
+        (n, v, m) = ofp.oxm_from_user(*user)
+        expected = bytearray()
+        ofp.oxm_serialize(n, v, m, expected, 0)
+        self.assertEqual(len(expected), l)
+        self.assertEqual(expected, buf)
+
+    def test_serialize_user_offset(self):
+        buf = bytearray(b'\xaa' * 2)
+        l = ofp.oxm_serialize_user('in_port', 1, buf, 4)
+        self.assertEqual(8, l)
+        self.assertEqual(b'\xaa\xaa\x00\x00'
+                         b'\x80\x00\x00\x04'
+                         b'\x00\x00\x00\x01', buf)
@@ -0,0 +1,106 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu import exception
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+this_dir = os.path.dirname(sys.modules[__name__].__file__)
+packet_data_dir = os.path.join(this_dir, '../../packet_data')
+
+
+def _parse(wire_msg, lazy):
+    (version, msg_type, msg_len, xid) = ofproto_parser.header(wire_msg)
+    dp = ofproto_protocol.ProtocolDesc(version=version)
+    return ofproto_parser.msg(dp, version, msg_type, msg_len, xid, wire_msg,
+                              lazy=lazy)
+
+
+def _read(ver, name):
+    with open(os.path.join(packet_data_dir, ver, name), 'rb') as f:
+        return f.read()
+
+
+class Test_LazyParser(unittest.TestCase):
+    """ Test case for lazy parsing of OpenFlow messages
+    """
+
+    def _test_corpus(self, ver):
+        n_lazy = 0
+        for name in sorted(os.listdir(os.path.join(packet_data_dir, ver))):
+            if not name.endswith('.packet'):
+                continue
+            wire_msg = _read(ver, name)
+            try:
+                msg = _parse(wire_msg, lazy=False)
+            except (KeyError, TypeError, exception.OFPTruncatedMessage):
+                # Messages from controller to switch or broken ones.
+                continue
+            if msg is None:
+                continue
+            lazy_msg = _parse(wire_msg, lazy=True)
+            ok_(isinstance(lazy_msg, msg.__class__), name)
+            eq_(msg.__class__.__name__, lazy_msg.__class__.__name__)
+            if isinstance(lazy_msg, ofproto_parser._LazyMsg):
+                n_lazy += 1
+            eq_(msg.to_jsondict(), lazy_msg.to_jsondict(), name)
+        ok_(n_lazy > 0)
+
+    def test_corpus_of13(self):
+        self._test_corpus('of13')
+
+    def test_corpus_of14(self):
+        self._test_corpus('of14')
+
+    def test_corpus_of15(self):
+        self._test_corpus('of15')
+
+    def test_packet_in(self):
+        wire_msg = _read('of13', '4-4-ofp_packet_in.packet')
+        msg = _parse(wire_msg, lazy=True)
+        ok_(isinstance(msg, ofproto_v1_3_parser.OFPPacketIn))
+        eq_(ofproto_v1_3.OFPT_PACKET_IN, msg.msg_type)
+        eq_(wire_msg, msg.buf)
+        ok_('match' not in msg.__dict__)
+
+        eq_(ofproto_v1_3.OFPR_ACTION, msg.reason)
+        ok_('match' in msg.__dict__)
+        eq_(_parse(wire_msg, lazy=False).match.to_jsondict(),
+            msg.match.to_jsondict())
+
+    def test_multipart_reply(self):
+        wire_msg = _read('of13', '4-12-ofp_flow_stats_reply.packet')
+        msg = _parse(wire_msg, lazy=True)
+        ok_(isinstance(msg, ofproto_v1_3_parser.OFPFlowStatsReply))
+        eq_(ofproto_v1_3.OFPMP_FLOW, msg.type)
+        ok_('body' not in msg.__dict__)
+        eq_(len(_parse(wire_msg, lazy=False).body), len(msg.body))
+
+    def test_set_before_parse(self):
+        wire_msg = _read('of13', '4-4-ofp_packet_in.packet')
+        msg = _parse(wire_msg, lazy=True)
+        msg.data = b'replaced'
+        eq_(wire_msg, msg.buf)
+        ok_(msg.match is not None)
+        eq_(b'replaced', msg.data)
@@ -1551,3 +1551,289 @@ class TestPacket(unittest.TestCase):
         ok_(isinstance(pkt.protocols[0], ethernet.ethernet))
         ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
         ok_(isinstance(pkt.protocols[2], udp.udp))
+
+
+class TestDissect(unittest.TestCase):
+    """ Test case for packet.dissect
+    """
+
+    dst_mac = 'aa:aa:aa:aa:aa:aa'
+    src_mac = 'bb:bb:bb:bb:bb:bb'
+
+    def _serialize(self, *protocols):
+        p = packet.Packet()
+        for proto in protocols:
+            p.add_protocol(proto)
+        p.serialize()
+        return six.binary_type(p.data)
+
+    def test_vlan_ipv4_tcp(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac,
+                              ether.ETH_TYPE_8021Q),
+            vlan.vlan(3, 0, 100, ether.ETH_TYPE_IP),
+            ipv4.ipv4(src='192.168.0.1', dst='192.168.0.2',
+                      proto=inet.IPPROTO_TCP),
+            tcp.tcp(src_port=50001, dst_port=80, bits=tcp.TCP_SYN),
+            b'payload')
+        h = packet.dissect(buf)
+        eq_(self.dst_mac, h.eth_dst)
+        eq_(self.src_mac, h.eth_src)
+        eq_(addrconv.mac.text_to_bin(self.src_mac), h.eth_src_bin)
+        eq_(ether.ETH_TYPE_IP, h.eth_type)
+        eq_(100, h.vlan_vid)
+        eq_(3, h.vlan_pcp)
+        eq_(inet.IPPROTO_TCP, h.ip_proto)
+        eq_('192.168.0.1', h.ip_src)
+        eq_('192.168.0.2', h.ip_dst)
+        eq_(50001, h.src_port)
+        eq_(80, h.dst_port)
+        eq_(tcp.TCP_SYN, h.tcp_flags)
+        eq_(18, h.l3_offset)
+        eq_(38, h.l4_offset)
+        eq_(b'payload', buf[h.payload_offset:])
+        eq_(None, h.icmp_type)
+
+    def test_ipv6_ext_udp(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac,
+                              ether.ETH_TYPE_IPV6),
+            ipv6.ipv6(nxt=inet.IPPROTO_HOPOPTS, src='2001:db8::1',
+                      dst='2001:db8::2',
+                      ext_hdrs=[ipv6.hop_opts(nxt=inet.IPPROTO_UDP)]),
+            udp.udp(src_port=546, dst_port=547),
+            b'payload')
+        h = packet.dissect(buf)
+        eq_(None, h.vlan_vid)
+        eq_(ether.ETH_TYPE_IPV6, h.eth_type)
+        eq_(inet.IPPROTO_UDP, h.ip_proto)
+        eq_('2001:db8::1', h.ip_src)
+        eq_('2001:db8::2', h.ip_dst)
+        eq_(546, h.src_port)
+        eq_(547, h.dst_port)
+        eq_(14 + 40 + 8, h.l4_offset)
+        eq_(b'payload', buf[h.payload_offset:])
+
+    def test_icmp(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP),
+            ipv4.ipv4(proto=inet.IPPROTO_ICMP),
+            icmp.icmp(type_=icmp.ICMP_ECHO_REQUEST, data=icmp.echo()))
+        h = packet.dissect(buf)
+        eq_(icmp.ICMP_ECHO_REQUEST, h.icmp_type)
+        eq_(0, h.icmp_code)
+        eq_(None, h.src_port)
+        eq_(None, h.payload_offset)
+
+    def test_fragment(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP),
+            ipv4.ipv4(offset=100, proto=inet.IPPROTO_UDP),
+            b'\x00' * 16)
+        h = packet.dissect(buf)
+        eq_(inet.IPPROTO_UDP, h.ip_proto)
+        eq_(None, h.l4_offset)
+        eq_(None, h.src_port)
+
+    def test_arp(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_ARP),
+            arp.arp())
+        h = packet.dissect(buf)
+        eq_(ether.ETH_TYPE_ARP, h.eth_type)
+        eq_(14, h.l3_offset)
+        eq_(None, h.ip_src)
+
+    def test_truncated(self):
+        buf = self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP),
+            ipv4.ipv4(proto=inet.IPPROTO_TCP),
+            tcp.tcp(src_port=1, dst_port=2))
+        h = packet.dissect(buf[:40])
+        eq_(inet.IPPROTO_TCP, h.ip_proto)
+        eq_(34, h.l4_offset)
+        eq_(None, h.src_port)
+
+        h = packet.dissect(b'')
+        eq_(None, h.eth_dst)
+        eq_(None, h.l3_offset)
+
+
+class TestChecksum(unittest.TestCase):
+    """ Test case for packet_utils.checksum and checksum_update
+    """
+
+    def _checksum(self, data):
+        # The sum of the 16-bit words one by one (RFC 1071)
+        if len(data) % 2:
+            data += b'\x00'
+        s = 0
+        for i in range(0, len(data), 2):
+            s = packet_utils.carry_around_add(
+                s, struct.unpack_from('!H', data, i)[0])
+        return ~s & 0xffff
+
+    def test_checksum(self):
+        for data in (b'', b'\x00' * 4, b'\xff' * 4, b'\x01', b'\xff\xff\x01',
+                     b'\x45\x00\x00\x1c\x00\x01\x00\x00\x40\x11\x00\x00'
+                     b'\x0a\x00\x00\x01\x0a\x00\x00\x02',
+                     bytes(bytearray(range(255)))):
+            eq_(self._checksum(data), packet_utils.checksum(data))
+            eq_(self._checksum(data),
+                packet_utils.checksum(bytearray(data)))
+
+    def test_checksum_update(self):
+        data = bytearray(range(1, 41))
+        csum = packet_utils.checksum(data)
+        for offset, new in ((8, b'\x3f\x11'), (12, b'\xc0\xa8\x00\x01'),
+                            (0, b'\x00\x00'), (38, b'\xff\xff')):
+            old = bytes(data[offset:offset + len(new)])
+            data[offset:offset + len(new)] = new
+            csum = packet_utils.checksum_update(csum, old, new)
+            eq_(0, packet_utils.checksum(data + struct.pack('!H', csum)))
+
+
+class TestPacketRewriter(unittest.TestCase):
+    """ Test case for packet.PacketRewriter
+    """
+
+    dst_mac = 'aa:aa:aa:aa:aa:aa'
+    src_mac = 'bb:bb:bb:bb:bb:bb'
+
+    def _serialize(self, *protocols):
+        p = packet.Packet()
+        for proto in protocols:
+            p.add_protocol(proto)
+        p.serialize()
+        return p.data
+
+    def _ipv4_udp(self, dst_mac=dst_mac, src_mac=src_mac, vlans=(), ttl=64,
+                  src='192.168.0.1', dst='192.168.0.2', src_port=50001,
+                  dst_port=53, csum=0):
+        protocols = []
+        eth_type = ether.ETH_TYPE_IP
+        for vid in reversed(vlans):
+            protocols.insert(0, vlan.vlan(vid=vid, ethertype=eth_type))
+            eth_type = ether.ETH_TYPE_8021Q
+        protocols.insert(0, ethernet.ethernet(dst_mac, src_mac, eth_type))
+        protocols.append(ipv4.ipv4(ttl=ttl, src=src, dst=dst,
+                                   proto=inet.IPPROTO_UDP))
+        protocols.append(udp.udp(src_port=src_port, dst_port=dst_port,
+                                 csum=csum))
+        # long enough not to be padded
+        protocols.append(b'payload' * 8)
+        return self._serialize(*protocols)
+
+    def test_route(self):
+        r = packet.PacketRewriter(self._ipv4_udp())
+        eq_(63, r.dec_ttl())
+        r.set_eth_src('00:00:00:00:00:01')
+        r.set_eth_dst('00:00:00:00:00:02')
+        eq_(self._ipv4_udp(src_mac='00:00:00:00:00:01',
+                           dst_mac='00:00:00:00:00:02', ttl=63), r.data)
+        eq_('00:00:00:00:00:02', r.headers.eth_dst)
+
+        r.set_ttl(0)
+        eq_(0, r.dec_ttl())
+        eq_(0, r.get_ttl())
+
+    def test_nat(self):
+        data = self._ipv4_udp()
+        r = packet.PacketRewriter(data)
+        ok_(r.data is data)
+        r.set_ip_src('10.0.0.1')
+        r.set_ip_dst('10.0.0.2')
+        r.set_src_port(1024)
+        r.set_dst_port(5353)
+        eq_(self._ipv4_udp(src='10.0.0.1', dst='10.0.0.2', src_port=1024,
+                           dst_port=5353), r.data)
+        eq_('10.0.0.2', r.headers.ip_dst)
+        eq_(5353, r.headers.dst_port)
+        pkt = packet.Packet(r.data)
+        eq_(0, packet_utils.checksum(r.data[14:34]))
+        ok_(pkt.get_protocol(udp.udp).csum != 0)
+
+    def test_udp_no_checksum(self):
+        data = self._ipv4_udp()
+        # Clears the UDP checksum.
+        data[40:42] = b'\x00\x00'
+        r = packet.PacketRewriter(six.binary_type(data))
+        r.set_ip_dst('10.0.0.2')
+        eq_(b'\x00\x00', r.data[40:42])
+
+    def test_tcp(self):
+        def _tcp(dst):
+            return self._serialize(
+                ethernet.ethernet(self.dst_mac, self.src_mac,
+                                  ether.ETH_TYPE_IP),
+                ipv4.ipv4(src='192.168.0.1', dst=dst,
+                          proto=inet.IPPROTO_TCP),
+                tcp.tcp(src_port=50001, dst_port=80, bits=tcp.TCP_ACK),
+                b'payload')
+
+        r = packet.PacketRewriter(_tcp('192.168.0.2'))
+        r.set_ip_dst('172.16.0.2')
+        eq_(_tcp('172.16.0.2'), r.data)
+
+    def test_ipv6(self):
+        def _ipv6(hop_limit, dst, type_):
+            return self._serialize(
+                ethernet.ethernet(self.dst_mac, self.src_mac,
+                                  ether.ETH_TYPE_IPV6),
+                ipv6.ipv6(hop_limit=hop_limit, src='2001:db8::1', dst=dst,
+                          nxt=inet.IPPROTO_ICMPV6),
+                icmpv6.icmpv6(type_=type_, data=icmpv6.echo(id_=1, seq=2)))
+
+        r = packet.PacketRewriter(_ipv6(255, '2001:db8::2',
+                                        icmpv6.ICMPV6_ECHO_REQUEST))
+        eq_(254, r.dec_ttl())
+        r.set_ip_dst('2001:db8::3')
+        r.set_icmp_type(icmpv6.ICMPV6_ECHO_REPLY)
+        eq_(_ipv6(254, '2001:db8::3', icmpv6.ICMPV6_ECHO_REPLY), r.data)
+
+    def test_icmp(self):
+        def _icmp(type_):
+            return self._serialize(
+                ethernet.ethernet(self.dst_mac, self.src_mac,
+                                  ether.ETH_TYPE_IP),
+                ipv4.ipv4(proto=inet.IPPROTO_ICMP),
+                icmp.icmp(type_=type_, data=icmp.echo(id_=1, seq=2)))
+
+        r = packet.PacketRewriter(_icmp(icmp.ICMP_ECHO_REQUEST))
+        r.set_ip_dst('10.0.0.1')
+        r.set_icmp_type(icmp.ICMP_ECHO_REPLY)
+        eq_(icmp.ICMP_ECHO_REPLY, r.headers.icmp_type)
+        pkt = packet.Packet(r.data)
+        eq_(0, packet_utils.checksum(r.data[34:]))
+        eq_('10.0.0.1', pkt.get_protocol(ipv4.ipv4).dst)
+
+    def test_vlan(self):
+        r = packet.PacketRewriter(self._ipv4_udp())
+        r.push_vlan(100)
+        eq_(self._ipv4_udp(vlans=(100,)), r.data)
+        eq_(100, r.headers.vlan_vid)
+        r.push_vlan(200)
+        eq_(self._ipv4_udp(vlans=(200, 100)), r.data)
+        r.dec_ttl()
+        r.pop_vlan()
+        r.pop_vlan()
+        eq_(self._ipv4_udp(ttl=63), r.data)
+        eq_(None, r.headers.vlan_vid)
+        eq_(14, r.headers.l3_offset)
+
+    def test_invalid(self):
+        r = packet.PacketRewriter(self._serialize(
+            ethernet.ethernet(self.dst_mac, self.src_mac,
+                              ether.ETH_TYPE_ARP),
+            arp.arp()))
+        for method, args in ((r.dec_ttl, ()),
+                             (r.set_ip_dst, ('10.0.0.1',)),
+                             (r.set_src_port, (1,)),
+                             (r.set_icmp_type, (0,)),
+                             (r.pop_vlan, ())):
+            try:
+                method(*args)
+            except ValueError:
+                pass
+            else:
+                ok_(False, method)
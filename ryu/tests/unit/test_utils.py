@@ -82,3 +82,22 @@ class Test_utils(unittest.TestCase):
         expected_result = '\\x01\\x02\\x03\\x04'
         data = bytes(b'\x01\x02\x03\x04')
         eq_(expected_result, utils.binary_str(data))
+
+    def test_lru_cache(self):
+        calls = []
+
+        @utils.lru_cache(maxsize=2)
+        def _double(x):
+            calls.append(x)
+            return x * 2
+
+        eq_([2, 4, 2, 6, 4], [_double(x) for x in (1, 2, 1, 3, 2)])
+        # 2 has been discarded when 3 was cached, as 1 was used since.
+        eq_([1, 2, 3, 2], calls)
+        eq_([1, 1], _double([1]))  # unhashable
+        eq_([1, 2, 3, 2, [1]], calls)
+        eq_((1, 5, 2, 2), _double.cache_info())
+        _double.cache_clear()
+        _double(1)
+        eq_([1, 2, 3, 2, [1], 1], calls)
+        eq_((0, 1, 2, 1), _double.cache_info())
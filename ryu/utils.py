@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import functools
 import importlib
 import logging
 import os
@@ -126,3 +128,52 @@ def binary_str(data):
     """
     # convert data into bytearray explicitly
     return ''.join('\\x%02x' % byte for byte in bytearray(data))
+
+
+CacheInfo = collections.namedtuple('CacheInfo',
+                                   ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def lru_cache(maxsize=128):
+    """
+    Decorator which memoizes the results of a function for the maxsize
+    most recently used arguments, like functools.lru_cache of Python 3.
+    Calls with unhashable arguments are not cached, and the exceptions
+    raised by the function are not cached either.
+    The cache of the decorated function is emptied by its cache_clear(),
+    and its statistics are returned by its cache_info() as CacheInfo.
+    """
+    def _decorator(func):
+        cache = collections.OrderedDict()
+        stats = [0, 0]  # hits, misses
+
+        @functools.wraps(func)
+        def _wrapper(*args):
+            try:
+                result = cache.pop(args)
+            except KeyError:
+                stats[1] += 1
+                result = func(*args)
+                if len(cache) >= maxsize:
+                    cache.popitem(last=False)
+            except TypeError:
+                # unhashable arguments
+                stats[1] += 1
+                return func(*args)
+            else:
+                stats[0] += 1
+            cache[args] = result
+            return result
+
+        def _cache_info():
+            return CacheInfo(stats[0], stats[1], maxsize, len(cache))
+
+        def _cache_clear():
+            cache.clear()
+            stats[:] = [0, 0]
+
+        _wrapper.cache_info = _cache_info
+        _wrapper.cache_clear = _cache_clear
+        return _wrapper
+
+    return _decorator